@@ -0,0 +1,397 @@
+"""키프레임 + 변경 타일 캡쳐 아카이브 (.captiles)
+
+같은 모니터/영역을 반복 캡쳐하면 대부분의 픽셀이 그대로이므로, 프레임마다
+PNG를 따로 만드는 대신 한 파일에 다음처럼 이어 쓴다.
+
+  - 키프레임: keyframe_interval 프레임마다 (또는 화면 대부분이 바뀌면)
+    프레임 전체를 Up 필터 후 zlib으로 압축
+  - 변경 프레임: 직전 프레임과 다른 타일(tile_size 정사각형)만 골라
+    "새 값 - 이전 값"(256으로 나눈 나머지)을 압축. 타일 안에서도 바뀌지 않은
+    픽셀은 0이 되어 거의 공간을 차지하지 않는다.
+
+파일 끝에는 프레임 위치 인덱스가 있어서 N번째 프레임은 바로 앞 키프레임부터
+N까지만 풀면 된다 (최대 keyframe_interval개). 인덱스를 쓰기 전에 프로그램이
+죽었으면 프레임 기록을 처음부터 훑어 인덱스를 다시 만든다.
+
+    with TileArchiveWriter("monitor_1.captiles") as writer:
+        for timestamp, image in frames:
+            writer.add(image, timestamp)
+
+    with TileArchiveReader("monitor_1.captiles") as archive:
+        image = archive.frame(120)
+
+파일 구조 (모두 little endian):
+    헤더        magic, 버전, 가로, 세로, 타일 크기
+    프레임 기록  frame magic, 종류, timestamp, 타일 수, 데이터 길이, zlib 데이터
+    ...
+    인덱스      프레임마다 (위치, timestamp, 종류, 타일 수, 데이터 길이)
+    꼬리        인덱스 위치, 프레임 수, index magic
+"""
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from change_detect import dirty_tile_mask, to_array
+from metrics import METRICS
+
+ARCHIVE_MAGIC = b"CAPTILES"
+ARCHIVE_VERSION = 1
+# 파일 헤더: magic, 버전, 가로, 세로, 타일 크기
+ARCHIVE_HEADER = struct.Struct("<8sHIIH")
+FRAME_MAGIC = b"CTFR"
+# 프레임 헤더: frame magic, 종류, timestamp, 타일 수, 데이터 길이
+FRAME_HEADER = struct.Struct("<4sBdII")
+# 인덱스 항목: 위치, timestamp, 종류, 타일 수, 데이터 길이
+INDEX_ENTRY = struct.Struct("<QdBII")
+INDEX_MAGIC = b"CAPTIDX1"
+# 꼬리: 인덱스 위치, 프레임 수, index magic
+TRAILER = struct.Struct("<QI8s")
+
+KEYFRAME = 0
+DELTA = 1
+
+# 기본 타일 크기와 키프레임 간격 (N번째 프레임을 풀 때 최대 이만큼 적용)
+TILE_SIZE = 64
+KEYFRAME_INTERVAL = 30
+# 바뀐 타일 비율이 이보다 크면 변경 프레임 대신 키프레임으로 쓴다
+KEYFRAME_CHANGE = 0.6
+
+
+class ArchiveEntry:
+    """아카이브 안의 프레임 하나 (인덱스 항목)"""
+
+    def __init__(self, offset, timestamp, kind, tiles, length):
+        self.offset = offset
+        self.timestamp = timestamp
+        self.kind = kind
+        self.tiles = tiles
+        self.length = length
+
+    @property
+    def end(self):
+        return self.offset + FRAME_HEADER.size + self.length
+
+    @property
+    def is_keyframe(self):
+        return self.kind == KEYFRAME
+
+
+def _tiles(canvas, tile_size):
+    """(rows*t, cols*t, 3) 배열을 복사 없이 (rows, cols, t, t, 3) 타일 뷰로"""
+    height, width, channels = canvas.shape
+    return canvas.reshape(height // tile_size, tile_size,
+                          width // tile_size, tile_size, channels).swapaxes(1, 2)
+
+
+def _encode_keyframe(canvas, level):
+    """Up 필터(바로 위 행과의 차이) 후 압축 (스크린샷은 세로로 같은 색이 많다)"""
+    rows = canvas.reshape(canvas.shape[0], -1)
+    filtered = np.empty_like(rows)
+    filtered[0] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:])
+    return zlib.compress(filtered.tobytes(), level)
+
+
+def _decode_keyframe(data, shape):
+    rows = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(shape[0], -1)
+    # 위 행을 차례로 더해 Up 필터를 되돌린다 (uint8 덧셈은 256으로 나눈 나머지,
+    # 행 단위 np.add가 axis=0 cumsum보다 열 배 이상 빠르다)
+    canvas = np.empty_like(rows)
+    canvas[0] = rows[0]
+    for row in range(1, len(rows)):
+        np.add(canvas[row - 1], rows[row], out=canvas[row])
+    return canvas.reshape(shape)
+
+
+def _encode_delta(previous, canvas, mask, tile_size, level):
+    """바뀐 타일 번호(uint32)와 타일별 (새 값 - 이전 값)을 함께 압축"""
+    indices = np.flatnonzero(mask).astype("<u4")
+    delta = _tiles(canvas, tile_size)[mask] - _tiles(previous, tile_size)[mask]
+    return zlib.compress(indices.tobytes() + delta.tobytes(), level)
+
+
+def _apply_delta(canvas, data, count, tile_size):
+    """변경 프레임을 canvas에 그대로 적용"""
+    data = zlib.decompress(data)
+    indices = np.frombuffer(data, dtype="<u4", count=count)
+    delta = np.frombuffer(data, dtype=np.uint8, offset=count * 4).reshape(
+        count, tile_size, tile_size, canvas.shape[2])
+    tiles = _tiles(canvas, tile_size)
+    rows, cols = np.divmod(indices, tiles.shape[1])
+    tiles[rows, cols] += delta
+
+
+class TileArchiveWriter:
+    """키프레임 + 변경 타일 아카이브 저장
+
+    tile_size: 변경을 비교하고 저장하는 타일 한 변의 픽셀 수
+    keyframe_interval: 이 프레임 수마다 키프레임 (임의 접근 시 최대 적용 수)
+    compress_level: zlib 압축 수준 (1 빠르게 ~ 9 작게)
+    append: 이미 있는 아카이브 뒤에 이어 쓴다 (마지막 프레임을 풀어 비교 기준으로)
+
+    keyframes와 entries는 이어 쓴 경우 기존 프레임을 포함하고, frames_written,
+    frames_merged, tiles_written은 이 객체로 쓴 프레임만 센다.
+
+    모든 프레임은 크기가 같아야 한다. 직전 프레임과 똑같은 프레임도 시각을
+    남기기 위해 타일 0개짜리 변경 프레임(헤더만)으로 기록한다.
+    """
+    extension = "captiles"
+
+    def __init__(self, path, tile_size=TILE_SIZE, keyframe_interval=KEYFRAME_INTERVAL,
+                 compress_level=6, append=False, **kwargs):
+        if keyframe_interval < 1:
+            raise ValueError("키프레임 간격은 1 이상이어야 합니다.")
+        self.path = path
+        self.tile_size = tile_size
+        self.keyframe_interval = keyframe_interval
+        self.compress_level = compress_level
+        self.size = None
+        self.entries = []
+        self.frames_written = 0
+        self.frames_merged = 0
+        self.keyframes = 0
+        self.tiles_written = 0
+        self._canvas = None
+        self._since_keyframe = 0
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._open_append()
+        else:
+            self.fp = open(path, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open_append(self):
+        """기존 아카이브의 인덱스와 마지막 프레임을 읽고, 인덱스 자리부터 이어 쓴다"""
+        with TileArchiveReader(self.path) as reader:
+            self.size = reader.size
+            self.tile_size = reader.tile_size
+            self.entries = list(reader.entries)
+            if self.entries:
+                self._canvas = reader._decode(len(self.entries) - 1).copy()
+                keys = [i for i, e in enumerate(self.entries) if e.is_keyframe]
+                self.keyframes = len(keys)
+                last_key = keys[-1]
+                self._since_keyframe = len(self.entries) - last_key
+            data_end = self.entries[-1].end if self.entries else ARCHIVE_HEADER.size
+        self.fp = open(self.path, "r+b")
+        self.fp.seek(data_end)
+        self.fp.truncate()
+
+    def _padded(self, image):
+        """RGB 프레임을 타일 크기의 배수로 0을 채운 배열로"""
+        if not isinstance(image, np.ndarray) and image.mode != "RGB":
+            image = image.convert("RGB")
+        pixels = to_array(image)
+        height, width = pixels.shape[:2]
+        if self.size is None:
+            self.size = (width, height)
+            self.fp.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, width, height,
+                                              self.tile_size))
+        elif (width, height) != self.size:
+            raise ValueError(f"프레임 크기가 다릅니다: {(width, height)} != {self.size}")
+        tile = self.tile_size
+        canvas = np.zeros((-(-height // tile) * tile, -(-width // tile) * tile, 3), dtype=np.uint8)
+        canvas[:height, :width] = pixels[:, :, :3]
+        return canvas
+
+    def add(self, image, timestamp=None):
+        """프레임 추가 (PIL 이미지 또는 (H, W, 3) 배열, timestamp 기본값은 time.time())"""
+        if timestamp is None:
+            timestamp = time.time()
+        with METRICS.stage("archive"):
+            canvas = self._padded(image)
+            mask = None
+            if self._canvas is not None and self._since_keyframe < self.keyframe_interval:
+                mask = dirty_tile_mask(self._canvas, canvas, self.tile_size)
+                if mask.mean() > KEYFRAME_CHANGE:
+                    mask = None
+
+            if mask is None:
+                kind, tiles = KEYFRAME, canvas.shape[0] * canvas.shape[1] // self.tile_size ** 2
+                data = _encode_keyframe(canvas, self.compress_level)
+                self.keyframes += 1
+                self._since_keyframe = 0
+            else:
+                kind, tiles = DELTA, int(np.count_nonzero(mask))
+                data = _encode_delta(self._canvas, canvas, mask, self.tile_size,
+                                     self.compress_level) if tiles else b""
+                if not tiles:
+                    self.frames_merged += 1
+            self._since_keyframe += 1
+
+            entry = ArchiveEntry(self.fp.tell(), timestamp, kind, tiles, len(data))
+            self.fp.write(FRAME_HEADER.pack(FRAME_MAGIC, kind, timestamp, tiles, len(data)))
+            self.fp.write(data)
+            self.entries.append(entry)
+            self.tiles_written += tiles
+            self.frames_written += 1
+            self._canvas = canvas
+
+    def close(self):
+        """인덱스와 꼬리를 쓰고 파일 닫기"""
+        if self.fp.closed:
+            return
+        try:
+            if self.size is not None:
+                index_offset = self.fp.tell()
+                self.fp.write(b"".join(INDEX_ENTRY.pack(e.offset, e.timestamp, e.kind, e.tiles, e.length)
+                                       for e in self.entries))
+                self.fp.write(TRAILER.pack(index_offset, len(self.entries), INDEX_MAGIC))
+        finally:
+            self.fp.close()
+            self._canvas = None
+
+
+class TileArchiveReader:
+    """아카이브 임의 접근 읽기
+
+    frame(n)은 n 이하의 가장 가까운 키프레임부터 n까지 적용해 만든다.
+    마지막으로 만든 프레임을 기억하므로 앞에서부터 차례로 읽을 때는
+    프레임마다 변경 타일만 적용한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # 인덱스 없이 프레임 기록을 훑어 읽었는지 (정상적으로 닫히지 않은 파일)
+        self.recovered = False
+        self.fp = open(path, "rb")
+        try:
+            header = self.fp.read(ARCHIVE_HEADER.size)
+            if len(header) < ARCHIVE_HEADER.size:
+                raise ValueError(f"타일 아카이브 파일이 아닙니다: {path}")
+            magic, version, width, height, tile_size = ARCHIVE_HEADER.unpack(header)
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError(f"타일 아카이브 파일이 아닙니다: {path}")
+            if version != ARCHIVE_VERSION:
+                raise ValueError(f"지원하지 않는 타일 아카이브 버전: {version}")
+            self.size = (width, height)
+            self.tile_size = tile_size
+            self.shape = (-(-height // tile_size) * tile_size, -(-width // tile_size) * tile_size, 3)
+            self.entries = self._read_index()
+        except Exception:
+            self.fp.close()
+            raise
+        self._keyframes = np.flatnonzero([e.is_keyframe for e in self.entries])
+        self._cached_index = None
+        self._cached = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _read_index(self):
+        """꼬리의 인덱스를 읽는다 (없거나 깨졌으면 프레임 기록을 훑어서 만든다)"""
+        file_size = os.fstat(self.fp.fileno()).st_size
+        if file_size >= ARCHIVE_HEADER.size + TRAILER.size:
+            self.fp.seek(file_size - TRAILER.size)
+            index_offset, count, magic = TRAILER.unpack(self.fp.read(TRAILER.size))
+            if magic == INDEX_MAGIC and index_offset + count * INDEX_ENTRY.size + TRAILER.size == file_size:
+                self.fp.seek(index_offset)
+                data = self.fp.read(count * INDEX_ENTRY.size)
+                return [ArchiveEntry(*fields) for fields in INDEX_ENTRY.iter_unpack(data)]
+        return self._scan(file_size)
+
+    def _scan(self, file_size):
+        """정상적으로 닫히지 않은 아카이브: 온전한 프레임 기록까지만 인덱스로"""
+        self.recovered = True
+        entries = []
+        offset = ARCHIVE_HEADER.size
+        while offset + FRAME_HEADER.size <= file_size:
+            self.fp.seek(offset)
+            magic, kind, timestamp, tiles, length = FRAME_HEADER.unpack(self.fp.read(FRAME_HEADER.size))
+            if magic != FRAME_MAGIC or kind not in (KEYFRAME, DELTA) or (not entries and kind != KEYFRAME):
+                break
+            entry = ArchiveEntry(offset, timestamp, kind, tiles, length)
+            if entry.end > file_size:
+                break
+            entries.append(entry)
+            offset = entry.end
+        return entries
+
+    @property
+    def keyframes(self):
+        return len(self._keyframes)
+
+    def timestamp(self, index):
+        return self.entries[index].timestamp
+
+    def _read(self, entry):
+        self.fp.seek(entry.offset + FRAME_HEADER.size)
+        return self.fp.read(entry.length)
+
+    def _decode(self, index):
+        """index번째 프레임의 (타일 배수로 채운) 배열 (캐시를 그대로 돌려주므로 고치지 말 것)"""
+        if not -len(self.entries) <= index < len(self.entries):
+            raise IndexError(f"프레임 번호가 범위를 벗어났습니다: {index}")
+        index %= len(self.entries)
+        key = int(self._keyframes[np.searchsorted(self._keyframes, index, side="right") - 1])
+        if self._cached_index is not None and key <= self._cached_index <= index:
+            # 같은 키프레임 구간에서 앞으로 가는 중이면 마지막 프레임에서 이어서
+            start, canvas = self._cached_index + 1, self._cached
+        else:
+            start, canvas = key + 1, _decode_keyframe(self._read(self.entries[key]), self.shape)
+        for entry in self.entries[start:index + 1]:
+            if entry.tiles:
+                _apply_delta(canvas, self._read(entry), entry.tiles, self.tile_size)
+        self._cached_index, self._cached = index, canvas
+        return canvas
+
+    def array(self, index):
+        """index번째 프레임을 (H, W, 3) uint8 배열로 (복사본)"""
+        width, height = self.size
+        return self._decode(index)[:height, :width].copy()
+
+    def frame(self, index):
+        """index번째 프레임을 RGB PIL 이미지로"""
+        return Image.fromarray(self.array(index))
+
+    def frames(self, start=0, stop=None):
+        """(timestamp, PIL 이미지)를 차례로 돌려주는 제너레이터 (sequence.write_sequence에 바로 넘길 수 있다)"""
+        for index in range(*slice(start, stop).indices(len(self.entries))):
+            yield self.entries[index].timestamp, self.frame(index)
+
+    def close(self):
+        """파일 닫기"""
+        self.fp.close()
+        self._cached = None
+
+
+def append_frame(path, image, timestamp=None, **kwargs):
+    """아카이브에 프레임 하나를 이어 쓴다 (없으면 새로 만든다), 전체 프레임 수 반환"""
+    with TileArchiveWriter(path, append=True, **kwargs) as writer:
+        writer.add(image, timestamp)
+    return len(writer.entries)
+
+
+def export_frames(archive_path, folder, file_format="png", profile=None, prefix="frame", start=0, stop=None):
+    """아카이브의 프레임을 개별 파일로 저장, 저장한 경로 목록 반환"""
+    from encoding import FORMAT_EXTENSIONS, save_image
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    extension = FORMAT_EXTENSIONS.get(file_format, file_format)
+    with TileArchiveReader(archive_path) as archive:
+        for index in range(*slice(start, stop).indices(len(archive))):
+            filepath = os.path.join(folder, f"{prefix}_{index:06d}.{extension}")
+            paths.append(save_image(archive.frame(index), filepath, file_format, profile,
+                                    overwrite=True).path)
+    return paths
+
+
+def export_sequence(archive_path, output, format=None, start=0, stop=None, **kwargs):
+    """아카이브의 프레임을 애니메이션/시퀀스 파일 하나로 저장 (sequence 포맷 사용)"""
+    from sequence import write_sequence
+    with TileArchiveReader(archive_path) as archive:
+        return write_sequence(output, archive.frames(start, stop), format, **kwargs)
@@ -0,0 +1,260 @@
+"""캡쳐 백엔드 모음
+
+모든 캡쳐 경로는 CaptureBackend.grab()을 통해 화면을 가져온다.
+bbox는 가상 데스크톱 좌표 기준 (left, top, right, bottom)이며,
+None이면 주 모니터 전체를 캡쳐한다.
+
+pyautogui, pywin32, ImageGrab 같은 무거운 모듈은 해당 백엔드를
+처음 만들 때 import한다.
+"""
+import os
+
+from PIL import Image
+
+from metrics import METRICS
+
+
+def enable_dpi_awareness(verbose=True):
+    """Windows에서 DPI 배율과 무관한 실제 픽셀 좌표를 쓰도록 설정"""
+    try:
+        import ctypes
+        ctypes.windll.user32.SetProcessDPIAware()
+    except Exception as dpi_error:
+        if verbose:
+            print(f"DPI aware 설정 실패: {dpi_error}")
+
+
+class CaptureBackend:
+    """캡쳐 백엔드 기본 클래스"""
+    name = "base"
+
+    def grab(self, bbox=None):
+        """bbox 영역을 캡쳐하여 RGB PIL 이미지로 반환"""
+        raise NotImplementedError
+
+    def grab_raw(self, bbox=None):
+        """bbox 영역을 캡쳐하여 (원시 픽셀 버퍼, (가로, 세로), 원시 형식) 반환
+
+        공유 메모리 슬롯에 바로 복사할 때 쓴다. 기본 구현은 grab() 결과를
+        RGB 바이트로 바꾸고, 비트맵 버퍼를 그대로 줄 수 있는 백엔드는 재정의한다.
+        """
+        image = self.grab(bbox)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image.tobytes(), image.size, "RGB"
+
+    def grab_small(self, bbox=None, width=160):
+        """bbox 영역을 가로 약 width 픽셀로 줄여 캡쳐 (변경 감시 확인용)
+
+        기본 구현은 원래 해상도로 캡쳐한 뒤 정수 배율로 축소한다.
+        캡쳐하면서 줄일 수 있는 백엔드는 재정의한다.
+        """
+        image = self.grab(bbox)
+        factor = max(1, image.width // width)
+        return image.reduce(factor) if factor > 1 else image
+
+    def close(self):
+        """백엔드 리소스 해제"""
+        pass
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    """pyautogui.screenshot() 기반 백엔드"""
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, bbox=None):
+        if bbox is None:
+            return self._pyautogui.screenshot()
+        left, top, right, bottom = bbox
+        return self._pyautogui.screenshot(region=(left, top, right - left, bottom - top))
+
+
+class ImageGrabBackend(CaptureBackend):
+    """PIL ImageGrab 기반 백엔드 (멀티 모니터 가상 좌표 지원)"""
+    name = "imagegrab"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+
+    def grab(self, bbox=None):
+        if bbox is None:
+            return self._image_grab.grab()
+        return self._image_grab.grab(bbox=tuple(bbox), all_screens=True)
+
+
+class Win32Backend(CaptureBackend):
+    """Windows BitBlt 기반 백엔드 (가장 정확)"""
+    name = "win32"
+
+    def __init__(self):
+        try:
+            import win32gui
+            import win32api
+            import win32con
+            import win32ui
+        except ImportError:
+            raise RuntimeError("pywin32 패키지가 없습니다.")
+        self._win32gui = win32gui
+        self._win32api = win32api
+        self._win32con = win32con
+        self._win32ui = win32ui
+
+    def grab(self, bbox=None):
+        bmpstr, size, rawmode = self.grab_raw(bbox)
+        with METRICS.stage("convert"):
+            return Image.frombuffer('RGB', size, bmpstr, 'raw', rawmode, 0, 1)
+
+    def grab_raw(self, bbox=None):
+        # 비트맵 버퍼(BGRX)를 변환 없이 그대로 돌려준다
+        return self._blit(bbox)
+
+    def grab_small(self, bbox=None, width=160):
+        # StretchBlt로 복사하면서 줄이므로 원래 해상도 버퍼를 만들지 않는다
+        left, top, right, bottom = bbox or self._screen_rect()
+        factor = max(1, (right - left) // width)
+        out_size = (max(1, (right - left) // factor), max(1, (bottom - top) // factor))
+        bmpstr, size, rawmode = self._blit((left, top, right, bottom), out_size)
+        return Image.frombuffer('RGB', size, bmpstr, 'raw', rawmode, 0, 1)
+
+    def _screen_rect(self):
+        win32api, win32con = self._win32api, self._win32con
+        return (0, 0,
+                win32api.GetSystemMetrics(win32con.SM_CXSCREEN),
+                win32api.GetSystemMetrics(win32con.SM_CYSCREEN))
+
+    def _blit(self, bbox=None, out_size=None):
+        """bbox 영역을 out_size(기본 원래 크기) 비트맵으로 복사하여 BGRX 버퍼 반환"""
+        win32gui, win32con, win32ui = self._win32gui, self._win32con, self._win32ui
+        if bbox is None:
+            bbox = self._screen_rect()
+        left, top, right, bottom = bbox
+        width = right - left
+        height = bottom - top
+        out_width, out_height = out_size or (width, height)
+
+        hwnd = win32gui.GetDesktopWindow()
+        hwindc = win32gui.GetWindowDC(hwnd)
+        srcdc = win32ui.CreateDCFromHandle(hwindc)
+        memdc = srcdc.CreateCompatibleDC()
+        bmp = win32ui.CreateBitmap()
+        try:
+            bmp.CreateCompatibleBitmap(srcdc, out_width, out_height)
+            memdc.SelectObject(bmp)
+            if (out_width, out_height) == (width, height):
+                memdc.BitBlt((0, 0), (width, height), srcdc, (left, top), win32con.SRCCOPY)
+            else:
+                # HALFTONE은 여러 픽셀의 평균을 내므로 작은 변화도 축소 이미지에 남는다
+                memdc.SetStretchBltMode(win32con.HALFTONE)
+                memdc.StretchBlt((0, 0), (out_width, out_height), srcdc, (left, top),
+                                 (width, height), win32con.SRCCOPY)
+
+            bmpinfo = bmp.GetInfo()
+            bmpstr = bmp.GetBitmapBits(True)
+            return bmpstr, (bmpinfo['bmWidth'], bmpinfo['bmHeight']), 'BGRX'
+        finally:
+            # 리소스 해제
+            memdc.DeleteDC()
+            srcdc.DeleteDC()
+            win32gui.ReleaseDC(hwnd, hwindc)
+            win32gui.DeleteObject(bmp.GetHandle())
+
+
+class SyntheticBackend(CaptureBackend):
+    """디스플레이 없이 결정적인 프레임을 만들어내는 가상 백엔드
+
+    같은 (width, height, seed)와 같은 호출 순서라면 항상 같은 픽셀을 돌려준다.
+    headless 환경에서 캡쳐-변환-인코딩-저장 파이프라인을 측정할 때 사용한다.
+    """
+    name = "synthetic"
+
+    def __init__(self, width=1920, height=1080, seed=0, animate=True, monitors=None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.animate = animate
+        self.frame_index = 0
+        # 가상 모니터 배치 (없으면 단일 모니터)
+        self.monitors = monitors or [{
+            'index': 0,
+            'name': "가상 모니터 1",
+            'x': 0,
+            'y': 0,
+            'width': width,
+            'height': height,
+            'is_primary': True
+        }]
+        self._base = self._make_base()
+
+    def _make_base(self):
+        """seed에 따라 고정된 배경 이미지 생성"""
+        # 가로/세로 그라디언트를 채널별로 합쳐 RGB 배경을 만든다
+        red = Image.linear_gradient('L').rotate(90 * (self.seed % 4))
+        green = Image.linear_gradient('L').transpose(Image.Transpose.TRANSPOSE)
+        blue = Image.new('L', (256, 256), (self.seed * 37) % 256)
+        base = Image.merge('RGB', (red, green, blue))
+        return base.resize((self.width, self.height), Image.Resampling.NEAREST)
+
+    def _render(self, index):
+        """index 번째 프레임 렌더링"""
+        frame = self._base.copy()
+        if self.animate:
+            # 프레임마다 위치가 바뀌는 사각형으로 화면 변화를 흉내낸다
+            box_w = max(1, self.width // 8)
+            box_h = max(1, self.height // 8)
+            step = 16 * index + self.seed
+            x = step % max(1, self.width - box_w)
+            y = (step // 2) % max(1, self.height - box_h)
+            color = ((index * 53) % 256, (index * 97) % 256, (index * 151) % 256)
+            frame.paste(color, (x, y, x + box_w, y + box_h))
+        return frame
+
+    def grab(self, bbox=None):
+        frame = self._render(self.frame_index)
+        self.frame_index += 1
+        if bbox is None:
+            primary = next((m for m in self.monitors if m['is_primary']), self.monitors[0])
+            bbox = (primary['x'], primary['y'],
+                    primary['x'] + primary['width'], primary['y'] + primary['height'])
+        # 가상 데스크톱 원점 기준으로 잘라낸다
+        min_x = min(m['x'] for m in self.monitors)
+        min_y = min(m['y'] for m in self.monitors)
+        left, top, right, bottom = bbox
+        return frame.crop((left - min_x, top - min_y, right - min_x, bottom - min_y))
+
+
+# 이름 -> 백엔드 클래스
+BACKENDS = {
+    Win32Backend.name: Win32Backend,
+    ImageGrabBackend.name: ImageGrabBackend,
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    SyntheticBackend.name: SyntheticBackend,
+}
+
+# 자동 선택 시 시도할 순서 (synthetic은 명시적으로 지정할 때만 사용)
+DEFAULT_ORDER = [Win32Backend.name, ImageGrabBackend.name, PyAutoGUIBackend.name]
+
+
+def create_backend(name=None, **kwargs):
+    """백엔드 생성
+
+    name이 없으면 CAPTURE_BACKEND 환경 변수를 보고, 그것도 없으면
+    DEFAULT_ORDER 순서대로 사용 가능한 첫 백엔드를 고른다.
+    """
+    name = name or os.environ.get("CAPTURE_BACKEND")
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"알 수 없는 캡쳐 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+        return BACKENDS[name](**kwargs)
+
+    errors = []
+    for candidate in DEFAULT_ORDER:
+        try:
+            return BACKENDS[candidate]()
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+    raise RuntimeError("사용 가능한 캡쳐 백엔드가 없습니다.\n" + "\n".join(errors))
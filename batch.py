@@ -0,0 +1,65 @@
+"""한 번 캡쳐해서 여러 출력 만들기
+
+여러 모니터/영역을 각각 캡쳐하는 대신, 전체를 감싸는 사각형을 한 번만
+캡쳐하고 각 출력은 그 버퍼의 NumPy 뷰(복사 없음)로 만든다. 모든 출력이
+같은 시각의 화면이 되고, 캡쳐 비용도 한 번뿐이다.
+
+    batch = grab_batch(backend, [monitor_rect(m) for m in monitors])
+    for rect, view in zip(batch.rects, batch.views()):
+        ...  # view는 batch.array의 일부를 가리키는 (H, W, 3) 배열
+"""
+import time
+
+import numpy as np
+from PIL import Image
+
+from metrics import METRICS
+
+
+def union_rect(rects):
+    """(left, top, right, bottom) 사각형들을 모두 감싸는 사각형"""
+    rects = list(rects)
+    if not rects:
+        raise ValueError("캡쳐할 영역이 없습니다.")
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+class BatchFrame:
+    """한 번의 캡쳐 결과와 그 안의 출력 영역들"""
+
+    def __init__(self, array, bbox, rects, timestamp):
+        self.array = array
+        self.bbox = bbox
+        self.rects = rects
+        self.timestamp = timestamp
+
+    def view(self, rect):
+        """가상 데스크톱 좌표 rect에 해당하는 배열 뷰 (복사 없음)"""
+        left, top, right, bottom = rect
+        x0, y0 = self.bbox[0], self.bbox[1]
+        if left < x0 or top < y0 or right > self.bbox[2] or bottom > self.bbox[3]:
+            raise ValueError(f"영역이 캡쳐 범위를 벗어났습니다: {rect} (캡쳐 범위: {self.bbox})")
+        return self.array[top - y0:bottom - y0, left - x0:right - x0]
+
+    def views(self):
+        """rects 순서대로 모든 출력 뷰"""
+        return [self.view(rect) for rect in self.rects]
+
+    def image(self, rect):
+        """rect 영역을 PIL 이미지로 (이때 한 번 복사된다)"""
+        return Image.fromarray(np.ascontiguousarray(self.view(rect)))
+
+
+def grab_batch(backend, rects):
+    """rects를 모두 감싸는 영역을 한 번만 캡쳐하여 BatchFrame 반환"""
+    rects = [tuple(r) for r in rects]
+    bbox = union_rect(rects)
+    timestamp = time.time()
+    with METRICS.stage("grab"):
+        image = backend.grab(bbox)
+    with METRICS.stage("convert"):
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        array = np.asarray(image)
+    return BatchFrame(array, bbox, rects, timestamp)
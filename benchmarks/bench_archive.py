@@ -0,0 +1,156 @@
+"""타일 아카이브 vs 개별 PNG 벤치마크
+
+    python benchmarks/bench_archive.py [--frames 120] [--size 1920x1080] [--seeks 100]
+
+바탕화면처럼 보이는 프레임(창, 글자, 시계, 입력 중인 글, 커서, 가끔 창 이동)을
+만들어 개별 PNG 파일과 타일 아카이브(키프레임 간격 여러 가지)로 저장하고,
+전체 크기(압축률), 프레임당 저장 시간, 임의 프레임 하나를 읽는 시간을 비교한다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive import TileArchiveReader, TileArchiveWriter  # noqa: E402
+from encoding import save_image  # noqa: E402
+
+GLYPH_W, GLYPH_H = 8, 14
+
+
+def make_desktop(width, height, rng):
+    """배경, 창 세 개, 글자 줄이 있는 바탕화면과 글자 모양 목록"""
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = np.linspace(40, 90, height, dtype=np.uint8)[:, None, None]
+    glyphs = (rng.random((60, GLYPH_H, GLYPH_W)) > 0.6).astype(np.uint8)
+    windows = []
+    for i in range(3):
+        w, h = width // 3, height // 2
+        x, y = 60 + i * width // 4, 60 + i * height // 8
+        windows.append((x, y, w, h))
+        frame[y:y + h, x:x + w] = 245
+        frame[y:y + 28, x:x + w] = (50, 90, 160)
+        for line in range(y + 40, y + h - GLYPH_H, GLYPH_H + 6):
+            count = rng.integers(10, (w - 20) // GLYPH_W)
+            write_text(frame, glyphs, x + 10, line, rng.integers(0, len(glyphs), count))
+    frame[height - 40:] = (30, 30, 30)
+    return frame, glyphs, windows
+
+
+def write_text(frame, glyphs, x, y, codes):
+    for i, code in enumerate(codes):
+        gx = x + i * GLYPH_W
+        if gx + GLYPH_W > frame.shape[1]:
+            break
+        frame[y:y + GLYPH_H, gx:gx + GLYPH_W] = np.where(glyphs[code][:, :, None], 20, 245)
+
+
+def make_frames(count, width, height, seed=0):
+    """입력 중인 글/시계/커서가 조금씩 바뀌고 가끔 창이 움직이는 프레임 목록"""
+    rng = np.random.default_rng(seed)
+    desktop, glyphs, windows = make_desktop(width, height, rng)
+    x, y, w, h = windows[-1]
+    typed = []
+    frames = []
+    for index in range(count):
+        typed.extend(rng.integers(0, len(glyphs), rng.integers(0, 4)).tolist())
+        if index and index % 40 == 0:
+            # 창 이동: 화면 대부분이 바뀐다
+            desktop = np.roll(desktop, width // 10, axis=1)
+        frame = desktop.copy()
+        line_len = (w - 20) // GLYPH_W
+        for line in range(len(typed) // line_len + 1):
+            write_text(frame, glyphs, x + 10, y + h - 120 + (line % 5) * (GLYPH_H + 6),
+                       typed[line * line_len:(line + 1) * line_len])
+        write_text(frame, glyphs, width - 80, height - 27, [index % 60, (index // 60) % 60, 5, 7])
+        cx, cy = (index * 37) % width, (index * 23) % height
+        frame[cy:cy + 20, cx:cx + 12] = 0
+        frames.append(frame)
+    return frames
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def seek_times(read, count, seeks, rng):
+    """임의 프레임 seeks번 읽기 (ms 목록)"""
+    samples = []
+    for index in rng.integers(0, count, seeks):
+        start = time.perf_counter()
+        read(int(index))
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, nbytes, raw_bytes, write_ms, seeks, sequential_ms):
+    print(f"{name:<22}{nbytes / 1024 / 1024:>9.2f}{raw_bytes / nbytes:>8.1f}x{write_ms:>10.1f}"
+          f"{statistics.median(seeks):>10.1f}{percentile(seeks, 0.95):>9.1f}{sequential_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타일 아카이브 vs 개별 PNG 벤치마크")
+    parser.add_argument("--frames", type=int, default=120, help="프레임 수 (기본 120)")
+    parser.add_argument("--size", default="1920x1080", help="프레임 크기 (기본 1920x1080)")
+    parser.add_argument("--seeks", type=int, default=100, help="임의 읽기 횟수 (기본 100)")
+    parser.add_argument("--profile", default="balanced", choices=["fastest", "balanced", "smallest"],
+                        help="PNG 인코딩 프로파일 (기본 balanced)")
+    parser.add_argument("--intervals", default="10,30,60", help="비교할 키프레임 간격 (기본 10,30,60)")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    frames = make_frames(args.frames, width, height)
+    images = [Image.fromarray(frame) for frame in frames]
+    raw_bytes = sum(frame.nbytes for frame in frames)
+    print(f"프레임 {len(frames)}장 ({width}x{height}), 원시 {raw_bytes / 1024 / 1024:.0f}MB")
+    print(f"\n{'저장 방식':<22}{'크기 MB':>9}{'압축률':>9}{'저장 ms':>10}{'임의 ms':>10}{'p95':>9}"
+          f"{'순서 ms':>10}  (저장/순서 읽기는 프레임당, 임의 읽기는 중앙값)")
+
+    with tempfile.TemporaryDirectory() as folder:
+        rng = np.random.default_rng(1)
+        paths = []
+        start = time.perf_counter()
+        for index, image in enumerate(images):
+            paths.append(save_image(image, os.path.join(folder, f"frame_{index:05d}.png"),
+                                    "png", args.profile).path)
+        write_ms = (time.perf_counter() - start) * 1000 / len(images)
+        nbytes = sum(os.path.getsize(path) for path in paths)
+        seeks = seek_times(lambda i: Image.open(paths[i]).load(), len(paths), args.seeks, rng)
+        start = time.perf_counter()
+        for path in paths:
+            Image.open(path).load()
+        sequential_ms = (time.perf_counter() - start) * 1000 / len(paths)
+        report(f"개별 PNG ({args.profile})", nbytes, raw_bytes, write_ms, seeks, sequential_ms)
+
+        for interval in (int(v) for v in args.intervals.split(",")):
+            path = os.path.join(folder, f"frames_{interval}.captiles")
+            start = time.perf_counter()
+            with TileArchiveWriter(path, keyframe_interval=interval) as writer:
+                for index, frame in enumerate(frames):
+                    writer.add(frame, float(index))
+            write_ms = (time.perf_counter() - start) * 1000 / len(frames)
+            with TileArchiveReader(path) as archive:
+                # 매번 새로 여는 경우와 같도록 캐시를 비우고 잰다
+                def read(index):
+                    archive._cached_index = None
+                    archive.frame(index)
+                seeks = seek_times(read, len(archive), args.seeks, rng)
+                start = time.perf_counter()
+                for _ in archive.frames():
+                    pass
+                sequential_ms = (time.perf_counter() - start) * 1000 / len(archive)
+                assert np.array_equal(archive.array(len(frames) - 1), frames[-1])
+            report(f"타일 아카이브 (키 {interval})", os.path.getsize(path), raw_bytes,
+                   write_ms, seeks, sequential_ms)
+            print(f"{'':<22}키프레임 {writer.keyframes}장, 바뀐 타일 {writer.tiles_written}개, "
+                  f"변화 없는 프레임 {writer.frames_merged}장")
+
+
+if __name__ == "__main__":
+    main()
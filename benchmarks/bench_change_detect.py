@@ -0,0 +1,68 @@
+"""타일 변경 검출 벤치마크
+
+    python benchmarks/bench_change_detect.py [--tile 64] [--repeat 20]
+
+1080p, 4K, 멀티 모니터 가상 데스크톱 크기의 BGRX 프레임으로
+변화 없음 / 작은 변화 / 전체 변화 세 경우의 diff 시간을 잰다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_detect import TileChangeDetector  # noqa: E402
+
+# (이름, 가로, 세로)
+SIZES = [
+    ("1080p", 1920, 1080),
+    ("4K", 3840, 2160),
+    ("1080p+4K", 5760, 2160),
+    ("3x4K", 11520, 2160),
+]
+
+
+def time_update(detector, base, frame, repeat):
+    """detector.update(frame)의 중앙값 시간(ms)과 결과 사각형 수"""
+    samples = []
+    rects = []
+    for _ in range(repeat):
+        detector.reset()
+        detector.update(base)
+        start = time.perf_counter()
+        rects = detector.update(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(rects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타일 변경 검출 벤치마크")
+    parser.add_argument("--tile", type=int, default=64, help="타일 크기 (기본 64)")
+    parser.add_argument("--repeat", type=int, default=20, help="반복 횟수 (기본 20)")
+    parser.add_argument("--threshold", type=int, default=0, help="채널 차이 허용치 (기본 0)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'크기':<10} {'해상도':>12} {'변화없음':>10} {'작은변화':>10} {'전체변화':>10}  (ms, 중앙값)")
+    for name, width, height in SIZES:
+        base = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+        small = base.copy()
+        small[height // 2:height // 2 + 40, width // 3:width // 3 + 200] ^= 0xFF
+
+        full = base.copy()
+        full[:, :, 0] ^= 0x01
+
+        detector = TileChangeDetector(tile_size=args.tile, threshold=args.threshold)
+        results = [time_update(detector, base, frame, args.repeat)
+                   for frame in (base.copy(), small, full)]
+        print(f"{name:<10} {f'{width}x{height}':>12} " +
+              " ".join(f"{ms:>10.2f}" for ms, _ in results))
+
+
+if __name__ == "__main__":
+    main()
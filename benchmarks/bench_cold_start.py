@@ -0,0 +1,56 @@
+"""명령줄 모드 콜드 스타트 벤치마크
+
+    python benchmarks/bench_cold_start.py [--repeat 10]
+
+새 파이썬 프로세스로 다음을 각각 실행하여 벽시계 시간을 잰다.
+  - cli.py full (synthetic 백엔드): 프로세스 시작부터 파일 저장까지
+  - cli.py monitors: 캡쳐 없이 시작/종료만
+  - import capture: GUI 모듈 import만 (Tk 초기화와 창 숨김 대기는 제외)
+GUI 캡쳐는 여기에 Tk 초기화와 창이 화면에서 사라질 때까지의 대기가 더해진다.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_command(command, repeat):
+    """명령을 repeat번 실행한 벽시계 시간(ms) 목록, 실패하면 None"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            return None
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="명령줄 모드 콜드 스타트 벤치마크")
+    parser.add_argument("--repeat", type=int, default=10, help="반복 횟수 (기본 10)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        cases = [
+            ("cli full (synthetic)", [sys.executable, "cli.py", "full", "--backend", "synthetic",
+                                      "-o", output_dir]),
+            ("cli monitors", [sys.executable, "cli.py", "monitors"]),
+            ("import capture (GUI)", [sys.executable, "-c", "import capture"]),
+        ]
+        print(f"{'항목':<24} {'중앙값':>10} {'최소':>10}  (ms)")
+        for name, command in cases:
+            samples = time_command(command, args.repeat)
+            if samples is None:
+                print(f"{name:<24} {'실패':>10}")
+                continue
+            print(f"{name:<24} {statistics.median(samples):>10.1f} {min(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""인코딩 워커 수에 따른 처리량 벤치마크
+
+    python benchmarks/bench_encode_pool.py [--frames 24] [--size 3840x2160] [--profile balanced]
+
+synthetic 백엔드 프레임을 미리 만들어 두고, SaveWorker(스레드 1개)와
+ProcessSaveWorker(프로세스 1, 2, 4, ... cpu 수)로 PNG 저장했을 때의
+초당 프레임 수를 비교한다. 프로세스 워커는 pickle 전달과 공유 메모리
+링(shared_frames) 전달을 각각 잰다. 캡쳐 비용은 빼고 인코딩/저장만 잰다.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import SyntheticBackend  # noqa: E402
+from pipeline import ProcessSaveWorker, SaveWorker  # noqa: E402
+from shared_frames import SharedFrameRing  # noqa: E402
+
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... max_workers"""
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run(worker, frames, folder, file_format, profile):
+    """모든 프레임을 저장하는 데 걸린 시간(초)과 출력 순서가 제출 순서와 같은지"""
+    done = []
+    # 프로세스 시작 비용은 빼고 잰다
+    worker.submit(frames[0], os.path.join(folder, f"warmup.{file_format}"),
+                  file_format=file_format, profile=profile)
+    worker.join()
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        worker.submit(frame, os.path.join(folder, f"frame_{i:05d}.{file_format}"),
+                      on_done=lambda path, size, result: done.append(path),
+                      file_format=file_format, profile=profile)
+    worker.join()
+    elapsed = time.perf_counter() - start
+    worker.poll()
+    worker.shutdown()
+    expected = [os.path.join(folder, f"frame_{i:05d}.{file_format}") for i in range(len(frames))]
+    return elapsed, done == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--size", default="3840x2160")
+    parser.add_argument("--format", default="png")
+    parser.add_argument("--profile", default="balanced")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    backend = SyntheticBackend(width, height)
+    frames = [backend.grab() for _ in range(args.frames)]
+
+    print(f"{args.frames}프레임 {width}x{height} {args.format.upper()} ({args.profile}), "
+          f"CPU {os.cpu_count()}개")
+    print(f"{'워커':<24}{'시간(s)':>10}{'FPS':>10}{'배율':>8}  순서")
+    baseline = None
+    cases = [("스레드 1", lambda: SaveWorker(max_pending=8))]
+    for n in worker_counts(args.max_workers):
+        cases.append((f"프로세스 {n} (pickle)", lambda n=n: ProcessSaveWorker(max_pending=8, processes=n)))
+        cases.append((f"프로세스 {n} (공유 메모리)", lambda n=n: ProcessSaveWorker(
+            max_pending=8, processes=n,
+            ring=SharedFrameRing(slots=n * 2 + 2, slot_size=width * height * 4))))
+
+    for name, make in cases:
+        folder = tempfile.mkdtemp(prefix="bench_encode_")
+        worker = make()
+        try:
+            elapsed, ordered = run(worker, frames, folder, args.format, args.profile)
+        finally:
+            if getattr(worker, "ring", None):
+                worker.ring.close()
+            shutil.rmtree(folder, ignore_errors=True)
+        fps = args.frames / elapsed
+        baseline = baseline or fps
+        print(f"{name:<24}{elapsed:>10.2f}{fps:>10.1f}{fps / baseline:>7.2f}x  "
+              f"{'OK' if ordered else '뒤섞임'}")
+
+
+if __name__ == "__main__":
+    main()
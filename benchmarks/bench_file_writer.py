@@ -0,0 +1,110 @@
+"""작은 파일 연속 저장 처리량 벤치마크
+
+    python benchmarks/bench_file_writer.py [--count 2000] [--size-kb 40] [--folder D:/tmp]
+
+미리 만든 PNG 바이트를 파일 count개로 계속 저장하면서 방식별 초당 파일 수,
+MB/s, 파일당 지연(p50/p99)을 잰다. 예전 방식(초 단위 이름, 매번 exists+makedirs,
+제자리 쓰기)은 같은 초에 저장한 파일이 서로 덮여 남은 파일 수도 함께 보여 준다.
+
+fsync 비용은 실제 디스크에서만 의미가 있으므로 --folder로 측정할 폴더를 고를 수
+있다 (기본은 임시 폴더, tmpfs면 fsync가 거의 공짜로 나온다).
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filestore import SyncPolicy, ensure_folder, write_atomic  # noqa: E402
+from pipeline import capture_filename  # noqa: E402
+
+
+def make_png(size_kb, side=512):
+    """대략 size_kb 크기의 PNG 바이트 (위쪽 행만 노이즈라 그만큼만 압축되지 않는다)"""
+    pixels = np.full((side, side, 3), 240, dtype=np.uint8)
+    rows = min(side, -(-size_kb * 1024 // (side * 3)))
+    pixels[:rows] = np.random.default_rng(0).integers(0, 256, (rows, side, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def old_write(folder, data):
+    """예전 방식: 초 단위 이름, 매번 폴더 확인, 제자리 쓰기"""
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(folder, f"screenshot_full_{timestamp}.png")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def new_write(folder, data, sync):
+    """충돌 없는 이름 + 임시 파일 후 옮기기 + fsync 정책"""
+    path = write_atomic(capture_filename(folder, "screenshot", "full", "png"), data, sync.per_file)
+    sync.written(path)
+    return path
+
+
+def run(name, write, count, data):
+    """count개 저장: (이름, 파일당 시간 ms 목록, 전체 시간 초)"""
+    samples = []
+    start = time.perf_counter()
+    for _ in range(count):
+        begin = time.perf_counter()
+        write(data)
+        samples.append((time.perf_counter() - begin) * 1000)
+    return name, samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작은 파일 연속 저장 처리량 벤치마크")
+    parser.add_argument("--count", type=int, default=2000, help="방식마다 저장할 파일 수 (기본 2000)")
+    parser.add_argument("--size-kb", type=int, default=40, help="파일 하나 크기 KB (기본 40)")
+    parser.add_argument("--folder", help="측정할 폴더 (기본: 임시 폴더, 끝나면 지운다)")
+    args = parser.parse_args()
+
+    data = make_png(args.size_kb)
+    base = tempfile.mkdtemp(dir=args.folder)
+    print(f"파일 {args.count}개 x {len(data) / 1024:.0f}KB, 폴더: {base}")
+    print(f"\n{'방식':<28}{'파일/초':>10}{'MB/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'남은 파일':>10}")
+
+    methods = [("제자리 쓰기 (예전 방식)", None)]
+    methods += [(f"임시 파일+옮기기, fsync {label}", policy) for label, policy in (
+        ("안 함", SyncPolicy("none")),
+        ("256장마다", SyncPolicy("batch", every_files=256, every_ms=1000)),
+        ("32장마다", SyncPolicy("batch", every_files=32, every_ms=1000)),
+        ("파일마다", SyncPolicy("file")),
+    )]
+    try:
+        for index, (label, policy) in enumerate(methods):
+            folder = os.path.join(base, str(index))
+            if policy is None:
+                result = run(label, lambda data: old_write(folder, data), args.count, data)
+            else:
+                ensure_folder(folder)
+                result = run(label, lambda data: new_write(folder, data, policy), args.count, data)
+                # 남은 묶음까지 기록해야 같은 조건
+                start = time.perf_counter()
+                policy.flush()
+                result = result[:2] + (result[2] + time.perf_counter() - start,)
+            name, samples, elapsed = result
+            files = len(os.listdir(folder))
+            print(f"{name:<28}{args.count / elapsed:>10.0f}{args.count * len(data) / elapsed / 1e6:>9.1f}"
+                  f"{statistics.median(samples):>9.3f}{np.percentile(samples, 99):>9.3f}{files:>10}")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
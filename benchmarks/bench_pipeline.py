@@ -0,0 +1,295 @@
+"""캡쳐 파이프라인 단계별 벤치마크 (결과 파일 저장 / 두 결과 비교)
+
+    python benchmarks/bench_pipeline.py -o base.json
+    python benchmarks/bench_pipeline.py -o new.json --sizes 1080p,4K --contents text
+    python benchmarks/bench_pipeline.py --compare base.json new.json [--threshold 0.1]
+
+디스플레이 없이 돌도록, 미리 만든 BGRX 프레임을 돌려주는 가짜 백엔드를 쓴다.
+프레임 크기(720p ~ 4K 세 대 가상 데스크톱)와 화면 내용(평평한 UI, 사진 같은
+노이즈, 텍스트)마다 다음 단계를 잰다.
+  - grab: 가짜 백엔드 grab_raw (원시 버퍼 복사)
+  - convert: BGRX -> RGB 이미지 변환
+  - crop: 가운데 절반 영역 잘라내기
+  - encode_<포맷>_<프로파일>: 메모리로 인코딩 (encoding.save_options 사용)
+  - write_<포맷>: 인코딩된 바이트를 파일로 쓰기
+같은 seed면 항상 같은 프레임을 만들므로, 같은 기계에서 두 번 돌린 결과를
+--compare로 비교할 수 있다. 중앙값이 threshold 이상 느려진 항목이 있으면
+종료 코드 1을 돌려준다.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL  # noqa: E402
+from backends import CaptureBackend  # noqa: E402
+from encoding import PROFILES, save_options, webp_available  # noqa: E402
+
+# (이름, 가로, 세로)
+SIZES = [
+    ("720p", 1280, 720),
+    ("1080p", 1920, 1080),
+    ("1440p", 2560, 1440),
+    ("4K", 3840, 2160),
+    ("3x4K", 11520, 2160),
+]
+
+CONTENTS = ("ui", "photo", "text")
+FORMATS = ("png", "jpeg", "webp", "bmp")
+
+RESULT_VERSION = 1
+
+
+def make_ui(width, height, seed):
+    """평평한 색 사각형(창, 버튼, 사이드바)으로 된 UI 화면"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    palette = [(255, 255, 255), (33, 150, 243), (76, 175, 80), (255, 152, 0),
+               (96, 125, 139), (224, 224, 224), (30, 30, 30)]
+    for _ in range(max(20, width * height // 40000)):
+        w = rng.randint(40, max(41, width // 3))
+        h = rng.randint(20, max(21, height // 3))
+        x = rng.randint(0, width - w)
+        y = rng.randint(0, height - h)
+        draw.rectangle((x, y, x + w, y + h), fill=rng.choice(palette), outline=(180, 180, 180))
+    return image
+
+
+def make_photo(width, height, seed):
+    """부드러운 그라디언트에 노이즈를 더한 사진 같은 화면"""
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    base = np.stack([255 * x * np.ones_like(y), 255 * y * np.ones_like(x),
+                     128 + 100 * np.sin(6 * x + 4 * y)], axis=-1)
+    noise = rng.normal(0, 18, (height, width, 3)).astype(np.float32)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), "RGB")
+
+
+def make_text(width, height, seed):
+    """흰 바탕에 글자가 가득한 문서/코드 편집기 같은 화면 (타일을 반복)"""
+    rng = random.Random(seed)
+    tile = Image.new("RGB", (640, 360), (255, 255, 255))
+    draw = ImageDraw.Draw(tile)
+    words = ["def", "return", "capture", "image", "self", "None", "backend", "frame",
+             "import", "save", "queue", "for", "in", "if", "else", "bbox", "monitor"]
+    for row in range(0, 360, 14):
+        indent = rng.choice((4, 4, 20, 36))
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+        color = rng.choice(((0, 0, 0), (0, 0, 160), (160, 0, 0), (0, 110, 0)))
+        draw.text((indent, row), line, fill=color)
+    image = Image.new("RGB", (width, height))
+    for top in range(0, height, tile.height):
+        for left in range(0, width, tile.width):
+            image.paste(tile, (left, top))
+    return image
+
+
+GENERATORS = {"ui": make_ui, "photo": make_photo, "text": make_text}
+
+
+class FrameBackend(CaptureBackend):
+    """미리 만든 BGRX 버퍼를 돌려주는 가짜 백엔드 (win32 GetBitmapBits와 같은 형식)"""
+    name = "bench"
+
+    def __init__(self, image):
+        self.size = image.size
+        self.buffer = image.convert("RGBX").tobytes("raw", "BGRX")
+
+    def grab_raw(self, bbox=None):
+        # 실제 백엔드처럼 매번 새 버퍼를 만든다
+        return bytearray(self.buffer), self.size, "BGRX"
+
+    def grab(self, bbox=None):
+        data, size, rawmode = self.grab_raw(bbox)
+        return Image.frombuffer("RGB", size, data, "raw", rawmode, 0, 1)
+
+
+def measure(func, repeat, budget):
+    """func를 repeat번(시간이 budget초를 넘으면 더 일찍 멈춤) 실행한 시간(ms) 목록과 마지막 반환값"""
+    samples = []
+    result = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() - started > budget:
+            break
+    return samples, result
+
+
+def encode(image, file_format, profile):
+    """메모리로 인코딩한 바이트"""
+    buffer = io.BytesIO()
+    image.save(buffer, file_format.upper(), **save_options(file_format, profile))
+    return buffer.getvalue()
+
+
+def write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def run_suite(args):
+    """선택한 모든 항목을 재고 결과 목록 반환"""
+    sizes = [s for s in SIZES if s[0] in args.sizes]
+    formats = [f for f in args.formats if f != "webp" or webp_available()]
+    results = []
+
+    def add(case, samples, nbytes=None):
+        record = {"case": case, "median_ms": statistics.median(samples), "min_ms": min(samples),
+                  "samples": len(samples)}
+        if nbytes is not None:
+            record["bytes"] = nbytes
+        results.append(record)
+        extra = f"{nbytes / 1024:>10.1f}KB" if nbytes is not None else ""
+        print(f"{case:<40}{record['median_ms']:>10.2f}{record['min_ms']:>10.2f}{len(samples):>5}{extra}",
+              flush=True)
+
+    print(f"{'항목':<40}{'중앙값':>10}{'최소':>10}{'횟수':>5}  (ms)")
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as folder:
+        for size_name, width, height in sizes:
+            for content in args.contents:
+                image = GENERATORS[content](width, height, args.seed)
+                backend = FrameBackend(image)
+                prefix = f"{size_name}/{content}"
+
+                samples, raw = measure(lambda: backend.grab_raw(), args.repeat, args.budget)
+                add(f"{prefix}/grab", samples)
+                data, frame_size, rawmode = raw
+                samples, rgb = measure(lambda: Image.frombuffer("RGB", frame_size, data, "raw", rawmode, 0, 1),
+                                       args.repeat, args.budget)
+                add(f"{prefix}/convert", samples)
+                box = (width // 4, height // 4, width * 3 // 4, height * 3 // 4)
+                samples, _ = measure(lambda: rgb.crop(box).load(), args.repeat, args.budget)
+                add(f"{prefix}/crop", samples)
+
+                for file_format in formats:
+                    profiles = [None] if file_format == "bmp" else args.profiles
+                    encoded = None
+                    for profile in profiles:
+                        samples, encoded = measure(lambda: encode(rgb, file_format, profile),
+                                                   args.repeat, args.budget)
+                        add(f"{prefix}/encode_{file_format}" + (f"_{profile}" if profile else ""),
+                            samples, len(encoded))
+                    path = os.path.join(folder, f"frame.{file_format}")
+                    samples, _ = measure(lambda: write_file(path, encoded), args.repeat, args.budget)
+                    add(f"{prefix}/write_{file_format}", samples)
+                del image, backend, raw, data, rgb
+    return results
+
+
+def environment():
+    """결과를 비교할 때 확인할 실행 환경"""
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(base_path, new_path, threshold, min_delta_ms):
+    """두 결과 파일 비교, 느려진 항목 수 반환"""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    if base.get("environment") != new.get("environment"):
+        print("주의: 두 결과의 실행 환경이 다릅니다.")
+        for key in sorted(set(base.get("environment", {})) | set(new.get("environment", {}))):
+            a, b = base.get("environment", {}).get(key), new.get("environment", {}).get(key)
+            if a != b:
+                print(f"  {key}: {a} -> {b}")
+
+    base_results = {r["case"]: r for r in base["results"]}
+    regressions = improvements = 0
+    print(f"{'항목':<40}{'이전':>10}{'이후':>10}{'변화':>9}")
+    for record in new["results"]:
+        old = base_results.get(record["case"])
+        if old is None:
+            continue
+        before, after = old["median_ms"], record["median_ms"]
+        change = (after - before) / before if before else 0.0
+        mark = ""
+        if change > threshold and after - before > min_delta_ms:
+            mark = "  느려짐"
+            regressions += 1
+        elif change < -threshold and before - after > min_delta_ms:
+            mark = "  빨라짐"
+            improvements += 1
+        print(f"{record['case']:<40}{before:>10.2f}{after:>10.2f}{change:>+9.1%}{mark}")
+    missing = sorted(set(base_results) - {r["case"] for r in new["results"]})
+    if missing:
+        print(f"이후 결과에 없는 항목 {len(missing)}개")
+    print(f"느려진 항목: {regressions}개, 빨라진 항목: {improvements}개 (기준 {threshold:.0%})")
+    return regressions
+
+
+def _csv(choices):
+    def parse(text):
+        values = [v.strip() for v in text.split(",") if v.strip()]
+        unknown = [v for v in values if v not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"알 수 없는 값: {', '.join(unknown)} (사용 가능: {', '.join(choices)})")
+        return values
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캡쳐 파이프라인 단계별 벤치마크")
+    parser.add_argument("-o", "--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--sizes", type=_csv([s[0] for s in SIZES]), default=[s[0] for s in SIZES],
+                        help="프레임 크기 (쉼표 구분, 기본 전부)")
+    parser.add_argument("--contents", type=_csv(CONTENTS), default=list(CONTENTS),
+                        help="화면 내용 (ui, photo, text)")
+    parser.add_argument("--formats", type=_csv(FORMATS), default=list(FORMATS), help="인코딩 포맷")
+    parser.add_argument("--profiles", type=_csv(list(PROFILES)), default=["balanced"],
+                        help="인코딩 프로파일 (기본 balanced)")
+    parser.add_argument("--repeat", type=int, default=7, help="항목별 반복 횟수 (기본 7)")
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="항목별 최대 측정 시간(초), 넘으면 반복을 줄인다 (기본 5)")
+    parser.add_argument("--seed", type=int, default=0, help="프레임 생성 seed")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 파일 비교")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="느려짐으로 볼 중앙값 증가 비율 (기본 0.10)")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                        help="이보다 작은 차이(ms)는 무시 (기본 0.5)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold, args.min_delta) else 0)
+
+    started = time.time()
+    results = run_suite(args)
+    if args.output:
+        report = {
+            "version": RESULT_VERSION,
+            "started": started,
+            "environment": environment(),
+            "options": {"repeat": args.repeat, "budget": args.budget, "seed": args.seed,
+                        "profiles": args.profiles},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""영역 선택 드래그 그리기 비용 벤치마크 (디스플레이 필요)
+
+    python benchmarks/bench_region_drag.py [--seconds 2] [--rates 60,250,1000,4000]
+
+전체 화면 선택 창을 띄우고, 초당 이벤트 수(마우스 폴링 속도)를 바꿔 가며
+드래그 이벤트를 흉내 낸다. 두 방식의 CPU 사용량과 그리기 횟수를 비교한다.
+  - 이전 방식: 이벤트마다 점묘 채우기 사각형을 지우고 새로 만든다
+  - 현재 방식: RegionSelector.on_drag (한 항목의 좌표만 바꾸고 주사율 간격으로 모아 그림)
+현재 방식은 이벤트가 늘어도 그리기 횟수와 CPU 사용량이 거의 그대로여야 한다.
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import RegionSelector  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+
+class LegacyDrag:
+    """예전 on_drag: 이벤트마다 사각형 삭제 후 다시 생성"""
+
+    def __init__(self, selector):
+        self.selector = selector
+        self.rect_id = None
+        self.paints = 0
+
+    def on_drag(self, event):
+        canvas = self.selector.canvas
+        if self.rect_id:
+            canvas.delete(self.rect_id)
+        self.rect_id = canvas.create_rectangle(
+            self.selector.start_x, self.selector.start_y, event.x, event.y,
+            outline='red', width=3, fill='red', stipple='gray50')
+        self.paints += 1
+
+
+def drive(root, on_drag, rate, seconds, width, height):
+    """rate(Hz)로 seconds초 동안 드래그 이벤트를 보내고 (이벤트 수, CPU 시간) 반환"""
+    interval = 1.0 / rate
+    events = 0
+    cpu_start = time.process_time()
+    start = next_time = time.perf_counter()
+    while next_time - start < seconds:
+        t = (next_time - start) / seconds
+        # 화면을 대각선으로 가로지르는 드래그
+        on_drag(SimpleNamespace(x=int(20 + t * (width - 40)), y=int(20 + t * (height - 40)), state=0))
+        events += 1
+        root.update()
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    root.update()
+    return events, time.process_time() - cpu_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영역 선택 드래그 그리기 비용 벤치마크")
+    parser.add_argument("--seconds", type=float, default=2.0, help="측정할 드래그 시간 (기본 2초)")
+    parser.add_argument("--rates", default="60,250,1000,4000", help="초당 이벤트 수 (쉼표 구분)")
+    args = parser.parse_args()
+    rates = [int(r) for r in args.rates.split(",")]
+
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'방식':<8}{'이벤트/s':>10}{'이벤트':>8}{'그리기':>8}{'CPU %':>8}{'그리기 p95 ms':>16}")
+    for rate in rates:
+        for name in ("이전", "현재"):
+            selector = RegionSelector(root, lambda region: None)
+            selector.start_selection()
+            root.update()
+            width = selector.canvas.winfo_width()
+            height = selector.canvas.winfo_height()
+            selector.on_click(SimpleNamespace(x=10, y=10, state=0))
+            METRICS.reset()
+            if name == "이전":
+                legacy = LegacyDrag(selector)
+                events, cpu = drive(root, legacy.on_drag, rate, args.seconds, width, height)
+                paints, p95 = legacy.paints, "-"
+            else:
+                events, cpu = drive(root, selector.on_drag, rate, args.seconds, width, height)
+                paints = selector.paints
+                summary = METRICS.snapshot().get("select_paint", {})
+                p95 = f"{summary['p95'] * 1000:.2f}" if summary.get("count") else "-"
+            selector.selection_window.destroy()
+            print(f"{name:<8}{rate:>10}{events:>8}{paints:>8}{cpu / args.seconds * 100:>8.1f}{p95:>16}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""지각 해시 인덱스 벤치마크
+
+    python benchmarks/bench_similar.py [--count 100000] [--queries 200]
+
+임의의 지문 count개(일부는 몇 비트만 다른 거의 같은 캡쳐)로 인덱스 파일을 만들고
+인덱스 읽기, 비슷한 캡쳐 찾기(multi-index vs 전체 비교), 거의 같은 캡쳐 묶기,
+지문 계산 처리량을 잰다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similar import (GROUP_DISTANCE, SEARCH_DISTANCE, SimilarityIndex, dhash_batch,  # noqa: E402
+                     phash_batch, popcount)
+
+
+def make_hashes(count, duplicate_ratio, rng):
+    """임의 해시와, 그중 일부를 1~3비트 바꾼 거의 같은 해시"""
+    hashes = rng.integers(0, 2 ** 63, count, dtype=np.uint64) << np.uint64(1)
+    duplicates = int(count * duplicate_ratio)
+    source = rng.integers(0, count - duplicates, duplicates)
+    flips = np.zeros(duplicates, dtype=np.uint64)
+    for _ in range(3):
+        flips |= np.uint64(1) << rng.integers(0, 64, duplicates).astype(np.uint64)
+    hashes[count - duplicates:] = hashes[source] ^ flips
+    return hashes
+
+
+def median_ms(func, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지각 해시 인덱스 벤치마크")
+    parser.add_argument("--count", type=int, default=100000, help="인덱스 항목 수 (기본 100000)")
+    parser.add_argument("--queries", type=int, default=200, help="찾기 질의 수 (기본 200)")
+    parser.add_argument("--duplicates", type=float, default=0.05, help="거의 같은 캡쳐 비율 (기본 0.05)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    phashes = make_hashes(args.count, args.duplicates, rng)
+    dhashes = make_hashes(args.count, args.duplicates, rng)
+
+    with tempfile.TemporaryDirectory() as folder:
+        index = SimilarityIndex(folder)
+        index._append([(f"capture_{i:07d}.png", int(p), int(d), float(i))
+                       for i, (p, d) in enumerate(zip(phashes, dhashes))])
+        size = os.path.getsize(index.path)
+
+        start = time.perf_counter()
+        index = SimilarityIndex(folder)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        index._arrays("phash")
+        build = time.perf_counter() - start
+        print(f"항목 {len(index)}개, 인덱스 파일 {size / 1024 / 1024:.1f}MB")
+        print(f"인덱스 읽기: {load * 1000:.0f}ms, 조각 색인 만들기: {build * 1000:.0f}ms")
+
+        names = [f"capture_{i:07d}.png" for i in rng.integers(0, args.count, args.queries)]
+        paths = [os.path.join(folder, name) for name in names]
+        print(f"\n{'찾기':<24}{'거리':>6}{'중앙값 ms':>12}")
+        for distance in (GROUP_DISTANCE, SEARCH_DISTANCE, 11):
+            ms = median_ms(lambda path: index.search(path, distance, limit=50), paths)
+            print(f"{'multi-index':<24}{distance:>6}{ms:>12.3f}")
+        brute = median_ms(lambda name: np.flatnonzero(popcount(phashes ^ np.uint64(index._entries[name][0]))
+                                                      <= SEARCH_DISTANCE), names)
+        print(f"{'전체 비교 (XOR+popcount)':<24}{SEARCH_DISTANCE:>6}{brute:>12.3f}")
+
+        start = time.perf_counter()
+        groups = index.groups(GROUP_DISTANCE)
+        print(f"\n거의 같은 캡쳐 묶기 (거리 {GROUP_DISTANCE}): {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"묶음 {len(groups)}개 ({sum(len(g) for g in groups)}장)")
+
+    samples = rng.integers(0, 256, (256, 32, 32)).astype(np.float32)
+    start = time.perf_counter()
+    phash_batch(samples)
+    dhash_batch(samples)
+    elapsed = time.perf_counter() - start
+    print(f"지문 계산 (축소 이미지 {len(samples)}장 한 번에): {elapsed * 1000:.1f}ms "
+          f"({len(samples) / elapsed:.0f}장/초, 파일 읽기/축소 제외)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,132 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
-import pyautogui
-from datetime import datetime
 import os
+import queue
+import sys
 import threading
+import time
 
-# 모니터 정보를 위한 import
-try:
-    import screeninfo
-    SCREENINFO_AVAILABLE = True
-except ImportError:
-    SCREENINFO_AVAILABLE = False
-    print("screeninfo 패키지가 없습니다. pip install screeninfo로 설치하면 개별 모니터 캡쳐가 가능합니다.")
+from backends import create_backend, enable_dpi_awareness
+from dedup import FrameDeduplicator, sample_hash
+from filestore import SyncPolicy, ensure_folder
+from gallery import GalleryWindow, ThumbnailCache
+from metrics import METRICS
+from monitors import (MonitorTopology, default_geometry_probe, detect_monitors, intersect_rects,
+                      monitor_rect)
+from pipeline import ProcessSaveWorker, SaveWorker, capture_filename
+from scheduler import FrameScheduler
+from sequence import SequenceSink
+from shared_frames import SharedFrameRing
+from spool import RawSpool, export_frames
 
-# Windows API 사용을 위한 import
-try:
-    import win32gui
-    import win32api
-    import win32con
-    import win32ui
-    WIN32_AVAILABLE = True
-except ImportError:
-    WIN32_AVAILABLE = False
-    print("pywin32 패키지가 없습니다. pip install pywin32로 설치하면 더 정확한 모니터 감지가 가능합니다.")
+# 중복 프레임 처리 방식 (콤보박스 표시 이름 -> FrameDeduplicator mode)
+DEDUP_MODES = {
+    "저장": None,
+    "건너뛰기": "skip",
+    "참조로 기록": "reference",
+}
+
+# 연속 캡쳐 저장 방식 (표시 이름 -> (시퀀스 포맷, 확장자)), None이면 개별 파일
+BURST_OUTPUTS = {
+    "개별 파일": None,
+    "APNG (애니메이션)": ("apng", "png"),
+    "WebP (애니메이션)": ("webp", "webp"),
+    "GIF (애니메이션)": ("gif", "gif"),
+    "RAW (무압축 프레임)": ("raw", "capraw"),
+    "타일 아카이브 (바뀐 부분만)": ("tiles", "captiles"),
+    "RAW 스풀 (녹화 후 압축)": ("spool", "capspool"),
+}
+
+# 저장한 파일을 디스크에 기록(fsync)하는 시점 (표시 이름 -> SyncPolicy mode)
+FSYNC_POLICIES = {
+    "운영체제에 맡김 (가장 빠름)": "none",
+    "모아서 기록 (32장 또는 1초마다)": "batch",
+    "파일마다 기록 (가장 안전)": "file",
+}
+
+# 멀티코어 인코딩 공유 메모리 링의 최대 크기 (슬롯 수 * 캡쳐 영역 크기)
+FRAME_RING_MEMORY = 512 * 1024 * 1024
+
+# 창을 숨긴 뒤 캡쳐 준비 확인 간격과 기본 최대 대기 시간 (ms)
+READY_POLL_MS = 15
+HIDE_WAIT_MAX_MS = 1000
+
+# 인코딩 프로파일 (콤보박스 표시 이름 -> encoding.PROFILES 키)
+ENCODE_PROFILES = {
+    "빠르게": "fastest",
+    "균형": "balanced",
+    "작게": "smallest",
+}
+
+def display_refresh_rate():
+    """주 모니터 주사율(Hz), 알 수 없으면 None"""
+    try:
+        import win32api
+        return win32api.EnumDisplaySettings(None, -1).DisplayFrequency or None
+    except Exception:
+        return None
 
 class RegionSelector:
-    def __init__(self, parent_root, callback):
+    """전체 화면 창에서 마우스 드래그로 영역 선택
+
+    grab을 주면 선택을 시작할 때 화면을 한 번 캡쳐해 고정된 배경으로 보여주고
+    (정지 화면 모드), 선택이 끝나면 그 프레임에서 잘라낸 이미지를
+    selected_image에 남긴다. 보이던 화면과 저장되는 화면이 같고 다시 캡쳐하지 않는다.
+    이때 callback에 넘기는 영역은 캡쳐 픽셀 좌표에 origin을 더한 가상 데스크톱 좌표다.
+    
+    드래그 중에는 사각형과 크기/좌표 표시를 새로 만들지 않고 좌표만 바꾸며,
+    마우스 이벤트가 아무리 많이 와도 화면 주사율 간격으로 한 번만 그린다.
+    snap_rects(가상 데스크톱 좌표의 모니터 사각형)를 주면 모서리가 모니터
+    경계 근처에서 경계에 붙는다 (Shift를 누르고 있으면 붙지 않음).
+    그리는 데 걸린 시간은 METRICS의 select_paint, 이벤트부터 그리기까지는
+    select_latency로 기록된다.
+    """
+    
+    # 정지 화면 위에 덮는 어둡기 (1.0이면 원래 밝기)
+    FROZEN_DIM = 0.6
+    # 주사율을 알 수 없을 때 드래그 중 다시 그리는 빈도
+    DEFAULT_REFRESH_HZ = 60
+    # 모니터 경계에 붙는 거리 (화면 좌표 픽셀)
+    SNAP_DISTANCE = 8
+    
+    def __init__(self, parent_root, callback, grab=None, origin=(0, 0), snap_rects=None,
+                 refresh_hz=None):
         self.parent_root = parent_root
         self.callback = callback
+        self.grab = grab
+        self.origin = origin
+        self.snap_rects = snap_rects or []
+        refresh_hz = refresh_hz or display_refresh_rate() or self.DEFAULT_REFRESH_HZ
+        self.refresh_ms = max(1, int(1000 / refresh_hz))
         self.start_x = None
         self.start_y = None
         self.rect_id = None
+        self.readout_id = None
+        self.snap_x = []
+        self.snap_y = []
+        # 아직 그리지 않은 마지막 드래그 위치 (x, y, Shift 여부, 받은 시각)
+        self._pending = None
+        self._paint_scheduled = False
+        self.drag_events = 0
+        self.paints = 0
         self.selection_window = None
         self.canvas = None
+        self.frozen_frame = None
+        self.frozen_photo = None
+        self.selected_image = None
+        self.scale = (1.0, 1.0)
         
     def start_selection(self):
         """영역 선택 시작"""
         try:
-            # 전체 화면 크기의 반투명한 창 생성
+            if self.grab is not None:
+                # 창을 띄우기 전에 화면을 한 번만 캡쳐해 둔다
+                self.frozen_frame = self.grab()
+            
+            # 전체 화면 크기의 창 생성 (정지 화면이 없으면 반투명)
             self.selection_window = tk.Toplevel(self.parent_root)
             self.selection_window.attributes('-fullscreen', True)
-            self.selection_window.attributes('-alpha', 0.3)
+            self.selection_window.attributes('-alpha', 1.0 if self.frozen_frame else 0.3)
             self.selection_window.attributes('-topmost', True)
             self.selection_window.configure(bg='gray')
             self.selection_window.overrideredirect(True)
@@ -57,6 +143,16 @@ class RegionSelector:
                                    bg='gray')
             self.canvas.pack(fill='both', expand=True)
             
+            if self.frozen_frame is not None:
+                self._show_frozen_frame(screen_width, screen_height)
+            self._init_snap_lines()
+            
+            # 드래그 중 계속 재사용하는 선택 사각형과 크기/좌표 표시
+            self.rect_id = self.canvas.create_rectangle(0, 0, 0, 0, outline='red', width=2,
+                                                        state='hidden')
+            self.readout_id = self.canvas.create_text(0, 0, anchor='nw', fill='white',
+                                                      font=('Arial', 10, 'bold'), state='hidden')
+            
             # 마우스 이벤트 바인딩
             self.canvas.bind('<Button-1>', self.on_click)
             self.canvas.bind('<B1-Motion>', self.on_drag)
@@ -76,47 +172,134 @@ class RegionSelector:
             
         except Exception as e:
             print(f"영역 선택 초기화 오류: {e}")
+            if self.selection_window:
+                self.selection_window.destroy()
             self.callback(None)
     
+    def _show_frozen_frame(self, screen_width, screen_height):
+        """캡쳐한 프레임을 화면 크기에 맞춰(필요하면 축소) 어둡게 배경으로 표시"""
+        from PIL import Image, ImageEnhance, ImageTk
+        frame = self.frozen_frame
+        display = frame
+        if frame.size != (screen_width, screen_height):
+            # DPI 배율 등으로 캡쳐 픽셀과 화면 좌표 크기가 다르면 화면 크기로 줄여 보여준다
+            display = frame.resize((screen_width, screen_height), Image.Resampling.BILINEAR,
+                                   reducing_gap=2.0)
+        self.scale = (frame.width / screen_width, frame.height / screen_height)
+        display = ImageEnhance.Brightness(display).enhance(self.FROZEN_DIM)
+        self.frozen_photo = ImageTk.PhotoImage(display)
+        self.canvas.create_image(0, 0, image=self.frozen_photo, anchor='nw')
+    
+    def _frame_box(self, x1, y1, x2, y2):
+        """화면 좌표 사각형을 정지 프레임의 픽셀 좌표로"""
+        sx, sy = self.scale
+        frame = self.frozen_frame
+        return (max(0, round(x1 * sx)), max(0, round(y1 * sy)),
+                min(frame.width, round(x2 * sx)), min(frame.height, round(y2 * sy)))
+    
+    def _init_snap_lines(self):
+        """모니터 경계를 화면(캔버스) 좌표의 세로선/가로선 목록으로"""
+        sx, sy = self.scale
+        left, top = self.origin
+        self.snap_x = sorted({(x - left) / sx for r in self.snap_rects for x in (r[0], r[2])})
+        self.snap_y = sorted({(y - top) / sy for r in self.snap_rects for y in (r[1], r[3])})
+    
+    def _snap(self, x, y, shift=False):
+        """가까운 모니터 경계로 붙인 좌표"""
+        if shift:
+            return x, y
+        return self._snap_value(x, self.snap_x), self._snap_value(y, self.snap_y)
+    
+    def _snap_value(self, value, lines):
+        nearest = min(lines, key=lambda line: abs(line - value), default=None)
+        if nearest is not None and abs(nearest - value) <= self.SNAP_DISTANCE:
+            return round(nearest)
+        return value
+    
     def on_click(self, event):
         """마우스 클릭 시작"""
-        self.start_x = event.x
-        self.start_y = event.y
+        self.start_x, self.start_y = self._snap(event.x, event.y, event.state & 0x1)
+        self._pending = None
         
-        # 기존 사각형 제거
-        if self.rect_id:
-            self.canvas.delete(self.rect_id)
+        # 이전 선택 숨기기
+        self.canvas.itemconfigure(self.rect_id, state='hidden')
+        self.canvas.itemconfigure(self.readout_id, state='hidden')
     
     def on_drag(self, event):
-        """마우스 드래그 중"""
-        if self.start_x is not None and self.start_y is not None:
-            # 기존 사각형 제거
-            if self.rect_id:
-                self.canvas.delete(self.rect_id)
-            
-            # 새 사각형 그리기
-            self.rect_id = self.canvas.create_rectangle(
-                self.start_x, self.start_y, event.x, event.y,
-                outline='red', width=3, fill='red', stipple='gray50'
-            )
+        """마우스 드래그 중 (위치만 기억하고 그리기는 주사율 간격으로 모아서)"""
+        if self.start_x is None or self.start_y is None:
+            return
+        self.drag_events += 1
+        self._pending = (event.x, event.y, event.state & 0x1, time.perf_counter())
+        if not self._paint_scheduled:
+            self._paint_scheduled = True
+            self.canvas.after(self.refresh_ms, self._paint)
+    
+    def _paint(self):
+        """마지막 드래그 위치로 사각형과 크기/좌표 표시 갱신"""
+        self._paint_scheduled = False
+        if self._pending is None or self.start_x is None or not self.canvas.winfo_exists():
+            return
+        x, y, shift, received = self._pending
+        self._pending = None
+        start = time.perf_counter()
+        
+        x, y = self._snap(x, y, shift)
+        self.canvas.coords(self.rect_id, self.start_x, self.start_y, x, y)
+        x1, y1, x2, y2 = self._output_box(self.start_x, self.start_y, x, y)
+        self.canvas.itemconfigure(self.readout_id, text=f"{x2 - x1} x {y2 - y1}  ({x1}, {y1})",
+                                  state='normal')
+        # 표시는 커서 오른쪽 아래에 두되 화면 밖으로 나가지 않게
+        text_x = min(x + 14, self.canvas.winfo_width() - 160)
+        text_y = min(y + 14, self.canvas.winfo_height() - 24)
+        self.canvas.coords(self.readout_id, text_x, text_y)
+        self.canvas.itemconfigure(self.rect_id, state='normal')
+        # 여기서 실제로 다시 그려야 그리기 비용까지 잴 수 있다
+        self.canvas.update_idletasks()
+        
+        self.paints += 1
+        now = time.perf_counter()
+        METRICS.record("select_paint", now - start)
+        METRICS.record("select_latency", now - received)
+    
+    def _output_box(self, x1, y1, x2, y2):
+        """화면 좌표 두 점을 저장될 영역(가상 데스크톱 픽셀 좌표)으로"""
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        if self.frozen_frame is not None:
+            x1, y1, x2, y2 = self._frame_box(x1, y1, x2, y2)
+            left, top = self.origin
+            return x1 + left, y1 + top, x2 + left, y2 + top
+        return x1, y1, x2, y2
     
     def on_release(self, event):
         """마우스 버튼 릴리즈"""
         if self.start_x is not None and self.start_y is not None:
-            # 선택 영역 계산
-            x1 = min(self.start_x, event.x)
-            y1 = min(self.start_y, event.y)
-            x2 = max(self.start_x, event.x)
-            y2 = max(self.start_y, event.y)
+            # 선택 영역 계산 (그려진 사각형과 같게 경계에 붙인다)
+            end_x, end_y = self._snap(event.x, event.y, event.state & 0x1)
+            self._pending = None
+            x1 = min(self.start_x, end_x)
+            y1 = min(self.start_y, end_y)
+            x2 = max(self.start_x, end_x)
+            y2 = max(self.start_y, end_y)
             
             # 최소 크기 체크
             if abs(x2 - x1) > 10 and abs(y2 - y1) > 10:
                 self.selection_window.destroy()
+                if self.frozen_frame is not None:
+                    # 보이던 프레임에서 그대로 잘라낸다 (다시 캡쳐하지 않음)
+                    box = self._frame_box(x1, y1, x2, y2)
+                    with METRICS.stage("crop"):
+                        self.selected_image = self.frozen_frame.crop(box)
+                    self.frozen_frame = self.frozen_photo = None
+                    left, top = self.origin
+                    self.callback((box[0] + left, box[1] + top, box[2] + left, box[3] + top))
+                    return
                 self.callback((x1, y1, x2, y2))
             else:
                 # 너무 작은 영역 선택 시 경고 없이 다시 선택하도록 함
-                if self.rect_id:
-                    self.canvas.delete(self.rect_id)
+                self.canvas.itemconfigure(self.rect_id, state='hidden')
+                self.canvas.itemconfigure(self.readout_id, state='hidden')
                 self.start_x = None
                 self.start_y = None
     
@@ -129,13 +312,14 @@ class RegionSelector:
         """선택 취소"""
         if self.selection_window:
             self.selection_window.destroy()
+            self.frozen_frame = self.frozen_photo = None
             self.callback(None)
 
 class ScreenCaptureApp:
     def __init__(self, root):
         self.root = root
         self.root.title("화면 캡쳐 프로그램")
-        self.root.geometry("450x600")
+        self.root.geometry("450x700")
         self.root.resizable(True, True)
         
         # 저장 폴더 설정 (기본값: 바탕화면)
@@ -144,160 +328,328 @@ class ScreenCaptureApp:
         # 파일명 prefix 설정
         self.filename_prefix = "screenshot"
         
-        # 모니터 정보 가져오기
-        self.monitors = self.get_monitor_info()
+        # 캡쳐 백엔드 선택 (CAPTURE_BACKEND 환경 변수로 지정 가능)
+        self.backend = create_backend()
+        print(f"캡쳐 백엔드: {self.backend.name}")
+        
+        # 모니터 배치 (캐시되며 가상 데스크톱 구성이 바뀌면 다시 감지)
+        self.topology = MonitorTopology(
+            detect=lambda: detect_monitors(self.root, self.backend),
+            probe=default_geometry_probe(self.root))
+        
+        # 백그라운드 저장 워커 (큐가 가득 차면 캡쳐를 잠시 막는다)
+        # fsync 정책은 두 워커가 함께 쓰며 저장 설정에서 바꾼다
+        self.sync_policy = SyncPolicy()
+        self.save_worker = SaveWorker(max_pending=4, sync=self.sync_policy)
+        # 멀티코어 인코딩을 켜면 처음 쓸 때 프로세스 풀을 만든다 (결과 큐는 공유)
+        self.process_worker = None
+        # 갤러리 썸네일 디스크 캐시 (처음 열 때 만든다)
+        self.thumbnail_cache = None
+        # 저장 폴더별 지각 해시 인덱스 (저장 워커 스레드에서도 쓰므로 잠금)
+        self._similar_indexes = {}
+        self._similar_lock = threading.Lock()
+        # 창을 숨긴 시각 (캡쳐 전 대기 시간 측정용)
+        self._withdrawn_at = None
+        self.stats_window = None
+        # 변경 감시 캡쳐 (실행 중일 때만)
+        self.watcher = None
+        
+        # 반복 캡쳐 시 중복 프레임 제거
+        self.dedup = FrameDeduplicator()
+        
+        # 저장한 캡쳐 기록 (시간/모니터/영역/해시로 검색, 처음 기록할 때 연다)
+        self._history = None
+        self._history_failed = False
+        self._history_lock = threading.Lock()
         
         # GUI 구성
         self.setup_gui()
+        
+        # 창을 닫으면 남은 저장을 마치고 프로세스 풀/공유 메모리를 정리
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # 저장 완료/오류 콜백을 Tk 스레드에서 처리
+        self._poll_save_results()
+    
+    @property
+    def monitors(self):
+        """현재 모니터 목록"""
+        return self.topology.monitors()
+    
+    @property
+    def history(self):
+        """캡쳐 기록 데이터베이스 (처음 쓸 때 열고, 열 수 없으면 None)"""
+        with self._history_lock:
+            if self._history is None and not self._history_failed:
+                # sqlite3는 기록을 처음 남길 때만 불러온다
+                from history import CaptureHistory
+                try:
+                    self._history = CaptureHistory()
+                except Exception as e:
+                    print(f"캡쳐 기록 데이터베이스를 열 수 없습니다: {e}")
+                    self._history_failed = True
+            return self._history
+    
+    def on_close(self):
+        """창 닫기: 변경 감시를 멈추고, 남은 저장을 마친 뒤 워커 프로세스/공유 메모리/캡쳐 기록 해제"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.save_worker.shutdown()
+        if self.process_worker is not None:
+            self.process_worker.shutdown()
+            if self.process_worker.ring is not None:
+                self.process_worker.ring.close()
+        if self._history is not None:
+            self._history.close()
+        self.root.destroy()
     
-    def get_monitor_info(self):
-        """모니터 정보 가져오기"""
-        monitors = []
+    def _poll_save_results(self):
+        """저장 워커 결과 처리 (root.after로 주기적 호출)"""
+        self.save_worker.poll()
+        self.root.after(50, self._poll_save_results)
+    
+    def _withdraw_for_capture(self):
+        """캡쳐 전에 창 숨기기 (숨긴 뒤 캡쳐까지 걸린 시간은 pre_capture로 기록)"""
+        self._withdrawn_at = time.perf_counter()
+        self.root.withdraw()
+    
+    def _window_rect(self):
+        """앱 창의 화면 좌표 (제목 표시줄 포함), 숨겨져 있으면 None"""
+        if not self.root.winfo_viewable():
+            return None
+        return (self.root.winfo_x(), self.root.winfo_y(),
+                self.root.winfo_rootx() + self.root.winfo_width(),
+                self.root.winfo_rooty() + self.root.winfo_height())
+    
+    def _hide_wait_max_ms(self):
+        """창 숨김 최대 대기 시간 (입력값이 잘못되면 기본값)"""
+        try:
+            return max(0, int(self.hide_wait_var.get()))
+        except (ValueError, tk.TclError):
+            return HIDE_WAIT_MAX_MS
+    
+    def _when_ready(self, bbox, action, record_wait=True):
+        """bbox를 캡쳐해도 될 때 action 실행
         
-        # 방법 1: Windows API 사용 (가장 정확)
-        if WIN32_AVAILABLE:
-            try:
-                def enum_display_monitors():
-                    monitors_info = []
-                    
-                    def monitor_enum_proc(hMonitor, hdcMonitor, lprcMonitor, dwData):
-                        monitor_info = win32api.GetMonitorInfo(hMonitor)
-                        work_area = monitor_info['Work']
-                        monitor_area = monitor_info['Monitor']
-                        
-                        monitors_info.append({
-                            'handle': hMonitor,
-                            'x': monitor_area[0],
-                            'y': monitor_area[1],
-                            'width': monitor_area[2] - monitor_area[0],
-                            'height': monitor_area[3] - monitor_area[1],
-                            'is_primary': monitor_info['Flags'] == win32con.MONITORINFOF_PRIMARY
-                        })
-                        return True
-                    
-                    win32api.EnumDisplayMonitors(None, None, monitor_enum_proc, 0)
-                    return monitors_info
-                
-                win_monitors = enum_display_monitors()
-                print(f"Windows API로 감지된 모니터 수: {len(win_monitors)}")
-                
-                for i, mon in enumerate(win_monitors):
-                    monitor_info = {
-                        'index': i,
-                        'name': f"모니터 {i+1}",
-                        'x': mon['x'],
-                        'y': mon['y'],
-                        'width': mon['width'],
-                        'height': mon['height'],
-                        'is_primary': mon['is_primary'],
-                        'handle': mon['handle']
-                    }
-                    monitors.append(monitor_info)
-                    print(f"Windows API 모니터 {i+1}: {monitor_info}")
-                    
-            except Exception as e:
-                print(f"Windows API로 모니터 정보 가져오기 실패: {e}")
+        앱 창이 bbox와 겹치지 않고 '창 숨기지 않음'이 켜져 있으면 바로 실행한다.
+        아니면 창을 숨기고, 창이 있던 자리의 축소 해시가 두 번 연속 같아질 때까지
+        (숨김 애니메이션이 끝날 때까지) READY_POLL_MS 간격으로 확인한다.
+        최대 대기 시간이 지나면 그대로 실행한다.
+        record_wait가 False면 대기 시간을 pre_capture로 기록하지 않는다 (영역 선택처럼
+        캡쳐 전에 사용자 입력이 끼는 경우).
+        """
+        target = bbox or monitor_rect(self.topology.primary())
+        window = self._window_rect()
+        if window is not None and self.keep_window_var.get() and intersect_rects(window, target) is None:
+            self._withdrawn_at = time.perf_counter() if record_wait else None
+            self.root.after_idle(action)
+            return
         
-        # 방법 2: screeninfo 라이브러리 사용
-        if not monitors and SCREENINFO_AVAILABLE:
+        self._withdraw_for_capture()
+        if not record_wait:
+            self._withdrawn_at = None
+        probe = intersect_rects(window, target) if window is not None else None
+        started = time.perf_counter()
+        self.root.after(READY_POLL_MS, lambda: self._poll_ready(probe, None, started, action))
+    
+    def _poll_ready(self, probe, last_sample, started, action):
+        """창이 화면에서 사라졌는지 확인하고, 준비되면 action 실행"""
+        if (time.perf_counter() - started) * 1000 >= self._hide_wait_max_ms():
+            action()
+            return
+        if not self.root.winfo_viewable():
+            if probe is None:
+                action()
+                return
             try:
-                import screeninfo
-                screens = screeninfo.get_monitors()
-                print(f"screeninfo로 감지된 모니터 수: {len(screens)}")
-                
-                for i, screen in enumerate(screens):
-                    monitor_info = {
-                        'index': i,
-                        'name': f"모니터 {i+1}",
-                        'x': screen.x,
-                        'y': screen.y, 
-                        'width': screen.width,
-                        'height': screen.height,
-                        'is_primary': screen.is_primary
-                    }
-                    monitors.append(monitor_info)
-                    print(f"screeninfo 모니터 {i+1}: {monitor_info}")
-                    
+                sample = sample_hash(self.backend.grab(probe))
             except Exception as e:
-                print(f"screeninfo로 모니터 정보 가져오기 실패: {e}")
+                print(f"캡쳐 준비 확인 실패: {e}")
+                sample = None
+            if sample is not None and sample == last_sample:
+                action()
+                return
+            last_sample = sample
+        self.root.after(READY_POLL_MS, lambda: self._poll_ready(probe, last_sample, started, action))
+    
+    def _mark_capture_start(self):
+        """창을 숨긴 뒤 첫 캡쳐 시작 시점 기록"""
+        if self._withdrawn_at is not None:
+            METRICS.record("pre_capture", time.perf_counter() - self._withdrawn_at)
+            self._withdrawn_at = None
+    
+    def _grab(self, bbox=None):
+        """백엔드로 화면 캡쳐 (grab 단계 측정)"""
+        self._mark_capture_start()
+        with METRICS.stage("grab"):
+            return self.backend.grab(bbox)
+    
+    def _grab_frame(self, bbox=None):
+        """저장할 프레임 캡쳐 (멀티코어 인코딩이면 공유 메모리 슬롯에 바로 담는다)
+        
+        중복 제거나 타일 아카이브처럼 이 프로세스에서 픽셀을 비교해야 하거나,
+        빈 슬롯이 없으면 이미지로 캡쳐한다.
+        """
+        if (not self.multicore_var.get() or self.archive_var.get()
+                or DEDUP_MODES.get(self.dedup_var.get())):
+            return self._grab(bbox)
+        ring = self._encoder(bbox or monitor_rect(self.topology.primary())).ring
+        self._mark_capture_start()
+        try:
+            with METRICS.stage("grab"):
+                return ring.grab(self.backend, bbox, block=False)
+        except (queue.Full, ValueError):
+            # 슬롯이 모두 사용 중이거나 실제 캡쳐가 예상한 영역보다 크다
+            return self._grab(bbox)
+    
+    def _check_duplicate(self, key, image, filepath):
+        """중복 프레임이면 참조할 기존 파일 경로 반환 (중복 제거가 꺼져 있으면 None)"""
+        mode = DEDUP_MODES.get(self.dedup_var.get())
+        if mode is None:
+            self.dedup.forget()
+            return None
+        self.dedup.mode = mode
+        self.dedup.log_path = os.path.join(self.save_folder, "duplicates.log")
+        return self.dedup.check(key, image, filepath)
+    
+    def _remember_saved(self, key, image, filepath):
+        """저장 작업을 넘긴 프레임을 중복 비교 기준으로 기억 (중복 제거가 켜져 있을 때만)"""
+        if DEDUP_MODES.get(self.dedup_var.get()):
+            self.dedup.remember(key, image, filepath)
+    
+    def _encoder(self, rect=None):
+        """현재 설정에 맞는 저장 워커 (멀티코어 인코딩이면 프로세스 풀)
+        
+        rect를 주면 그 크기의 프레임을 담을 공유 메모리 링도 준비한다.
+        """
+        if not self.multicore_var.get():
+            return self.save_worker
+        if self.process_worker is None:
+            # 캡쳐 기록의 내용 해시와 지각 해시는 인코딩하는 프로세스에서 함께 계산해 온다
+            self.process_worker = ProcessSaveWorker(results=self.save_worker.results,
+                                                    sync=self.sync_policy,
+                                                    digests=("content_hash", "fingerprint"))
+        if rect is not None:
+            self._reserve_ring(rect)
+        return self.process_worker
+    
+    def _reserve_ring(self, rect):
+        """rect 크기 프레임이 들어가는 공유 메모리 링을 프로세스 워커에 연결
         
-        # 방법 3: Tkinter API 사용 (대안)
-        if not monitors:
+        슬롯은 실제 캡쳐 영역 크기(BGRX)로 만들고, 개수는 워커가 동시에 처리하는
+        작업 수만큼(FRAME_RING_MEMORY를 넘지 않게) 둔다. 더 큰 영역을 캡쳐하면
+        새 링으로 바꾸고 이전 링은 사용 중인 슬롯이 모두 반환되면 해제한다.
+        """
+        left, top, right, bottom = rect
+        nbytes = max(1, (right - left) * (bottom - top) * 4)
+        worker = self.process_worker
+        old = worker.ring
+        if old is not None and old.fits(nbytes):
+            return
+        slots = max(2, min(worker.processes * 2, FRAME_RING_MEMORY // nbytes))
+        worker.ring = SharedFrameRing(slots=slots, slot_size=nbytes)
+        if old is not None:
+            old.retire()
+    
+    def _capture_meta(self, capture_type, rect=None):
+        """캡쳐 기록용 정보 (rect가 없으면 주 모니터 전체)"""
+        if rect is None:
+            rect = monitor_rect(self.topology.primary())
+        left, top, right, bottom = rect
+        monitor = self.topology.monitor_at((left + right) // 2, (top + bottom) // 2)
+        return {"capture_type": capture_type, "rect": tuple(rect), "timestamp": time.time(),
+                "monitor": monitor['index'] if monitor else None}
+    
+    def _on_written(self, job):
+        """저장 워커 on_written 훅: 중복 제거 통계, 캡쳐 기록, 지각 해시 갱신 (워커 스레드)"""
+        self.dedup.record_written(job)
+        if self.history is not None:
             try:
-                import tkinter as tk
-                temp_root = tk.Tk()
-                temp_root.withdraw()
-                
-                # 주 모니터 정보
-                screen_width = temp_root.winfo_screenwidth()
-                screen_height = temp_root.winfo_screenheight()
-                
-                # 가상 화면 크기 (멀티 모니터 포함)
-                virtual_width = temp_root.winfo_vrootwidth()
-                virtual_height = temp_root.winfo_vrootheight()
-                
-                temp_root.destroy()
-                
-                print(f"주 모니터 크기: {screen_width}x{screen_height}")
-                print(f"가상 화면 크기: {virtual_width}x{virtual_height}")
-                
-                # 주 모니터
-                monitors.append({
-                    'index': 0,
-                    'name': "모니터 1 (주)",
-                    'x': 0,
-                    'y': 0,
-                    'width': screen_width,
-                    'height': screen_height,
-                    'is_primary': True
-                })
-                
-                # 듀얼 모니터 추정 (가상 화면이 주 모니터보다 큰 경우)
-                if virtual_width > screen_width:
-                    second_width = virtual_width - screen_width
-                    monitors.append({
-                        'index': 1,
-                        'name': "모니터 2",
-                        'x': screen_width,  # 오른쪽에 위치 추정
-                        'y': 0,
-                        'width': second_width,
-                        'height': screen_height,
-                        'is_primary': False
-                    })
-                    print(f"추정된 두 번째 모니터: ({screen_width}, 0) - {second_width}x{screen_height}")
-                
+                self.history.record_job(job)
             except Exception as e:
-                print(f"Tkinter API 방식 실패: {e}")
+                print(f"캡쳐 기록 실패: {job.filepath}: {e}")
+        try:
+            self._similar_index(os.path.dirname(job.filepath)).add_job(job)
+        except Exception as e:
+            print(f"지문 기록 실패: {job.filepath}: {e}")
+    
+    def _similar_index(self, folder):
+        """folder의 지각 해시 인덱스 (처음 쓸 때 파일에서 읽는다)"""
+        folder = os.path.abspath(folder)
+        with self._similar_lock:
+            index = self._similar_indexes.get(folder)
+            if index is None:
+                # NumPy는 이 기능을 쓸 때만 불러온다
+                from similar import SimilarityIndex
+                index = self._similar_indexes[folder] = SimilarityIndex(folder)
+            return index
+    
+    def _save_async(self, image, filepath, on_saved, dedup_key, meta=None):
+        """이미지를 백그라운드에서 저장하고 완료 시 on_saved(filepath, size, EncodeResult) 호출"""
+        def on_error(path, error):
+            # 쓰지 못한 파일을 이후 같은 화면의 중복 기준으로 삼지 않는다
+            self.dedup.discard(filepath)
+            messagebox.showerror("오류", f"파일 저장 중 오류가 발생했습니다:\n{path}\n{error}")
         
-        # 기본값 (모든 방법이 실패한 경우)
-        if not monitors:
-            try:
-                screen_width = self.root.winfo_screenwidth()
-                screen_height = self.root.winfo_screenheight()
-                monitors.append({
-                    'index': 0,
-                    'name': "주 모니터",
-                    'x': 0,
-                    'y': 0,
-                    'width': screen_width,
-                    'height': screen_height,
-                    'is_primary': True
-                })
-            except:
-                # 최후의 수단
-                monitors.append({
-                    'index': 0,
-                    'name': "기본 모니터",
-                    'x': 0,
-                    'y': 0,
-                    'width': 1920,
-                    'height': 1080,
-                    'is_primary': True
-                })
-        
-        print(f"최종 모니터 정보: {monitors}")
-        return monitors
-
+        if self.archive_var.get() and meta is not None:
+            self._append_archive(image, meta, on_error)
+            return
+        
+        ref_path = self._check_duplicate(dedup_key, image, filepath)
+        if ref_path:
+            messagebox.showinfo("알림", f"이전 캡쳐와 같은 화면이라 저장하지 않았습니다:\n{ref_path}")
+            return
+        
+        try:
+            self._encoder(meta["rect"] if meta else None).submit(
+                image, filepath, on_done=on_saved, on_error=on_error, timeout=2,
+                on_written=self._on_written, meta=meta, **self._encode_options())
+        except queue.Full:
+            messagebox.showerror("오류", "저장 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+            return
+        self._remember_saved(dedup_key, image, filepath)
+    
+    def _append_archive(self, image, meta, on_error):
+        """같은 대상(캡쳐 종류 + 영역)의 타일 아카이브 뒤에 프레임 추가
+        
+        같은 화면도 캡쳐 시각을 남기도록 중복 제거 없이 기록하고(바뀐 타일이 없으면
+        헤더만 쓴다), 아카이브 안의 프레임은 캡쳐 기록/지문에 넣지 않는다.
+        """
+        left, top, right, bottom = meta["rect"]
+        filepath = os.path.join(self.save_folder,
+                                f"{self.prefix_var.get()}_{meta['capture_type']}_"
+                                f"{left}_{top}_{right - left}x{bottom - top}.captiles")
+        
+        def on_saved(path, size, result):
+            messagebox.showinfo("완료", f"타일 아카이브에 추가했습니다:\n{path}\n"
+                                      f"크기: {size[0]}x{size[1]}\n"
+                                      f"아카이브 전체: {result.nbytes / 1024:.0f}KB")
+        
+        try:
+            # 한 파일에 차례로 이어 써야 하므로 멀티코어 설정과 상관없이 스레드 워커 하나로
+            self.save_worker.submit(image, filepath, on_done=on_saved, on_error=on_error, timeout=2,
+                                    file_format="tiles")
+        except queue.Full:
+            messagebox.showerror("오류", "저장 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+    
+    def _prepare_save_folder(self):
+        """저장 폴더 입력값을 반영하고, 이 세션에서 처음 쓰는 폴더면 만든다"""
+        self.save_folder = ensure_folder(self.folder_var.get())
+    
+    def _encode_options(self):
+        """현재 선택된 파일 형식/인코딩 프로파일 (SaveWorker.submit 인자)"""
+        return {"file_format": self.format_var.get().lower(),
+                "profile": ENCODE_PROFILES[self.profile_var.get()]}
+    
+    def _ask_open_file(self, message, filepath, encoded=None):
+        """저장 완료 메시지와 함께 파일 열기 옵션 제공"""
+        if encoded is not None:
+            message += f"\n형식: {encoded.summary()}"
+        result = messagebox.askyesno("완료", f"{message}\n\n파일을 열어보시겠습니까?")
+        if result:
+            os.startfile(filepath)
+    
     def setup_gui(self):
         # 제목
         title_label = tk.Label(self.root, text="화면 캡쳐 프로그램", 
@@ -343,10 +695,67 @@ class ScreenCaptureApp:
         tk.Label(format_frame, text="파일 형식:", font=("Arial", 9)).pack(anchor="w")
         self.format_var = tk.StringVar(value="PNG")
         format_combo = ttk.Combobox(format_frame, textvariable=self.format_var, 
-                                   values=["PNG", "JPEG", "BMP"], 
+                                   values=["PNG", "JPEG", "WEBP", "BMP", "RAW", "AUTO"], 
                                    state="readonly", font=("Arial", 9))
         format_combo.pack(fill="x", pady=2)
         
+        # 인코딩 프로파일 (AUTO는 화면 내용에 따라 PNG/WebP 선택)
+        tk.Label(format_frame, text="인코딩 프로파일:", font=("Arial", 9)).pack(anchor="w")
+        self.profile_var = tk.StringVar(value="균형")
+        profile_combo = ttk.Combobox(format_frame, textvariable=self.profile_var,
+                                    values=list(ENCODE_PROFILES),
+                                    state="readonly", font=("Arial", 9))
+        profile_combo.pack(fill="x", pady=2)
+        
+        # 여러 CPU 코어로 인코딩 (연속 캡쳐에서 PNG 압축이 밀릴 때)
+        self.multicore_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(format_frame, text=f"멀티코어 인코딩 ({os.cpu_count() or 1}개 프로세스)",
+                       variable=self.multicore_var, font=("Arial", 9)).pack(anchor="w")
+        
+        # 같은 모니터/영역 반복 캡쳐는 바뀐 타일만 아카이브 하나에 이어 쓴다
+        self.archive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(format_frame, text="대상별 타일 아카이브에 모으기 (.captiles)",
+                       variable=self.archive_var, font=("Arial", 9)).pack(anchor="w")
+        
+        # 중복 프레임 처리 방식
+        dedup_frame = tk.Frame(save_frame)
+        dedup_frame.pack(pady=5, fill="x")
+        
+        tk.Label(dedup_frame, text="이전 캡쳐와 같은 화면:", font=("Arial", 9)).pack(anchor="w")
+        self.dedup_var = tk.StringVar(value="저장")
+        dedup_combo = ttk.Combobox(dedup_frame, textvariable=self.dedup_var, 
+                                  values=list(DEDUP_MODES), 
+                                  state="readonly", font=("Arial", 9))
+        dedup_combo.pack(fill="x", pady=2)
+        
+        # 저장한 파일을 디스크에 기록하는 시점 (정전/강제 종료 대비)
+        tk.Label(dedup_frame, text="디스크 기록:", font=("Arial", 9)).pack(anchor="w")
+        self.fsync_var = tk.StringVar(value=next(iter(FSYNC_POLICIES)))
+        fsync_combo = ttk.Combobox(dedup_frame, textvariable=self.fsync_var,
+                                  values=list(FSYNC_POLICIES),
+                                  state="readonly", font=("Arial", 9))
+        fsync_combo.pack(fill="x", pady=2)
+        fsync_combo.bind("<<ComboboxSelected>>",
+                         lambda event: self.sync_policy.configure(FSYNC_POLICIES[self.fsync_var.get()]))
+        
+        # 영역 선택 시 화면을 한 번 캡쳐해 고정 (보이던 화면 그대로 저장)
+        self.frozen_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(dedup_frame, text="영역 선택 시 화면 고정", 
+                       variable=self.frozen_var, font=("Arial", 9)).pack(anchor="w")
+        
+        # 창이 캡쳐 영역 밖에 있으면 숨기지 않고 바로 캡쳐
+        self.keep_window_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(dedup_frame, text="창이 캡쳐 영역 밖이면 숨기지 않음", 
+                       variable=self.keep_window_var, font=("Arial", 9)).pack(anchor="w")
+        
+        # 창을 숨긴 뒤 화면에서 사라질 때까지 기다리는 최대 시간
+        wait_row = tk.Frame(dedup_frame)
+        wait_row.pack(fill="x", pady=2)
+        tk.Label(wait_row, text="창 숨김 최대 대기 (ms):", font=("Arial", 9)).pack(side="left")
+        self.hide_wait_var = tk.StringVar(value=str(HIDE_WAIT_MAX_MS))
+        tk.Spinbox(wait_row, from_=0, to=5000, increment=100, textvariable=self.hide_wait_var,
+                   width=6, font=("Arial", 9)).pack(side="left", padx=5)
+        
         # 캡쳐 버튼 프레임
         button_frame = tk.Frame(self.root)
         button_frame.pack(pady=10, fill="x", padx=20)
@@ -376,6 +785,14 @@ class ScreenCaptureApp:
                                       font=("Arial", 9),
                                       width=18, height=1)
                 monitor_btn.pack(pady=1, fill="x", padx=5)
+            
+            # 모든 모니터를 한 번의 캡쳐로 저장
+            all_monitors_btn = tk.Button(monitor_frame, text="모든 모니터 한 번에 캡쳐",
+                                        command=self.capture_all_monitors,
+                                        bg="#455A64", fg="white",
+                                        font=("Arial", 9, "bold"),
+                                        width=18, height=1)
+            all_monitors_btn.pack(pady=(4, 2), fill="x", padx=5)
         
         # 영역 선택 캡쳐 버튼
         region_btn = tk.Button(button_frame, text="영역 선택 캡쳐", 
@@ -393,6 +810,30 @@ class ScreenCaptureApp:
                                     width=18, height=1)
         coord_region_btn.pack(pady=3, fill="x")
         
+        # 스크롤 캡쳐 버튼
+        scroll_btn = tk.Button(button_frame, text="스크롤 캡쳐 (긴 화면)", 
+                              command=self.capture_scroll,
+                              bg="#9C27B0", fg="white", 
+                              font=("Arial", 10),
+                              width=18, height=1)
+        scroll_btn.pack(pady=3, fill="x")
+        
+        # 연속 캡쳐 버튼
+        burst_btn = tk.Button(button_frame, text="연속 캡쳐 (인터벌/버스트)", 
+                             command=self.capture_burst,
+                             bg="#3F51B5", fg="white", 
+                             font=("Arial", 10),
+                             width=18, height=1)
+        burst_btn.pack(pady=3, fill="x")
+        
+        # 변경 감시 캡쳐 버튼
+        watch_btn = tk.Button(button_frame, text="변경 감시 캡쳐", 
+                             command=self.capture_watch,
+                             bg="#3F51B5", fg="white", 
+                             font=("Arial", 10),
+                             width=18, height=1)
+        watch_btn.pack(pady=3, fill="x")
+        
         # 저장 폴더 열기 버튼
         open_folder_btn = tk.Button(button_frame, text="저장 폴더 열기", 
                                    command=self.open_save_folder,
@@ -401,6 +842,14 @@ class ScreenCaptureApp:
                                    width=18, height=1)
         open_folder_btn.pack(pady=3, fill="x")
         
+        # 최근 캡쳐 갤러리 버튼
+        gallery_btn = tk.Button(button_frame, text="최근 캡쳐 보기", 
+                               command=self.show_gallery,
+                               bg="#FF9800", fg="white", 
+                               font=("Arial", 9),
+                               width=18, height=1)
+        gallery_btn.pack(pady=3, fill="x")
+        
         # 구분선
         separator = tk.Frame(button_frame, height=1, bg="gray")
         separator.pack(fill="x", pady=5)
@@ -412,6 +861,14 @@ class ScreenCaptureApp:
                              font=("Arial", 9, "bold"),
                              width=18, height=2)
         debug_btn.pack(pady=5, fill="x")
+        
+        # 단계별 성능 통계 버튼
+        stats_btn = tk.Button(button_frame, text="📊 성능 통계", 
+                             command=self.show_stats,
+                             bg="#607D8B", fg="white", 
+                             font=("Arial", 9),
+                             width=18, height=1)
+        stats_btn.pack(pady=3, fill="x")
 
     def select_save_folder(self):
         """저장 폴더 선택"""
@@ -434,29 +891,33 @@ class ScreenCaptureApp:
         except Exception as e:
             messagebox.showerror("오류", f"폴더를 열 수 없습니다: {str(e)}")
     
+    def show_gallery(self):
+        """저장 폴더의 최근 캡쳐를 썸네일 창으로 보기"""
+        try:
+            self.save_folder = self.folder_var.get()
+            if not os.path.exists(self.save_folder):
+                messagebox.showerror("오류", "저장 폴더가 존재하지 않습니다.")
+                return
+            if self.thumbnail_cache is None:
+                self.thumbnail_cache = ThumbnailCache()
+            GalleryWindow(self.root, self.save_folder, cache=self.thumbnail_cache,
+                          similar_index=self._similar_index(self.save_folder))
+        except Exception as e:
+            messagebox.showerror("오류", f"갤러리를 열 수 없습니다: {str(e)}")
+    
     def generate_filename(self, capture_type="full"):
         """파일명 생성"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        prefix = self.prefix_var.get() or "screenshot"
-        file_format = self.format_var.get().lower()
-        filename = f"{prefix}_{capture_type}_{timestamp}.{file_format}"
-        return os.path.join(self.save_folder, filename)
+        return capture_filename(self.save_folder, self.prefix_var.get(), capture_type,
+                                self.format_var.get())
     
     def capture_full_screen(self):
         """전체 화면 캡쳐"""
         try:
-            # 저장 폴더 업데이트
-            self.save_folder = self.folder_var.get()
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
             
-            # 저장 폴더가 존재하는지 확인하고 없으면 생성
-            if not os.path.exists(self.save_folder):
-                os.makedirs(self.save_folder)
-            
-            # 잠시 창을 최소화
-            self.root.withdraw()
-            
-            # 1초 대기 후 캡쳐
-            self.root.after(1000, lambda: self._do_full_capture())
+            # 창을 숨기고(필요할 때만) 화면에서 사라지면 캡쳐
+            self._when_ready(None, self._do_full_capture)
             
         except Exception as e:
             messagebox.showerror("오류", f"캡쳐 중 오류가 발생했습니다: {str(e)}")
@@ -469,17 +930,15 @@ class ScreenCaptureApp:
             filepath = self.generate_filename("full")
             
             # 스크린샷 촬영
-            screenshot = pyautogui.screenshot()
-            screenshot.save(filepath)
+            screenshot = self._grab_frame()
             
             # 창 다시 표시
             self.root.deiconify()
             
-            # 성공 메시지와 함께 파일 열기 옵션 제공
-            result = messagebox.askyesno("완료", 
-                                       f"스크린샷이 저장되었습니다:\n{filepath}\n\n파일을 열어보시겠습니까?")
-            if result:
-                os.startfile(filepath)
+            # 백그라운드 저장 후 성공 메시지 표시
+            self._save_async(screenshot, filepath, lambda path, size, result: self._ask_open_file(
+                f"스크린샷이 저장되었습니다:\n{path}", path, result), "full",
+                self._capture_meta("full"))
             
         except Exception as e:
             self.root.deiconify()
@@ -488,27 +947,31 @@ class ScreenCaptureApp:
     def capture_region(self):
         """영역 선택 캡쳐"""
         try:
-            # 저장 폴더 업데이트
-            self.save_folder = self.folder_var.get()
-            
-            # 저장 폴더가 존재하는지 확인하고 없으면 생성
-            if not os.path.exists(self.save_folder):
-                os.makedirs(self.save_folder)
-            
-            # 잠시 창을 최소화
-            self.root.withdraw()
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
             
             # 영역 선택 시작 (parent_root 전달)
-            selector = RegionSelector(self.root, self._on_region_selected)
-            # 500ms 후 영역 선택 창 표시
-            self.root.after(500, selector.start_selection)
+            selector = self._region_selector(
+                lambda region: self._on_region_selected(region, selector.selected_image))
+            # 창이 화면에서 사라지면 영역 선택 창 표시
+            # (화면 고정이 아니면 캡쳐는 선택이 끝난 뒤라 대기 시간을 재지 않는다)
+            self._when_ready(None, selector.start_selection, record_wait=self.frozen_var.get())
             
         except Exception as e:
             messagebox.showerror("오류", f"캡쳐 중 오류가 발생했습니다: {str(e)}")
             self.root.deiconify()
     
-    def _on_region_selected(self, region):
-        """영역 선택 완료 콜백"""
+    def _region_selector(self, callback):
+        """영역 선택기 (화면 고정을 켜면 주 모니터를 한 번 캡쳐해 정지 화면에서 선택)"""
+        snap_rects = [monitor_rect(m) for m in self.monitors]
+        if not self.frozen_var.get():
+            return RegionSelector(self.root, callback, snap_rects=snap_rects)
+        bbox = monitor_rect(self.topology.primary())
+        return RegionSelector(self.root, callback, grab=lambda: self._grab(bbox), origin=bbox[:2],
+                              snap_rects=snap_rects)
+    
+    def _on_region_selected(self, region, image=None):
+        """영역 선택 완료 콜백 (image가 있으면 정지 화면에서 잘라낸 이미지)"""
         try:
             if region is None:
                 # 선택 취소됨
@@ -526,28 +989,25 @@ class ScreenCaptureApp:
             
             print(f"선택된 영역: ({x1}, {y1}) - ({x2}, {y2}), 크기: {width}x{height}")
             
-            # 선택된 영역 캡쳐
-            screenshot = pyautogui.screenshot(region=(x1, y1, width, height))
-            screenshot.save(filepath)
+            # 선택된 영역 캡쳐 (정지 화면에서 잘라냈으면 그대로 사용)
+            screenshot = image if image is not None else self._grab_frame((x1, y1, x2, y2))
             
             # 창 다시 표시
             self.root.deiconify()
             
-            # 성공 메시지와 함께 파일 열기 옵션 제공
-            result = messagebox.askyesno("완료", 
-                                       f"영역 스크린샷이 저장되었습니다:\n"
-                                       f"파일: {filepath}\n"
-                                       f"크기: {width}x{height}\n\n"
-                                       f"파일을 열어보시겠습니까?")
-            if result:
-                os.startfile(filepath)
+            # 백그라운드 저장 후 성공 메시지 표시
+            self._save_async(screenshot, filepath, lambda path, size, result: self._ask_open_file(
+                f"영역 스크린샷이 저장되었습니다:\n"
+                f"파일: {path}\n"
+                f"크기: {size[0]}x{size[1]}", path, result), region,
+                self._capture_meta("region", region))
             
         except Exception as e:
             self.root.deiconify()
             messagebox.showerror("오류", f"영역 캡쳐 중 오류가 발생했습니다: {str(e)}")
     
-    def capture_region_by_coordinates(self):
-        """좌표 입력으로 영역 캡쳐"""
+    def capture_region_by_coordinates(self, on_coords=None):
+        """좌표 입력으로 영역 캡쳐 (on_coords가 있으면 캡쳐 대신 좌표를 넘겨줌)"""
         try:
             # 좌표 입력 창 생성
             coord_window = tk.Toplevel(self.root)
@@ -557,8 +1017,7 @@ class ScreenCaptureApp:
             coord_window.grab_set()
             
             # 전체 화면 크기 정보 표시
-            total_width = sum(m['width'] for m in self.monitors)
-            max_height = max(m['height'] for m in self.monitors)
+            min_x, min_y, max_x, max_y = self.topology.virtual_bounds()
             
             info_frame = tk.Frame(coord_window)
             info_frame.pack(pady=5, padx=10, fill="x")
@@ -572,7 +1031,8 @@ class ScreenCaptureApp:
                               f"[{monitor['width']}x{monitor['height']}]")
                 tk.Label(info_frame, text=monitor_info, font=("Arial", 8)).pack(anchor="w", padx=10)
             
-            tk.Label(info_frame, text=f"전체 영역: {total_width}x{max_height}", 
+            tk.Label(info_frame, text=f"전체 영역: ({min_x}, {min_y}) - ({max_x}, {max_y}) "
+                                      f"[{max_x - min_x}x{max_y - min_y}]", 
                     font=("Arial", 9, "bold")).pack(anchor="w", pady=(5,0))
             
             # 좌표 입력 프레임
@@ -613,12 +1073,8 @@ class ScreenCaptureApp:
                         y1, y2 = y2, y1
                     
                     # 범위 체크 (모든 모니터 영역 고려)
-                    min_x = min(m['x'] for m in self.monitors)
-                    min_y = min(m['y'] for m in self.monitors)
-                    max_x = max(m['x'] + m['width'] for m in self.monitors)
-                    max_y = max(m['y'] + m['height'] for m in self.monitors)
-                    
-                    if x1 < min_x or y1 < min_y or x2 > max_x or y2 > max_y:
+                    if not self.topology.contains_rect((x1, y1, x2, y2)):
+                        min_x, min_y, max_x, max_y = self.topology.virtual_bounds()
                         messagebox.showerror("오류", 
                                            f"좌표가 모니터 범위를 벗어났습니다.\n"
                                            f"유효 범위: ({min_x}, {min_y}) - ({max_x}, {max_y})")
@@ -631,7 +1087,7 @@ class ScreenCaptureApp:
                     coord_window.destroy()
                     
                     # 캡쳐 실행
-                    self._capture_region_by_coords(x1, y1, x2, y2)
+                    (on_coords or self._capture_region_by_coords)(x1, y1, x2, y2)
                     
                 except ValueError:
                     messagebox.showerror("오류", "올바른 숫자를 입력해주세요.")
@@ -648,15 +1104,17 @@ class ScreenCaptureApp:
         except Exception as e:
             messagebox.showerror("오류", f"좌표 입력 창 생성 중 오류: {str(e)}")
     
-    def _capture_region_by_coords(self, x1, y1, x2, y2):
-        """좌표로 영역 캡쳐 실행"""
+    def _capture_region_by_coords(self, x1, y1, x2, y2, scroll=False):
+        """좌표로 영역 캡쳐 실행 (scroll이면 스크롤하며 이어붙인 PNG로 저장)"""
         try:
-            # 저장 폴더 업데이트
-            self.save_folder = self.folder_var.get()
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
             
-            # 저장 폴더가 존재하는지 확인하고 없으면 생성
-            if not os.path.exists(self.save_folder):
-                os.makedirs(self.save_folder)
+            if scroll:
+                # 이어붙인 이미지는 띠 단위로 바로 압축해 쓰므로 항상 PNG
+                filepath = os.path.splitext(self.generate_filename("scroll"))[0] + ".png"
+                self._start_scroll_capture((x1, y1, x2, y2), filepath)
+                return
             
             # 파일 경로 생성
             filepath = self.generate_filename("coords")
@@ -665,37 +1123,134 @@ class ScreenCaptureApp:
             height = y2 - y1
             
             # 영역 캡쳐
-            screenshot = pyautogui.screenshot(region=(x1, y1, width, height))
-            screenshot.save(filepath)
-            
-            # 성공 메시지
-            result = messagebox.askyesno("완료", 
-                                       f"좌표 영역 스크린샷이 저장되었습니다:\n"
-                                       f"파일: {filepath}\n"
-                                       f"영역: ({x1}, {y1}) - ({x2}, {y2})\n"
-                                       f"크기: {width}x{height}\n\n"
-                                       f"파일을 열어보시겠습니까?")
-            if result:
-                os.startfile(filepath)
+            screenshot = self._grab_frame((x1, y1, x2, y2))
+            
+            # 백그라운드 저장 후 성공 메시지 표시
+            self._save_async(screenshot, filepath, lambda path, size, result: self._ask_open_file(
+                f"좌표 영역 스크린샷이 저장되었습니다:\n"
+                f"파일: {path}\n"
+                f"영역: ({x1}, {y1}) - ({x2}, {y2})\n"
+                f"크기: {width}x{height}", path, result), (x1, y1, x2, y2),
+                self._capture_meta("coords", (x1, y1, x2, y2)))
             
         except Exception as e:
+            self.root.deiconify()
             messagebox.showerror("오류", f"좌표 캡쳐 중 오류가 발생했습니다: {str(e)}")
     
+    def capture_scroll(self):
+        """스크롤 캡쳐: 영역을 고른 뒤 스크롤하는 동안 캡쳐해 긴 이미지 하나로 이어붙임"""
+        # NumPy는 이 기능을 쓸 때만 불러온다
+        from panorama import IDLE_STOP
+        answer = messagebox.askyesnocancel(
+            "스크롤 캡쳐",
+            "캡쳐할 영역을 마우스로 선택하시겠습니까?\n(아니오: 좌표 입력)\n\n"
+            "캡쳐가 시작되면 내용을 천천히 아래로 스크롤하세요.\n"
+            f"{IDLE_STOP:.0f}초 동안 새 내용이 없으면 자동으로 끝납니다.")
+        if answer is None:
+            return
+        if not answer:
+            self.capture_region_by_coordinates(
+                on_coords=lambda x1, y1, x2, y2: self._capture_region_by_coords(x1, y1, x2, y2, scroll=True))
+            return
+        try:
+            selector = RegionSelector(
+                self.root,
+                lambda region: self._capture_region_by_coords(*region, scroll=True)
+                if region else self.root.deiconify(),
+                snap_rects=[monitor_rect(m) for m in self.monitors])
+            self._when_ready(None, selector.start_selection, record_wait=False)
+        except Exception as e:
+            messagebox.showerror("오류", f"캡쳐 중 오류가 발생했습니다: {str(e)}")
+            self.root.deiconify()
+    
+    def _start_scroll_capture(self, bbox, filepath):
+        """스크롤 캡쳐 시작 (앱 창을 숨긴 뒤 SCROLL_INTERVAL마다 캡쳐해 이어붙인다)"""
+        from panorama import PanoramaStitcher
+        stitcher = PanoramaStitcher(filepath)
+        state = {"stop": False, "last_change": None, "status": None}
+        
+        def begin():
+            state["status"] = self._show_scroll_status(bbox, stitcher, lambda: state.update(stop=True))
+            self._scroll_tick(stitcher, bbox, state)
+        
+        self._when_ready(bbox, begin)
+    
+    def _scroll_tick(self, stitcher, bbox, state):
+        """스크롤 캡쳐 한 프레임 (새 내용이 IDLE_STOP초 동안 없으면 끝낸다)"""
+        from panorama import IDLE_STOP, SCROLL_INTERVAL
+        try:
+            if not state["stop"]:
+                if stitcher.add(self._grab(bbox)) and stitcher.stitched > 1:
+                    state["last_change"] = time.monotonic()
+                window, label_var = state["status"]
+                if window.winfo_exists():
+                    width, height = stitcher.size
+                    label_var.set(f"이어붙인 크기: {width} x {height}\n"
+                                  f"캡쳐 {stitcher.frames}장, 사용 {stitcher.stitched}장")
+                # 첫 스크롤 전에는 완료 버튼을 누를 때까지 기다린다
+                last_change = state["last_change"]
+                if last_change is None or time.monotonic() - last_change < IDLE_STOP:
+                    self.root.after(int(SCROLL_INTERVAL * 1000),
+                                    lambda: self._scroll_tick(stitcher, bbox, state))
+                    return
+            self._finish_scroll(stitcher, bbox, state)
+        except Exception as e:
+            stitcher.close()
+            if state["status"] is not None:
+                state["status"][0].destroy()
+            self.root.deiconify()
+            messagebox.showerror("오류", f"스크롤 캡쳐 중 오류가 발생했습니다: {str(e)}")
+    
+    def _show_scroll_status(self, bbox, stitcher, on_stop):
+        """스크롤 캡쳐 진행 창 (가능하면 캡쳐 영역 바깥에 띄운다), (창, 표시 변수) 반환"""
+        width, height = 230, 110
+        x1, y1, x2, y2 = bbox
+        window = tk.Toplevel(self.root)
+        window.title("스크롤 캡쳐")
+        window.resizable(False, False)
+        window.attributes("-topmost", True)
+        for x, y in ((x2 + 10, y1), (x1 - width - 10, y1), (x1, y2 + 40), (x1, y1 - height - 40)):
+            if self.topology.contains_rect((x, y, x + width, y + height)):
+                window.geometry(f"{width}x{height}+{x}+{y}")
+                break
+        else:
+            window.geometry(f"{width}x{height}")
+        
+        label_var = tk.StringVar(value="내용을 아래로 스크롤하세요")
+        tk.Label(window, textvariable=label_var, font=("Arial", 9), justify="left").pack(padx=10, pady=10)
+        tk.Button(window, text="완료", command=on_stop,
+                 bg="#4CAF50", fg="white", width=10).pack(pady=(0, 10))
+        window.protocol("WM_DELETE_WINDOW", on_stop)
+        return window, label_var
+    
+    def _finish_scroll(self, stitcher, bbox, state):
+        """이어붙인 PNG를 마무리하고 결과 알림"""
+        width, height = stitcher.close()
+        state["status"][0].destroy()
+        self.root.deiconify()
+        if self.history is not None:
+            try:
+                self.history.record(stitcher.path, "scroll", self._capture_meta("scroll", bbox)["monitor"],
+                                    bbox, size=(width, height), file_format="png",
+                                    nbytes=os.path.getsize(stitcher.path),
+                                    mtime=os.path.getmtime(stitcher.path))
+            except Exception as e:
+                print(f"캡쳐 기록 실패: {stitcher.path}: {e}")
+        message = (f"스크롤 캡쳐가 저장되었습니다:\n"
+                   f"파일: {stitcher.path}\n"
+                   f"크기: {width}x{height} (캡쳐 {stitcher.frames}장 중 {stitcher.stitched}장 사용)")
+        if stitcher.gaps:
+            message += f"\n\n이어지는 부분을 찾지 못한 곳이 {stitcher.gaps}군데 있습니다. 조금 더 천천히 스크롤해주세요."
+        self._ask_open_file(message, stitcher.path)
+    
     def capture_monitor(self, monitor):
         """특정 모니터 캡쳐"""
         try:
-            # 저장 폴더 업데이트
-            self.save_folder = self.folder_var.get()
-            
-            # 저장 폴더가 존재하는지 확인하고 없으면 생성
-            if not os.path.exists(self.save_folder):
-                os.makedirs(self.save_folder)
-            
-            # 잠시 창을 최소화
-            self.root.withdraw()
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
             
-            # 1초 대기 후 캡쳐
-            self.root.after(1000, lambda: self._do_monitor_capture(monitor))
+            # 창을 숨기고(필요할 때만) 화면에서 사라지면 캡쳐
+            self._when_ready(monitor_rect(monitor), lambda: self._do_monitor_capture(monitor))
             
         except Exception as e:
             messagebox.showerror("오류", f"모니터 캡쳐 중 오류가 발생했습니다: {str(e)}")
@@ -703,120 +1258,498 @@ class ScreenCaptureApp:
     
     def _do_monitor_capture(self, monitor):
         try:
+            # 버튼을 만든 뒤 배치가 바뀌었을 수 있으므로 최신 좌표 사용
+            monitor = self.topology.by_index(monitor['index']) or monitor
             filepath = self.generate_filename(f"monitor_{monitor['index']+1}")
 
-            # 1. BitBlt 방식 (가장 정확)
-            if WIN32_AVAILABLE and 'handle' in monitor:
-                try:
-                    import win32gui
-                    import win32ui
-                    import win32con
-                    import win32api
-                    from PIL import Image
-
-                    monitor_info = win32api.GetMonitorInfo(monitor['handle'])
-                    monitor_rect = monitor_info['Monitor']
-
-                    hwnd = win32gui.GetDesktopWindow()
-                    hwindc = win32gui.GetWindowDC(hwnd)
-                    srcdc = win32ui.CreateDCFromHandle(hwindc)
-                    memdc = srcdc.CreateCompatibleDC()
-
-                    width = monitor_rect[2] - monitor_rect[0]
-                    height = monitor_rect[3] - monitor_rect[1]
-                    print(f"BitBlt 좌표: {monitor_rect}, width: {width}, height: {height}")
-                    bmp = win32ui.CreateBitmap()
-                    bmp.CreateCompatibleBitmap(srcdc, width, height)
-                    memdc.SelectObject(bmp)
-
-                    result = memdc.BitBlt((0, 0), (width, height), srcdc, (monitor_rect[0], monitor_rect[1]), win32con.SRCCOPY)
-
-                    if result:
-                        bmpinfo = bmp.GetInfo()
-                        bmpstr = bmp.GetBitmapBits(True)
-                        img = Image.frombuffer('RGB', (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                                              bmpstr, 'raw', 'BGRX', 0, 1)
-                        img.save(filepath)
-                        actual_size = img.size
-                        self.root.deiconify()
-                        result = messagebox.askyesno("완료", 
-                            f"{monitor['name']} 스크린샷이 저장되었습니다:\n"
-                            f"파일: {filepath}\n"
-                            f"크기: {actual_size[0]}x{actual_size[1]}\n"
-                            f"좌표: ({monitor['x']}, {monitor['y']})\n\n"
-                            f"파일을 열어보시겠습니까?")
-                        if result:
-                            os.startfile(filepath)
-                        # 리소스 해제
-                        memdc.DeleteDC()
-                        srcdc.DeleteDC()
-                        win32gui.ReleaseDC(hwnd, hwindc)
-                        win32gui.DeleteObject(bmp.GetHandle())
-                        return
-                    else:
-                        print("BitBlt 실패")
-                        memdc.DeleteDC()
-                        srcdc.DeleteDC()
-                        win32gui.ReleaseDC(hwnd, hwindc)
-                        win32gui.DeleteObject(bmp.GetHandle())
-                except Exception as api_error:
-                    print(f"Windows API BitBlt 방식 실패: {api_error}")
-                    messagebox.showerror("실패", f"{monitor['name']} 캡쳐에 BitBlt 예외 발생:\n{api_error}")
-                    self.root.deiconify()
-                    return
-
-            # 2. BitBlt가 실패하면 PIL ImageGrab fallback
+            bbox = monitor_rect(monitor)
             try:
-                from PIL import ImageGrab
-                all_monitors = self.monitors
-                min_x = min(m['x'] for m in all_monitors)
-                min_y = min(m['y'] for m in all_monitors)
-                max_x = max(m['x'] + m['width'] for m in all_monitors)
-                max_y = max(m['y'] + m['height'] for m in all_monitors)
-
-                full_screenshot = ImageGrab.grab(all_screens=True)
-                img_width, img_height = full_screenshot.size
-                expected_width = max_x - min_x
-                expected_height = max_y - min_y
-
-                print(f"ImageGrab size: {img_width}x{img_height}, expected: {expected_width}x{expected_height}")
-
-                crop_left = monitor['x'] - min_x
-                crop_top = monitor['y'] - min_y
-                crop_right = crop_left + monitor['width']
-                crop_bottom = crop_top + monitor['height']
-
-                box = (crop_left, crop_top, crop_right, crop_bottom)
-                monitor_screenshot = full_screenshot.crop(box)
-                monitor_screenshot.save(filepath)
-                actual_size = monitor_screenshot.size
-
-                self.root.deiconify()
-                result = messagebox.askyesno("완료", 
-                    f"{monitor['name']} 스크린샷이 저장되었습니다:\n"
-                    f"파일: {filepath}\n"
-                    f"크기: {actual_size[0]}x{actual_size[1]}\n"
-                    f"좌표: ({monitor['x']}, {monitor['y']})\n\n"
-                    f"파일을 열어보시겠습니까?")
-                if result:
-                    os.startfile(filepath)
-                return
+                monitor_screenshot = self._grab_frame(bbox)
             except Exception as e:
-                print(f"ImageGrab fallback 실패: {e}")
-                messagebox.showerror("실패", f"{monitor['name']} 캡쳐에 실패했습니다. (BitBlt & ImageGrab 실패)\n{e}")
+                print(f"{self.backend.name} 백엔드 캡쳐 실패: {e}")
+                messagebox.showerror("실패", f"{monitor['name']} 캡쳐에 실패했습니다. ({self.backend.name})\n{e}")
                 self.root.deiconify()
                 return
 
+            self.root.deiconify()
+            self._save_async(monitor_screenshot, filepath, lambda path, size, result: self._ask_open_file(
+                f"{monitor['name']} 스크린샷이 저장되었습니다:\n"
+                f"파일: {path}\n"
+                f"크기: {size[0]}x{size[1]}\n"
+                f"좌표: ({monitor['x']}, {monitor['y']})", path, result), bbox,
+                self._capture_meta("monitor", bbox))
+
         except Exception as e:
             self.root.deiconify()
             print(f"모니터 캡쳐 전체 오류: {e}")
             messagebox.showerror("오류", f"모니터 캡쳐 중 오류가 발생했습니다: {str(e)}")
 
+    def capture_all_monitors(self):
+        """모든 모니터를 한 번에 캡쳐 (모니터별 파일 저장)"""
+        try:
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
+            
+            # 창을 숨기고(필요할 때만) 화면에서 사라지면 캡쳐
+            self._when_ready(self.topology.virtual_bounds(), self._do_all_monitors_capture)
+            
+        except Exception as e:
+            messagebox.showerror("오류", f"모니터 캡쳐 중 오류가 발생했습니다: {str(e)}")
+            self.root.deiconify()
+    
+    def _do_all_monitors_capture(self):
+        """전체 모니터를 감싸는 영역을 한 번 캡쳐하고 모니터별 뷰를 저장"""
+        try:
+            # NumPy는 이 기능을 쓸 때만 불러온다
+            from batch import grab_batch
+            
+            monitors = list(self.monitors)
+            self._mark_capture_start()
+            batch = grab_batch(self.backend, [monitor_rect(m) for m in monitors])
+            self.root.deiconify()
+            
+            saved = []
+            failed = []
+            
+            def finish():
+                # 저장 성공/실패가 모두 끝나면 한 번에 알린다
+                if len(saved) + len(failed) < len(monitors):
+                    return
+                if not failed:
+                    self._ask_open_file(
+                        f"모든 모니터 스크린샷이 저장되었습니다 ({len(saved)}개):\n" +
+                        "\n".join(saved) + f"\n\n폴더: {self.save_folder}", self.save_folder)
+                    return
+                messagebox.showerror(
+                    "오류", f"일부 모니터를 저장하지 못했습니다 ({len(failed)}/{len(monitors)}개):\n" +
+                    "\n".join(failed) +
+                    (f"\n\n저장된 파일 ({len(saved)}개):\n" + "\n".join(saved) if saved else "") +
+                    f"\n\n폴더: {self.save_folder}")
+            
+            def on_saved(path, size, result):
+                saved.append(f"{os.path.basename(path)} ({size[0]}x{size[1]}, {result.summary()})")
+                finish()
+            
+            def on_error(path, error):
+                failed.append(f"{os.path.basename(path)}: {error}")
+                finish()
+            
+            # 각 출력은 같은 버퍼의 뷰이며, 이미지 변환/인코딩은 저장 워커에서 한다
+            for number, (monitor, view) in enumerate(zip(monitors, batch.views())):
+                filepath = self.generate_filename(f"monitor_{monitor['index']+1}")
+                rect = monitor_rect(monitor)
+                try:
+                    self._encoder(rect).submit(view, filepath, on_done=on_saved, on_error=on_error,
+                                               timeout=2, on_written=self._on_written,
+                                               meta=self._capture_meta("monitor", rect),
+                                               **self._encode_options())
+                except queue.Full:
+                    # 남은 모니터는 저장하지 못한 것으로 세고, 이미 넘긴 작업이 끝나면 알린다
+                    failed.extend(f"{m['name']}: 저장 대기열이 가득 찼습니다." for m in monitors[number:])
+                    finish()
+                    break
+            
+        except Exception as e:
+            self.root.deiconify()
+            print(f"모든 모니터 캡쳐 오류: {e}")
+            messagebox.showerror("오류", f"모니터 캡쳐 중 오류가 발생했습니다: {str(e)}")
+    
+    def capture_burst(self):
+        """연속(인터벌/버스트) 캡쳐 설정 창"""
+        if getattr(self, '_burst_running', False):
+            messagebox.showwarning("알림", "이미 연속 캡쳐가 진행 중입니다.")
+            return
+        
+        try:
+            burst_window = tk.Toplevel(self.root)
+            burst_window.title("연속 캡쳐")
+            burst_window.geometry("350x330")
+            burst_window.resizable(False, False)
+            burst_window.grab_set()
+            
+            # 캡쳐 대상 선택 (기존 전체/모니터/영역/좌표 선택을 그대로 사용)
+            targets = ["전체 화면"] + [m['name'] for m in self.monitors] + ["영역 선택", "좌표 입력"]
+            target_frame = tk.Frame(burst_window)
+            target_frame.pack(pady=5, padx=20, fill="x")
+            tk.Label(target_frame, text="캡쳐 대상:", font=("Arial", 9)).pack(anchor="w")
+            target_var = tk.StringVar(value=targets[0])
+            ttk.Combobox(target_frame, textvariable=target_var, values=targets,
+                         state="readonly", font=("Arial", 9)).pack(fill="x", pady=2)
+            
+            # 저장 방식 (개별 파일 또는 하나의 애니메이션/시퀀스 파일)
+            tk.Label(target_frame, text="저장 방식:", font=("Arial", 9)).pack(anchor="w")
+            output_var = tk.StringVar(value="개별 파일")
+            ttk.Combobox(target_frame, textvariable=output_var, values=list(BURST_OUTPUTS),
+                         state="readonly", font=("Arial", 9)).pack(fill="x", pady=2)
+            
+            # 간격/FPS, 시간/프레임 수 입력
+            option_frame = tk.Frame(burst_window)
+            option_frame.pack(pady=5, padx=20, fill="x")
+            
+            interval_var = tk.StringVar(value="1000")
+            fps_var = tk.StringVar(value="")
+            duration_var = tk.StringVar(value="10")
+            count_var = tk.StringVar(value="")
+            
+            for label, var in (("간격 (ms):", interval_var),
+                               ("목표 FPS (입력 시 간격 무시):", fps_var),
+                               ("캡쳐 시간 (초):", duration_var),
+                               ("프레임 수:", count_var)):
+                row = tk.Frame(option_frame)
+                row.pack(fill="x", pady=2)
+                tk.Label(row, text=label, width=26, anchor="w").pack(side="left")
+                tk.Entry(row, textvariable=var, width=10).pack(side="left")
+            
+            def start():
+                try:
+                    fps = float(fps_var.get()) if fps_var.get().strip() else None
+                    interval = 1.0 / fps if fps else float(interval_var.get()) / 1000
+                    duration = float(duration_var.get()) if duration_var.get().strip() else None
+                    count = int(count_var.get()) if count_var.get().strip() else None
+                    scheduler = FrameScheduler(interval, duration=duration, max_frames=count)
+                except ValueError as e:
+                    messagebox.showerror("오류", f"올바른 값을 입력해주세요.\n{e}")
+                    return
+                except ZeroDivisionError:
+                    messagebox.showerror("오류", "FPS는 0보다 커야 합니다.")
+                    return
+                
+                target = target_var.get()
+                output = BURST_OUTPUTS[output_var.get()]
+                burst_window.destroy()
+                
+                if target == "전체 화면":
+                    self._start_burst(scheduler, None, "full", output)
+                elif target == "영역 선택":
+                    selector = RegionSelector(
+                        self.root,
+                        lambda region: self._start_burst(scheduler, region, "region", output)
+                        if region else self.root.deiconify(),
+                        snap_rects=[monitor_rect(m) for m in self.monitors])
+                    self._when_ready(None, selector.start_selection, record_wait=False)
+                elif target == "좌표 입력":
+                    self.capture_region_by_coordinates(
+                        on_coords=lambda x1, y1, x2, y2: self._start_burst(
+                            scheduler, (x1, y1, x2, y2), "coords", output))
+                else:
+                    monitor = next(m for m in self.monitors if m['name'] == target)
+                    bbox = monitor_rect(monitor)
+                    self._start_burst(scheduler, bbox, f"monitor_{monitor['index']+1}", output)
+            
+            btn_frame = tk.Frame(burst_window)
+            btn_frame.pack(pady=10)
+            tk.Button(btn_frame, text="시작", command=start,
+                     bg="#4CAF50", fg="white", width=10).pack(side="left", padx=5)
+            tk.Button(btn_frame, text="취소", command=burst_window.destroy,
+                     bg="#f44336", fg="white", width=10).pack(side="left", padx=5)
+            
+        except Exception as e:
+            messagebox.showerror("오류", f"연속 캡쳐 창 생성 중 오류: {str(e)}")
+    
+    def _start_burst(self, scheduler, bbox, capture_type, output=None):
+        """연속 캡쳐 시작 (output이 있으면 하나의 시퀀스 파일로 저장)"""
+        try:
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
+            
+            sink = None
+            if output:
+                sequence_format, extension = output
+                path = os.path.splitext(self.generate_filename(f"{capture_type}_burst"))[0]
+            if output and sequence_format == "spool":
+                # 녹화 중에는 인코딩하지 않고, 가득 차면 오래된 프레임부터 덮어쓴다
+                sink = RawSpool(f"{path}.{extension}")
+            elif output:
+                sink = SequenceSink(f"{path}.{extension}", sequence_format,
+                                    results=self.save_worker.results,
+                                    on_done=lambda path, writer: self._on_sequence_saved(scheduler, path, writer),
+                                    on_error=lambda path, e: messagebox.showerror(
+                                        "오류", f"시퀀스 파일 저장 중 오류가 발생했습니다:\n{path}\n{e}"))
+            
+            self._burst_running = True
+            
+            # 창을 숨기고(필요할 때만) 화면에서 사라지면 스케줄 시작
+            self._when_ready(bbox, lambda: self._burst_tick(scheduler.start(), bbox, capture_type, sink))
+            
+        except Exception as e:
+            self._burst_running = False
+            messagebox.showerror("오류", f"연속 캡쳐 중 오류가 발생했습니다: {str(e)}")
+            self.root.deiconify()
+    
+    def _burst_tick(self, scheduler, bbox, capture_type, sink=None):
+        """연속 캡쳐 한 프레임 처리 후 다음 목표 시각에 맞춰 재예약"""
+        index = scheduler.begin_frame()
+        if index is None:
+            self._finish_burst(scheduler, sink)
+            return
+        
+        try:
+            timestamp = time.monotonic()
+            if isinstance(sink, RawSpool):
+                # 원시 픽셀을 그대로 스풀에 쓴다 (인코딩은 녹화가 끝난 뒤)
+                self._mark_capture_start()
+                with METRICS.stage("grab"):
+                    sink.grab(self.backend, bbox, timestamp)
+            elif sink is not None:
+                # 같은 프레임은 시퀀스 저장 쪽에서 앞 프레임 표시 시간으로 합쳐진다
+                sink.submit(self._grab(bbox), timestamp, block=False)
+            else:
+                self._submit_burst_frame(self._grab_frame(bbox), bbox, capture_type, index)
+        except queue.Full:
+            scheduler.drop_frame()
+        except Exception as e:
+            self._burst_running = False
+            if sink is not None:
+                sink.close()
+            self.root.deiconify()
+            messagebox.showerror("오류", f"연속 캡쳐 중 오류가 발생했습니다: {str(e)}")
+            return
+        
+        delay = scheduler.next_delay()
+        if delay is None:
+            self._finish_burst(scheduler, sink)
+        else:
+            self.root.after(int(delay * 1000), lambda: self._burst_tick(scheduler, bbox, capture_type, sink))
+    
+    def _submit_burst_frame(self, screenshot, bbox, capture_type, index):
+        """연속 캡쳐 프레임을 개별 파일로 저장 (큐가 가득 차면 queue.Full)"""
+        filepath = self.generate_filename(f"{capture_type}_burst_{index:05d}")
+        # 변화가 없는 프레임은 저장하지 않는다
+        if self._check_duplicate(bbox or "full", screenshot, filepath):
+            return
+        
+        def on_error(path, error):
+            self.dedup.discard(filepath)
+            print(f"연속 캡쳐 저장 실패: {path}: {error}")
+        
+        # 저장이 밀리면 기다리지 않고 프레임을 버린다 (버린 프레임은 중복 기준이 되지 않는다)
+        self._encoder(bbox or monitor_rect(self.topology.primary())).submit(
+            screenshot, filepath, block=False, on_written=self._on_written,
+            meta=self._capture_meta(f"{capture_type.split('_')[0]}_burst", bbox),
+            on_error=on_error, **self._encode_options())
+        self._remember_saved(bbox or "full", screenshot, filepath)
+    
+    def _finish_burst(self, scheduler, sink=None):
+        """연속 캡쳐 종료 및 통계 표시"""
+        self._burst_running = False
+        self.root.deiconify()
+        if isinstance(sink, RawSpool):
+            sink.close()
+            self._on_spool_saved(scheduler, sink)
+            return
+        if sink is not None:
+            # 시퀀스 파일은 남은 프레임 인코딩이 끝나면 _on_sequence_saved에서 알린다
+            sink.close()
+            return
+        summary = scheduler.stats().summary()
+        if DEDUP_MODES.get(self.dedup_var.get()):
+            summary += f"\n\n중복 제거 (누적):\n{self.dedup.stats.summary()}"
+        print(f"연속 캡쳐 완료:\n{summary}")
+        messagebox.showinfo("연속 캡쳐 완료", f"{summary}\n\n저장 폴더: {self.save_folder}")
+    
+    def _on_sequence_saved(self, scheduler, path, writer):
+        """시퀀스 파일 저장 완료 콜백"""
+        summary = scheduler.stats().summary()
+        print(f"연속 캡쳐 완료:\n{summary}")
+        messagebox.showinfo("연속 캡쳐 완료",
+                            f"{summary}\n\n"
+                            f"시퀀스 파일: {path}\n"
+                            f"저장된 프레임: {writer.frames_written}장 "
+                            f"(변화 없어 합친 프레임 {writer.frames_merged}장)")
+    
+    def _on_spool_saved(self, scheduler, spool):
+        """스풀 녹화 완료 후 압축 여부 확인"""
+        summary = scheduler.stats().summary()
+        print(f"연속 캡쳐 완료:\n{summary}")
+        if not messagebox.askyesno("연속 캡쳐 완료",
+                                   f"{summary}\n\n"
+                                   f"스풀 파일: {spool.path}\n"
+                                   f"기록된 프레임: {len(spool)}장 (덮어쓴 프레임 {spool.dropped}장)\n\n"
+                                   f"지금 개별 파일로 압축하시겠습니까?"):
+            return
+        folder = os.path.splitext(spool.path)[0]
+        results = self.save_worker.results
+        options = self._encode_options()
+        
+        def export():
+            # 압축은 백그라운드 스레드에서 하고, 결과 알림은 Tk 스레드에서 처리
+            try:
+                paths = export_frames(spool.path, folder, options["file_format"], options["profile"])
+                results.put((lambda: self._ask_open_file(
+                    f"스풀을 {len(paths)}개 파일로 압축했습니다:\n{folder}", folder), ()))
+            except Exception as e:
+                # e는 except 블록이 끝나면 지워지므로 메시지는 여기서 만든다
+                message = f"스풀 압축 중 오류가 발생했습니다:\n{e}"
+                results.put((lambda: messagebox.showerror("오류", message), ()))
+        
+        threading.Thread(target=export, name="spool-export", daemon=True).start()
+    
+    def capture_watch(self):
+        """변경 감시 캡쳐 설정 창 (영역이 바뀔 때만 저장)"""
+        if self.watcher is not None and self.watcher.running:
+            messagebox.showwarning("알림", "이미 변경 감시가 진행 중입니다.")
+            return
+        
+        try:
+            watch_window = tk.Toplevel(self.root)
+            watch_window.title("변경 감시 캡쳐")
+            watch_window.geometry("350x260")
+            watch_window.resizable(False, False)
+            watch_window.grab_set()
+            
+            # 감시 대상 선택 (연속 캡쳐와 같은 전체/모니터/영역/좌표 선택)
+            targets = ["전체 화면"] + [m['name'] for m in self.monitors] + ["영역 선택", "좌표 입력"]
+            target_frame = tk.Frame(watch_window)
+            target_frame.pack(pady=5, padx=20, fill="x")
+            tk.Label(target_frame, text="감시 대상:", font=("Arial", 9)).pack(anchor="w")
+            target_var = tk.StringVar(value=targets[0])
+            ttk.Combobox(target_frame, textvariable=target_var, values=targets,
+                         state="readonly", font=("Arial", 9)).pack(fill="x", pady=2)
+            
+            # 확인 빈도, 변경 기준, 안정 대기 시간
+            option_frame = tk.Frame(watch_window)
+            option_frame.pack(pady=5, padx=20, fill="x")
+            
+            fps_var = tk.StringVar(value="4")
+            threshold_var = tk.StringVar(value="0")
+            debounce_var = tk.StringVar(value="300")
+            
+            for label, var in (("확인 빈도 (회/초):", fps_var),
+                               ("변경 기준 (바뀐 비율 %):", threshold_var),
+                               ("안정 대기 (ms):", debounce_var)):
+                row = tk.Frame(option_frame)
+                row.pack(fill="x", pady=2)
+                tk.Label(row, text=label, width=26, anchor="w").pack(side="left")
+                tk.Entry(row, textvariable=var, width=10).pack(side="left")
+            
+            def start():
+                try:
+                    options = {"probe_fps": float(fps_var.get()),
+                               "threshold": float(threshold_var.get()) / 100,
+                               "debounce": float(debounce_var.get()) / 1000}
+                    if options["probe_fps"] <= 0:
+                        raise ValueError("확인 빈도는 0보다 커야 합니다.")
+                except ValueError as e:
+                    messagebox.showerror("오류", f"올바른 값을 입력해주세요.\n{e}")
+                    return
+                
+                target = target_var.get()
+                watch_window.destroy()
+                
+                if target == "전체 화면":
+                    self._start_watch(None, "full", options)
+                elif target == "영역 선택":
+                    selector = RegionSelector(
+                        self.root,
+                        lambda region: self._start_watch(region, "region", options)
+                        if region else self.root.deiconify(),
+                        snap_rects=[monitor_rect(m) for m in self.monitors])
+                    self._when_ready(None, selector.start_selection, record_wait=False)
+                elif target == "좌표 입력":
+                    self.capture_region_by_coordinates(
+                        on_coords=lambda x1, y1, x2, y2: self._start_watch(
+                            (x1, y1, x2, y2), "coords", options))
+                else:
+                    monitor = next(m for m in self.monitors if m['name'] == target)
+                    self._start_watch(monitor_rect(monitor), f"monitor_{monitor['index']+1}", options)
+            
+            btn_frame = tk.Frame(watch_window)
+            btn_frame.pack(pady=10)
+            tk.Button(btn_frame, text="시작", command=start,
+                     bg="#4CAF50", fg="white", width=10).pack(side="left", padx=5)
+            tk.Button(btn_frame, text="취소", command=watch_window.destroy,
+                     bg="#f44336", fg="white", width=10).pack(side="left", padx=5)
+            
+        except Exception as e:
+            messagebox.showerror("오류", f"변경 감시 창 생성 중 오류: {str(e)}")
+    
+    def _start_watch(self, bbox, capture_type, options):
+        """변경 감시 시작 (앱 창이 감시 영역을 가리지 않게 된 뒤 기준 화면을 잡는다)"""
+        try:
+            # 저장 폴더 업데이트 (세션에서 처음 쓰는 폴더면 생성)
+            self._prepare_save_folder()
+            
+            # 감시 스레드에서는 Tk 변수를 읽지 않도록 설정을 미리 고정한다
+            encoder = self._encoder()
+            encode_options = self._encode_options()
+            prefix = self.prefix_var.get()
+            folder = self.save_folder
+            watch_type = f"{capture_type.split('_')[0]}_watch"
+            meta = self._capture_meta(watch_type, bbox)
+            
+            def on_trigger(image, event):
+                filepath = capture_filename(folder, prefix, f"{capture_type}_watch_{event.index:05d}",
+                                            encode_options["file_format"])
+                
+                def on_written(job):
+                    watcher.mark_saved(event)
+                    self._on_written(job)
+                
+                try:
+                    # 저장이 밀리면 기다리지 않고 이번 변경은 버린다
+                    encoder.submit(image, filepath, block=False, on_written=on_written,
+                                   meta=dict(meta, timestamp=time.time()),
+                                   on_error=lambda path, e: print(f"변경 감시 저장 실패: {path}: {e}"),
+                                   **encode_options)
+                except queue.Full:
+                    print(f"저장 대기열이 가득 차 변경 캡쳐를 건너뜁니다: {filepath}")
+            
+            # NumPy는 이 기능을 쓸 때만 불러온다
+            from watch import ChangeWatcher
+            watcher = ChangeWatcher(self.backend, bbox, on_trigger=on_trigger, **options)
+            self.watcher = watcher
+            
+            def begin():
+                self._withdrawn_at = None
+                watcher.start()
+                self.root.deiconify()
+                self._show_watch_status(watcher, bbox)
+            
+            # 기준 화면에 앱 창이 찍히지 않도록 숨긴 뒤 시작
+            self._when_ready(bbox, begin, record_wait=False)
+            
+        except Exception as e:
+            self.watcher = None
+            messagebox.showerror("오류", f"변경 감시 시작 중 오류가 발생했습니다: {str(e)}")
+            self.root.deiconify()
+    
+    def _show_watch_status(self, watcher, bbox):
+        """변경 감시 진행 상태 창 (중지 버튼을 누르거나 창을 닫으면 감시 종료)"""
+        window = tk.Toplevel(self.root)
+        window.title("변경 감시 중")
+        window.resizable(False, False)
+        
+        target = "주 모니터 전체" if bbox is None else f"({bbox[0]}, {bbox[1]}) - ({bbox[2]}, {bbox[3]})"
+        tk.Label(window, text=f"감시 영역: {target}", font=("Arial", 9, "bold")).pack(padx=10, pady=(10, 5))
+        status_var = tk.StringVar()
+        tk.Label(window, textvariable=status_var, font=("Arial", 9), justify="left").pack(padx=10, pady=5)
+        
+        def refresh():
+            if not window.winfo_exists() or not watcher.running:
+                return
+            status_var.set(watcher.stats.summary())
+            window.after(500, refresh)
+        
+        def stop():
+            watcher.stop()
+            if self.watcher is watcher:
+                self.watcher = None
+            window.destroy()
+            summary = watcher.stats.summary()
+            print(f"변경 감시 종료:\n{summary}")
+            messagebox.showinfo("변경 감시 종료", f"{summary}\n\n저장 폴더: {self.save_folder}")
+        
+        tk.Button(window, text="중지", command=stop,
+                 bg="#f44336", fg="white", width=10).pack(pady=(5, 10))
+        window.protocol("WM_DELETE_WINDOW", stop)
+        refresh()
+    
     def show_monitor_info(self):
         """모니터 정보를 팝업으로 표시"""
         info_text = "현재 감지된 모니터 정보:\n\n"
         
-        for monitor in self.monitors:
+        # 확인할 때는 캐시를 무시하고 다시 감지
+        for monitor in self.topology.refresh():
             info_text += f"{monitor['name']}:\n"
             info_text += f"  위치: ({monitor['x']}, {monitor['y']})\n"
             info_text += f"  크기: {monitor['width']} x {monitor['height']}\n"
@@ -825,24 +1758,78 @@ class ScreenCaptureApp:
             info_text += f"({monitor['x'] + monitor['width']}, {monitor['y'] + monitor['height']})\n\n"
         
         # 전체 화면 정보
-        try:
-            virtual_width = self.root.winfo_vrootwidth()
-            virtual_height = self.root.winfo_vrootheight()
-            info_text += f"가상 화면 크기: {virtual_width} x {virtual_height}\n"
-        except:
-            pass
+        min_x, min_y, max_x, max_y = self.topology.virtual_bounds()
+        info_text += f"가상 화면: ({min_x}, {min_y}) - ({max_x}, {max_y}) [{max_x - min_x} x {max_y - min_y}]\n"
         
         messagebox.showinfo("모니터 정보", info_text)
+    
+    def show_stats(self):
+        """단계별 캡쳐 시간 통계 창 (열려 있는 동안 1초마다 갱신)"""
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        
+        window = self.stats_window = tk.Toplevel(self.root)
+        window.title("성능 통계 (ms)")
+        window.resizable(False, False)
+        
+        text = tk.Text(window, width=66, height=10, font=("Consolas", 9))
+        text.pack(padx=10, pady=(10, 5))
+        
+        control_frame = tk.Frame(window)
+        control_frame.pack(pady=(0, 10))
+        enabled_var = tk.BooleanVar(value=METRICS.enabled)
+        
+        def toggle():
+            METRICS.enabled = enabled_var.get()
+        
+        def reset():
+            METRICS.reset()
+            refresh(reschedule=False)
+        
+        def save():
+            path = filedialog.asksaveasfilename(parent=window, title="통계 저장",
+                                                defaultextension=".jsonl",
+                                                filetypes=[("JSON Lines", "*.jsonl")],
+                                                initialdir=self.save_folder,
+                                                initialfile="capture_metrics.jsonl")
+            if not path:
+                return
+            try:
+                count = METRICS.dump_jsonl(path, backend=self.backend.name)
+                messagebox.showinfo("알림", f"{count}개 단계의 통계를 저장했습니다:\n{path}", parent=window)
+            except OSError as e:
+                messagebox.showerror("오류", f"통계를 저장할 수 없습니다: {str(e)}", parent=window)
+        
+        def refresh(reschedule=True):
+            if not window.winfo_exists():
+                return
+            text.config(state="normal")
+            text.delete("1.0", "end")
+            text.insert("end", METRICS.format_table())
+            text.config(state="disabled")
+            if reschedule:
+                window.after(1000, refresh)
+        
+        tk.Checkbutton(control_frame, text="측정", variable=enabled_var, command=toggle).pack(side="left", padx=5)
+        tk.Button(control_frame, text="초기화", command=reset, width=8).pack(side="left", padx=5)
+        tk.Button(control_frame, text="JSON 저장", command=save, width=10).pack(side="left", padx=5)
+        refresh()
 
 def main():
-    # pyautogui 설정
-    pyautogui.FAILSAFE = True  # 마우스를 화면 모서리로 이동하면 중단
+    # 명령줄 인자가 있으면 GUI 없이 실행 (python capture.py full -o 폴더 ...)
+    if len(sys.argv) > 1:
+        import cli
+        sys.exit(cli.main(sys.argv[1:]))
     
+    # pyautogui 설정
     try:
-        import ctypes
-        ctypes.windll.user32.SetProcessDPIAware()
-    except Exception as dpi_error:
-        print(f"DPI aware 설정 실패: {dpi_error}")
+        import pyautogui
+        pyautogui.FAILSAFE = True  # 마우스를 화면 모서리로 이동하면 중단
+    except ImportError:
+        pass
+    
+    enable_dpi_awareness()
     
     # GUI 애플리케이션 실행
     root = tk.Tk()
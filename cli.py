@@ -0,0 +1,573 @@
+"""GUI 없이 명령줄에서 캡쳐하기
+
+    python cli.py full -o ~/shots
+    python cli.py monitor 2 -f jpeg
+    python cli.py full -f auto --profile fastest
+    python cli.py region 100,100,500,400 -n 10 -i 500
+    python cli.py monitors
+    python cli.py full --fps 60 --duration 10 --spool rec.capspool
+    python cli.py export rec.capspool rec.webp
+    python cli.py monitor 1 --archive monitor_1.captiles
+    python cli.py export monitor_1.captiles frames/ --start 100 --stop 110
+    python cli.py history --since 2026-01-01 --monitor 2
+    python cli.py full -n 100 --fps 10 --metrics metrics.jsonl
+    python cli.py full -n 1000 --fps 30 --fsync batch --fsync-every 64
+    python cli.py region 0,0,800,600 --watch --probe-fps 4 --debounce 300 --duration 600
+    python cli.py region 100,100,900,800 --scroll --delay 2
+    python cli.py similar ~/Desktop ~/Desktop/screenshot_full_20260101_120000.png
+    python cli.py similar ~/Desktop --distance 3
+
+Tk는 전혀 불러오지 않고, 캡쳐 백엔드와 Pillow는 실제로 캡쳐할 때 import한다.
+cron/CI에서 호출할 때 GUI 초기화와 창 숨김 대기가 없다.
+저장된 파일 경로는 한 줄에 하나씩 표준 출력으로 내보낸다.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+_START = time.perf_counter()
+
+
+def _parse_region(text):
+    """'x1,y1,x2,y2' 문자열을 정렬된 (left, top, right, bottom)으로"""
+    try:
+        x1, y1, x2, y2 = (int(v) for v in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"영역은 x1,y1,x2,y2 형식이어야 합니다: {text}")
+    return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+
+def _parse_size(text):
+    """'WxH' 문자열을 (width, height)로"""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"크기는 WxH 형식이어야 합니다: {text}")
+    return width, height
+
+
+def build_parser():
+    """명령줄 인자 파서"""
+    parser = argparse.ArgumentParser(prog="capture", description="화면 캡쳐 (GUI 없이 실행)")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-o", "--output-dir", default=os.path.expanduser("~/Desktop"),
+                        help="저장 폴더 (기본: 바탕화면)")
+    common.add_argument("-p", "--prefix", default="screenshot", help="파일명 접두사")
+    common.add_argument("-f", "--format", default="png", type=str.lower,
+                        choices=["png", "jpeg", "webp", "bmp", "raw", "auto"],
+                        help="파일 형식 (auto: 화면 내용에 따라 PNG/WebP 선택)")
+    common.add_argument("--profile", default="balanced", choices=["fastest", "balanced", "smallest"],
+                        help="인코딩 프로파일 (기본 balanced)")
+    common.add_argument("--processes", type=int, default=0,
+                        help="여러 장 캡쳐 시 인코딩 프로세스 수 (기본 0: 스레드 하나)")
+    common.add_argument("-n", "--count", type=int, default=1, help="캡쳐 횟수 (기본 1)")
+    common.add_argument("-i", "--interval", type=float, default=1000, help="캡쳐 간격 ms (기본 1000)")
+    common.add_argument("--fps", type=float, help="목표 FPS (지정하면 --interval 무시)")
+    common.add_argument("--duration", type=float, help="캡쳐 시간(초), 지정하면 --count 대신 사용")
+    common.add_argument("--delay", type=float, default=0, help="첫 캡쳐 전 대기 시간(초)")
+    common.add_argument("--backend", help="캡쳐 백엔드 (win32, imagegrab, pyautogui, synthetic)")
+    common.add_argument("--size", type=_parse_size, help="synthetic 백엔드 화면 크기 (WxH)")
+    common.add_argument("--timing", action="store_true", help="단계별 소요 시간을 표준 오류로 출력")
+    common.add_argument("--metrics", metavar="FILE", help="단계별 시간 히스토그램 요약을 JSON lines로 덧붙여 저장")
+    common.add_argument("--spool", help="여러 장 캡쳐 시 인코딩하지 않고 원시 프레임을 이 스풀 파일에 기록")
+    common.add_argument("--spool-size", type=int, default=1024, help="스풀 파일 크기 MB (기본 1024)")
+    common.add_argument("--when-full", default="drop_oldest", choices=["drop_oldest", "stop"],
+                        help="스풀이 가득 차면 오래된 프레임 덮어쓰기 / 캡쳐 중단")
+    common.add_argument("--archive", metavar="FILE",
+                        help="캡쳐를 타일 아카이브(.captiles) 뒤에 이어 씀 (바뀐 타일만, 없으면 새로 만듦)")
+    common.add_argument("--keyframe-interval", type=int, default=30,
+                        help="--archive 키프레임 간격 (기본 30)")
+    common.add_argument("--watch", action="store_true",
+                        help="영역이 바뀔 때만 캡쳐 (--duration 또는 -n 저장 수까지, 없으면 Ctrl+C까지)")
+    common.add_argument("--probe-fps", type=float, default=4.0, help="--watch 초당 확인 횟수 (기본 4)")
+    common.add_argument("--debounce", type=float, default=300,
+                        help="--watch 변경 후 화면이 멈출 때까지 기다릴 시간 ms (기본 300)")
+    common.add_argument("--change-threshold", type=float, default=0.0,
+                        help="--watch 바뀐 축소 픽셀 비율 %% 기준 (기본 0: 하나라도 바뀌면)")
+    common.add_argument("--scroll", action="store_true",
+                        help="스크롤하는 동안 캡쳐해 긴 PNG 하나로 이어붙임 (새 내용이 없으면 자동 종료)")
+    common.add_argument("--fsync", default="none", choices=["none", "file", "batch"],
+                        help="저장한 파일을 디스크에 기록하는 시점 (none: 운영체제에 맡김, file: 파일마다, "
+                             "batch: --fsync-every장 또는 --fsync-ms마다 모아서)")
+    common.add_argument("--fsync-every", type=int, default=32, help="--fsync batch 파일 수 (기본 32)")
+    common.add_argument("--fsync-ms", type=float, default=1000, help="--fsync batch 최대 간격 ms (기본 1000)")
+    common.add_argument("--history", dest="history_db", help="캡쳐 기록 데이터베이스 경로")
+    common.add_argument("--no-history", action="store_true", help="캡쳐 기록을 남기지 않음")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("full", parents=[common], help="주 모니터 전체 캡쳐")
+    monitor = sub.add_parser("monitor", parents=[common], help="특정 모니터 캡쳐 (1부터 시작)")
+    monitor.add_argument("number", type=int)
+    region = sub.add_parser("region", parents=[common], help="좌표 영역 캡쳐")
+    region.add_argument("rect", type=_parse_region, metavar="x1,y1,x2,y2")
+    listing = sub.add_parser("monitors", help="감지된 모니터 목록 출력")
+    listing.add_argument("--backend", help=argparse.SUPPRESS)
+    listing.add_argument("--size", type=_parse_size, help=argparse.SUPPRESS)
+    export = sub.add_parser("export", help="스풀/타일 아카이브 파일을 압축 저장 (애니메이션 파일 또는 폴더)")
+    export.add_argument("spool", help="스풀(.capspool) 또는 타일 아카이브(.captiles) 파일")
+    export.add_argument("output", help="애니메이션 파일(.png/.webp/.gif) 또는 개별 파일을 저장할 폴더")
+    export.add_argument("-f", "--format", default="png", type=str.lower,
+                        choices=["png", "jpeg", "webp", "bmp", "auto"], help="폴더로 저장할 때 파일 형식")
+    export.add_argument("--profile", default="balanced", choices=["fastest", "balanced", "smallest"],
+                        help="폴더로 저장할 때 인코딩 프로파일")
+    export.add_argument("--start", type=int, default=0, help="타일 아카이브에서 이 프레임부터 (기본 0)")
+    export.add_argument("--stop", type=int, help="타일 아카이브에서 이 프레임 전까지 (기본 끝까지)")
+    history = sub.add_parser("history", help="캡쳐 기록 검색")
+    history.add_argument("--db", dest="history_db", help="캡쳐 기록 데이터베이스 경로")
+    history.add_argument("--since", type=_parse_time, help="이 시각 이후 (YYYY-mm-dd[ HH:MM[:SS]])")
+    history.add_argument("--until", type=_parse_time, help="이 시각 이전")
+    history.add_argument("--monitor", type=int, help="모니터 번호 (1부터 시작)")
+    history.add_argument("--overlaps", type=_parse_region, metavar="x1,y1,x2,y2",
+                         help="이 영역과 겹치는 캡쳐")
+    history.add_argument("--hash", dest="content_hash", help="내용 해시 (16진수)")
+    history.add_argument("--limit", type=int, default=100, help="최대 출력 수 (기본 100)")
+    history.add_argument("--rescan", metavar="FOLDER", help="검색 전에 폴더의 새 파일을 기록에 추가")
+    history.add_argument("--prune", action="store_true", help="--rescan 시 사라진 파일의 기록 삭제")
+    similar = sub.add_parser("similar", help="비슷한 캡쳐 찾기 / 거의 같은 캡쳐 묶기 (지각 해시)")
+    similar.add_argument("folder", help="캡쳐 폴더 (지문은 폴더 안 .capture_fingerprints에 저장)")
+    similar.add_argument("image", nargs="?", help="이 이미지와 비슷한 캡쳐 찾기 (없으면 거의 같은 캡쳐 묶음 출력)")
+    similar.add_argument("-d", "--distance", type=int,
+                         help="해밍 거리 기준 (기본: 찾기 8, 묶기 3, 0~64)")
+    similar.add_argument("--hash", dest="hash_kind", default="phash", choices=["phash", "dhash"],
+                         help="비교할 해시 (기본 phash)")
+    similar.add_argument("--limit", type=int, default=50, help="찾기 결과 최대 수 (기본 50)")
+    similar.add_argument("--no-backfill", action="store_true",
+                         help="새 파일의 지문을 계산하지 않고 저장된 지문만 사용")
+    return parser
+
+
+def _parse_time(text):
+    """'YYYY-mm-dd[ HH:MM[:SS]]' 문자열을 유닉스 시각으로"""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"시각은 YYYY-mm-dd[ HH:MM[:SS]] 형식이어야 합니다: {text}")
+
+
+def _open_history(args):
+    """캡쳐 기록 데이터베이스 (--no-history면 None)"""
+    if getattr(args, "no_history", False):
+        return None
+    from history import DEFAULT_DB_PATH, CaptureHistory
+    return CaptureHistory(args.history_db or DEFAULT_DB_PATH)
+
+
+def _capture_meta(capture_type, bbox, backend):
+    """캡쳐 기록용 정보 (capture_type이 monitor_<번호>[_종류]면 모니터 번호를 떼어 낸다)"""
+    parts = capture_type.split("_")
+    if parts[0] == "monitor" and len(parts) > 1 and parts[1].isdigit():
+        return {"capture_type": "_".join(["monitor"] + parts[2:]), "monitor": int(parts[1]) - 1,
+                "rect": bbox, "timestamp": time.time()}
+    return {"capture_type": capture_type, "monitor": None,
+            "rect": bbox or _primary_rect(backend), "timestamp": time.time()}
+
+
+def _create_backend(args):
+    from backends import create_backend
+    kwargs = {}
+    if args.size:
+        kwargs = {"width": args.size[0], "height": args.size[1]}
+    return create_backend(args.backend, **kwargs)
+
+
+def _resolve_target(args, backend):
+    """(bbox, 캡쳐 종류) 결정"""
+    if args.command == "full":
+        return None, "full"
+    if args.command == "region":
+        left, top, right, bottom = args.rect
+        if right - left < 10 or bottom - top < 10:
+            raise ValueError("캡쳐 영역이 너무 작습니다.")
+        return args.rect, "coords"
+
+    from monitors import detect_monitors, monitor_rect
+    monitors = detect_monitors(backend=backend, verbose=False)
+    if not 1 <= args.number <= len(monitors):
+        raise ValueError(f"모니터 번호는 1~{len(monitors)} 사이여야 합니다.")
+    return monitor_rect(monitors[args.number - 1]), f"monitor_{args.number}"
+
+
+def _primary_rect(backend):
+    """주 모니터의 (left, top, right, bottom)"""
+    from monitors import detect_monitors, monitor_rect
+    monitors = detect_monitors(backend=backend, verbose=False)
+    return monitor_rect(next((m for m in monitors if m['is_primary']), monitors[0]))
+
+
+def _sync_policy(args):
+    """--fsync 옵션에 맞는 SyncPolicy"""
+    from filestore import SyncPolicy
+    return SyncPolicy(args.fsync, args.fsync_every, args.fsync_ms)
+
+
+def _log(args, message):
+    if args.timing:
+        print(message, file=sys.stderr)
+
+
+def run_capture(args):
+    """캡쳐 명령 실행, 저장한 파일 경로 목록 반환"""
+    from metrics import METRICS
+    try:
+        return _run_capture(args)
+    finally:
+        if METRICS.snapshot():
+            _log(args, METRICS.format_table())
+            if args.metrics:
+                METRICS.dump_jsonl(args.metrics, command=args.command)
+
+
+def _run_capture(args):
+    from encoding import save_image
+    from filestore import ensure_folder
+    from metrics import METRICS
+    from pipeline import ProcessSaveWorker, SaveWorker, capture_filename
+    from scheduler import FrameScheduler
+
+    backend = _create_backend(args)
+    bbox, capture_type = _resolve_target(args, backend)
+    ensure_folder(args.output_dir)
+    history = None if args.spool or args.archive else _open_history(args)
+    _log(args, f"준비 완료: {(time.perf_counter() - _START) * 1000:.1f}ms (백엔드: {backend.name})")
+
+    if args.delay > 0:
+        time.sleep(args.delay)
+
+    saved = []
+    if args.scroll:
+        return _run_scroll(args, backend, bbox, capture_type, history)
+    if args.watch:
+        return _run_watch(args, backend, bbox, capture_type, history)
+    if args.archive:
+        return _run_archive(args, backend, bbox)
+    if args.count <= 1 and args.duration is None:
+        with METRICS.stage("grab"):
+            screenshot = backend.grab(bbox)
+        filepath = capture_filename(args.output_dir, args.prefix, capture_type, args.format)
+        # 한 장이면 batch도 묶을 파일이 없으므로 바로 기록한다
+        result = save_image(screenshot, filepath, args.format, args.profile, fsync=args.fsync != "none")
+        METRICS.record_encode(result)
+        _log(args, f"저장: {result.summary()}")
+        if history is not None:
+            from history import content_hash
+            meta = _capture_meta(capture_type, bbox, backend)
+            history.record(result.path, meta["capture_type"], meta["monitor"], meta["rect"],
+                           meta["timestamp"], screenshot.size, result.format, result.nbytes,
+                           result.encode_time, content_hash(screenshot), os.path.getmtime(result.path))
+            history.close()
+        saved.append(result.path)
+        print(result.path)
+        return saved
+
+    # 여러 장이면 캡쳐와 인코딩/저장을 겹쳐서 처리한다
+    interval = 1.0 / args.fps if args.fps else args.interval / 1000
+    scheduler = FrameScheduler(interval, duration=args.duration,
+                               max_frames=None if args.duration else args.count)
+    if args.spool:
+        return _run_spool(args, backend, bbox, scheduler)
+    ring = None
+    if args.processes > 0:
+        # 캡쳐한 픽셀은 공유 메모리 슬롯에 바로 담아 워커 프로세스에 넘긴다
+        from shared_frames import SharedFrameRing
+        left, top, right, bottom = bbox or _primary_rect(backend)
+        ring = SharedFrameRing(slots=args.processes * 2 + 2,
+                               slot_size=(right - left) * (bottom - top) * 4)
+        worker = ProcessSaveWorker(max_pending=8, processes=args.processes, ring=ring,
+                                   sync=_sync_policy(args),
+                                   digests=("content_hash",) if history is not None else ())
+    else:
+        worker = SaveWorker(max_pending=8, sync=_sync_policy(args))
+
+    burst_type = f"{capture_type}_burst"
+
+    def on_done(path, size, result):
+        saved.append(path)
+        print(path)
+        _log(args, f"{os.path.basename(path)}: {result.summary()}")
+
+    def on_error(path, error):
+        print(f"저장 실패: {path}: {error}", file=sys.stderr)
+
+    def capture(index):
+        with METRICS.stage("grab"):
+            screenshot = ring.grab(backend, bbox) if ring else backend.grab(bbox)
+        filepath = capture_filename(args.output_dir, args.prefix,
+                                    f"{capture_type}_burst_{index:05d}", args.format)
+        worker.submit(screenshot, filepath, on_done=on_done, on_error=on_error,
+                      on_written=history.record_job if history is not None else None,
+                      meta=_capture_meta(burst_type, bbox, backend) if history is not None else None,
+                      file_format=args.format, profile=args.profile)
+        worker.poll()
+
+    stats = scheduler.run(capture)
+    worker.join()
+    worker.poll()
+    worker.shutdown()
+    if ring:
+        ring.close()
+    if history is not None:
+        history.close()
+    _log(args, stats.summary())
+    return saved
+
+
+def _run_watch(args, backend, bbox, capture_type, history):
+    """영역이 바뀔 때만 캡쳐하여 저장, 저장한 파일 경로 목록 반환"""
+    import threading
+    from pipeline import SaveWorker, capture_filename
+    from watch import ChangeWatcher
+
+    saved = []
+    done = threading.Event()
+    worker = SaveWorker(max_pending=4, sync=_sync_policy(args))
+    watch_type = f"{capture_type}_watch"
+
+    def on_trigger(image, event):
+        filepath = capture_filename(args.output_dir, args.prefix,
+                                    f"{capture_type}_watch_{event.index:05d}", args.format)
+
+        def on_written(job):
+            watcher.mark_saved(event)
+            if history is not None:
+                history.record_job(job)
+
+        worker.submit(image, filepath, on_written=on_written,
+                      on_done=lambda path, size, result: saved.append(path) or print(path, flush=True),
+                      on_error=lambda path, e: print(f"저장 실패: {path}: {e}", file=sys.stderr),
+                      meta=_capture_meta(watch_type, bbox, backend),
+                      file_format=args.format, profile=args.profile)
+        _log(args, f"변경 감지: 바뀐 비율 {event.changed:.1%}, "
+                   f"감지 후 캡쳐까지 {(event.captured_at - event.detected_at) * 1000:.0f}ms")
+        if args.count > 1 and event.index + 1 >= args.count:
+            done.set()
+
+    watcher = ChangeWatcher(backend, bbox, on_trigger=on_trigger, probe_fps=args.probe_fps,
+                            threshold=args.change_threshold / 100, debounce=args.debounce / 1000)
+    watcher.start()
+    try:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        while not done.is_set() and (deadline is None or time.monotonic() < deadline):
+            done.wait(0.2 if deadline is None else max(0.0, min(0.2, deadline - time.monotonic())))
+            worker.poll()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        worker.join()
+        worker.poll()
+        worker.shutdown()
+        if history is not None:
+            history.close()
+    _log(args, watcher.stats.summary())
+    return saved
+
+
+def _run_scroll(args, backend, bbox, capture_type, history):
+    """스크롤 캡쳐: 새 내용이 IDLE_STOP초 동안 없거나 --duration/Ctrl+C까지, 저장한 경로 목록 반환"""
+    from metrics import METRICS
+    from panorama import IDLE_STOP, SCROLL_INTERVAL, PanoramaStitcher
+    from pipeline import capture_filename
+
+    interval = 1.0 / args.fps if args.fps else SCROLL_INTERVAL
+    filepath = os.path.splitext(capture_filename(args.output_dir, args.prefix,
+                                                 f"{capture_type}_scroll", "png"))[0] + ".png"
+    deadline = time.monotonic() + args.duration if args.duration else None
+    last_change = None
+    try:
+        with PanoramaStitcher(filepath) as stitcher:
+            _log(args, f"스크롤 캡쳐 시작: {IDLE_STOP:.0f}초 동안 새 내용이 없으면 끝납니다.")
+            try:
+                while deadline is None or time.monotonic() < deadline:
+                    with METRICS.stage("grab"):
+                        image = backend.grab(bbox)
+                    if stitcher.add(image) and stitcher.stitched > 1:
+                        last_change = time.monotonic()
+                    if last_change is not None and time.monotonic() - last_change >= IDLE_STOP:
+                        break
+                    time.sleep(interval)
+            except KeyboardInterrupt:
+                pass
+        if not stitcher.frames:
+            return []
+        filepath = stitcher.path
+        width, height = stitcher.size
+        _log(args, f"이어붙인 크기: {width}x{height} (캡쳐 {stitcher.frames}장 중 {stitcher.stitched}장 사용, "
+                   f"이어지지 않은 곳 {stitcher.gaps}군데)")
+        if history is not None:
+            meta = _capture_meta(f"{capture_type}_scroll", bbox, backend)
+            history.record(filepath, meta["capture_type"], meta["monitor"], meta["rect"], meta["timestamp"],
+                           (width, height), "png", os.path.getsize(filepath),
+                           mtime=os.path.getmtime(filepath))
+        print(filepath)
+        return [filepath]
+    finally:
+        if history is not None:
+            history.close()
+
+
+def _run_spool(args, backend, bbox, scheduler):
+    """인코딩 없이 원시 프레임을 스풀에 기록, 스풀 경로 목록 반환"""
+    import threading
+    from metrics import METRICS
+    from spool import RawSpool, SpoolFull
+
+    stop = threading.Event()
+    with RawSpool(args.spool, budget=args.spool_size * 1024 * 1024, when_full=args.when_full) as spool:
+        def capture(index):
+            try:
+                with METRICS.stage("grab"):
+                    spool.grab(backend, bbox)
+            except SpoolFull as e:
+                print(f"{e} - 캡쳐를 중단합니다.", file=sys.stderr)
+                stop.set()
+                return False
+
+        stats = scheduler.run(capture, stop_event=stop)
+        _log(args, f"스풀: {len(spool)}프레임 (덮어쓴 프레임 {spool.dropped}장), "
+                   f"{spool.used_bytes() / 1024 / 1024:.1f}MB")
+    _log(args, stats.summary())
+    print(args.spool)
+    return [args.spool]
+
+
+def _run_archive(args, backend, bbox):
+    """캡쳐를 타일 아카이브 하나에 이어 쓰기 (-n/--duration이면 여러 장), 아카이브 경로 목록 반환"""
+    from archive import TileArchiveWriter
+    from metrics import METRICS
+    from scheduler import FrameScheduler
+
+    with TileArchiveWriter(args.archive, keyframe_interval=args.keyframe_interval, append=True) as writer:
+        before = len(writer.entries)
+
+        def capture(index):
+            with METRICS.stage("grab"):
+                screenshot = backend.grab(bbox)
+            writer.add(screenshot)
+
+        if args.count <= 1 and args.duration is None:
+            capture(0)
+        else:
+            interval = 1.0 / args.fps if args.fps else args.interval / 1000
+            scheduler = FrameScheduler(interval, duration=args.duration,
+                                       max_frames=None if args.duration else args.count)
+            _log(args, scheduler.run(capture).summary())
+    _log(args, f"아카이브: {len(writer.entries) - before}프레임 추가 (전체 {len(writer.entries)}프레임, "
+               f"키프레임 {writer.keyframes}장, 이번에 쓴 타일 {writer.tiles_written}개), "
+               f"{os.path.getsize(args.archive) / 1024:.0f}KB")
+    print(args.archive)
+    return [args.archive]
+
+
+def export_spool(args):
+    """스풀/타일 아카이브 파일을 애니메이션 파일 하나 또는 폴더의 개별 파일로 압축"""
+    if args.spool.lower().endswith(".captiles"):
+        from archive import export_frames, export_sequence
+        frames = {"start": args.start, "stop": args.stop}
+    else:
+        from spool import export_frames, export_sequence
+        frames = {}
+    if os.path.isdir(args.output) or not os.path.splitext(args.output)[1]:
+        for path in export_frames(args.spool, args.output, args.format, args.profile, **frames):
+            print(path)
+    else:
+        writer = export_sequence(args.spool, args.output, **frames)
+        print(args.output)
+        print(f"저장된 프레임: {writer.frames_written}장", file=sys.stderr)
+
+
+def search_history(args):
+    """캡쳐 기록 검색 결과를 한 줄에 하나씩 출력"""
+    history = _open_history(args)
+    try:
+        if args.rescan:
+            updated, removed = history.rescan(args.rescan, prune=args.prune)
+            print(f"기록 갱신: {updated}건 추가/변경, {removed}건 삭제", file=sys.stderr)
+        monitor = args.monitor - 1 if args.monitor else None
+        if args.content_hash:
+            records = history.by_hash(bytes.fromhex(args.content_hash))[:args.limit]
+        elif args.overlaps:
+            records = history.overlapping(args.overlaps, monitor, args.since, args.until, args.limit)
+        elif monitor is not None:
+            records = history.by_monitor(monitor, args.since, args.until, args.limit)
+        elif args.since is not None or args.until is not None:
+            records = history.by_time(args.since, args.until, args.limit)
+        else:
+            records = history.recent(args.limit)
+    finally:
+        history.close()
+    for record in records:
+        when = datetime.fromtimestamp(record['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+        monitor = "-" if record['monitor'] is None else record['monitor'] + 1
+        size = f"{record['width']}x{record['height']}" if record['width'] else "-"
+        digest = record['content_hash'].hex() if record['content_hash'] else "-"
+        print(f"{when}\t{record['capture_type'] or '-'}\t{monitor}\t{size}\t"
+              f"{record['format'] or '-'}\t{digest}\t{record['path']}")
+
+
+def find_similar(args):
+    """비슷한 캡쳐(거리<TAB>경로) 또는 거의 같은 캡쳐 묶음(빈 줄로 구분) 출력"""
+    from similar import GROUP_DISTANCE, SEARCH_DISTANCE, SimilarityIndex
+    index = SimilarityIndex(args.folder)
+    if not args.no_backfill:
+        start = time.perf_counter()
+        updated, removed = index.backfill()
+        print(f"지문 갱신: {updated}장 계산, {removed}장 삭제 ({time.perf_counter() - start:.2f}초, "
+              f"전체 {len(index)}장)", file=sys.stderr)
+    start = time.perf_counter()
+    if args.image:
+        distance = SEARCH_DISTANCE if args.distance is None else args.distance
+        for found_distance, path in index.search(args.image, distance, args.limit, args.hash_kind):
+            print(f"{found_distance}\t{path}")
+    else:
+        distance = GROUP_DISTANCE if args.distance is None else args.distance
+        groups = index.groups(distance, args.hash_kind)
+        for number, group in enumerate(groups):
+            if number:
+                print()
+            for path in group:
+                print(path)
+        print(f"거의 같은 캡쳐 묶음: {len(groups)}개 ({sum(len(g) for g in groups)}장)", file=sys.stderr)
+    print(f"검색 시간: {(time.perf_counter() - start) * 1000:.1f}ms", file=sys.stderr)
+
+
+def list_monitors(args):
+    """감지된 모니터 목록 출력"""
+    from monitors import detect_monitors
+    backend = _create_backend(args) if args.backend else None
+    for monitor in detect_monitors(backend=backend, verbose=False):
+        primary = " [주]" if monitor['is_primary'] else ""
+        print(f"{monitor['index'] + 1}\t{monitor['x']},{monitor['y']}\t"
+              f"{monitor['width']}x{monitor['height']}{primary}")
+
+
+def main(argv=None):
+    """명령줄 진입점, 종료 코드 반환"""
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "monitors":
+            list_monitors(args)
+            return 0
+        if args.command == "export":
+            export_spool(args)
+            return 0
+        if args.command == "history":
+            search_history(args)
+            return 0
+        if args.command == "similar":
+            find_similar(args)
+            return 0
+        from backends import enable_dpi_awareness
+        enable_dpi_awareness(verbose=False)
+        run_capture(args)
+        return 0
+    except Exception as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""중복 프레임 제거
+
+같은 영역을 반복 캡쳐할 때 직전에 저장한 프레임과 똑같은 프레임은
+인코딩/저장하지 않는다. 먼저 축소 이미지의 해시를 비교하고, 해시가
+같을 때만 원본 전체를 비교해 확정한다 (해시 충돌로 변화를 놓치지 않음).
+"""
+import hashlib
+import os
+import threading
+import time
+
+from PIL import Image, ImageChops
+
+# 축소 해시 크기 (BOX 필터로 평균을 내므로 작은 변화도 대부분 반영된다)
+HASH_SIZE = (32, 32)
+
+
+def sample_hash(image):
+    """축소 이미지 기반의 빠른 해시"""
+    small = image.resize(HASH_SIZE, Image.Resampling.BOX)
+    return hashlib.blake2b(small.tobytes(), digest_size=16).digest()
+
+
+def images_equal(a, b):
+    """두 이미지가 픽셀 단위로 같은지 확인"""
+    if a.size != b.size or a.mode != b.mode:
+        return False
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+class _SavedFrame:
+    """영역별 마지막 저장 프레임"""
+
+    def __init__(self, image, digest, filepath):
+        self.image = image
+        self.digest = digest
+        self.filepath = filepath
+        self.nbytes = None
+        self.encode_time = None
+
+
+class DedupStats:
+    """중복 제거 통계"""
+
+    def __init__(self):
+        self.checked = 0
+        self.duplicates = 0
+        self.full_compares = 0
+        self.bytes_saved = 0
+        self.encode_time_saved = 0.0
+
+    def summary(self):
+        """사람이 읽을 수 있는 요약 문자열"""
+        return (f"검사한 프레임: {self.checked}장, 중복: {self.duplicates}장\n"
+                f"절약한 용량: {self.bytes_saved / 1024 / 1024:.1f}MB, "
+                f"절약한 인코딩 시간: {self.encode_time_saved:.2f}초")
+
+
+class FrameDeduplicator:
+    """영역별로 직전 저장 프레임과 비교하여 중복 프레임을 걸러낸다
+
+    mode가 'skip'이면 중복 프레임을 조용히 버리고, 'reference'이면
+    log_path 파일에 "저장될 뻔한 파일명<TAB>참조 파일" 한 줄을 남긴다.
+    """
+
+    def __init__(self, mode="skip", log_path=None):
+        if mode not in ("skip", "reference"):
+            raise ValueError(f"알 수 없는 중복 처리 방식: {mode}")
+        self.mode = mode
+        self.log_path = log_path
+        self.stats = DedupStats()
+        self._last = {}
+        # check()한 영역별 (파일 경로, 해시) - remember()에서 해시를 다시 계산하지 않는다
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def check(self, key, image, filepath):
+        """중복이면 참조할 기존 파일 경로, 아니면 None 반환 (여기서는 기억하지 않는다)
+
+        중복이 아닌 프레임은 저장 작업을 넘긴 뒤 remember()로 key 영역의 마지막
+        저장 프레임으로 알려준다. 저장 대기열이 가득 차 버린 프레임이 기준이 되어
+        이후의 같은 화면이 쓰이지 않은 파일의 중복으로 처리되지 않게 하기 위해서다.
+        저장이 끝나면 record_written()으로 용량/시간을, 실패하면 discard()로 알려준다.
+        """
+        digest = sample_hash(image)
+        with self._lock:
+            self.stats.checked += 1
+            self._checked[key] = (filepath, digest)
+            last = self._last.get(key)
+            if last is not None and last.digest == digest:
+                self.stats.full_compares += 1
+                if images_equal(last.image, image):
+                    self.stats.duplicates += 1
+                    if last.nbytes:
+                        self.stats.bytes_saved += last.nbytes
+                    if last.encode_time:
+                        self.stats.encode_time_saved += last.encode_time
+                    self._log_reference(filepath, last.filepath)
+                    return last.filepath
+        return None
+
+    def remember(self, key, image, filepath):
+        """저장 작업을 넘긴 프레임을 key 영역의 마지막 저장 프레임으로 기억"""
+        with self._lock:
+            checked = self._checked.pop(key, None)
+            if checked is not None and checked[0] == filepath:
+                digest = checked[1]
+            else:
+                digest = None
+        if digest is None:
+            digest = sample_hash(image)
+        with self._lock:
+            self._last[key] = _SavedFrame(image, digest, filepath)
+
+    def discard(self, filepath):
+        """저장에 실패한 파일이 마지막 저장 프레임이면 잊는다"""
+        with self._lock:
+            for key, saved in list(self._last.items()):
+                if saved.filepath == filepath:
+                    del self._last[key]
+
+    def record_written(self, job):
+        """SaveWorker의 on_written 훅: 저장된 프레임의 용량/인코딩 시간 기록"""
+        with self._lock:
+            for saved in self._last.values():
+                if saved.filepath in (job.requested_path, job.filepath):
+                    saved.filepath = job.filepath
+                    saved.nbytes = job.nbytes
+                    saved.encode_time = job.encode_time
+                    break
+
+    def forget(self, key=None):
+        """영역(또는 전체)의 마지막 프레임 기록 삭제"""
+        with self._lock:
+            if key is None:
+                self._last.clear()
+                self._checked.clear()
+            else:
+                self._last.pop(key, None)
+                self._checked.pop(key, None)
+
+    def _log_reference(self, filepath, ref_path):
+        if self.mode != "reference" or not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t"
+                        f"{os.path.basename(filepath)}\t{ref_path}\n")
+        except OSError as e:
+            print(f"중복 프레임 기록 실패: {e}")
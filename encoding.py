@@ -0,0 +1,166 @@
+"""인코딩 프로파일과 포맷 선택
+
+프로파일 이름("fastest", "balanced", "smallest")에 따라 포맷별 Pillow 저장
+옵션을 정한다. 포맷을 "auto"로 주면 축소 이미지의 색상 수를 보고 UI/텍스트처럼
+색이 적은 화면은 무손실 PNG, 사진/영상처럼 색이 많은 화면은 손실 WebP(또는
+JPEG)로 저장한다.
+
+    result = save_image(image, "shot.auto", file_format="auto", profile="fastest")
+    result.path, result.format, result.nbytes, result.encode_time
+"""
+import io
+import os
+import time
+
+from PIL import Image, features
+
+from filestore import write_atomic
+
+# 프로파일 -> 포맷 -> Pillow 저장 옵션
+# (Pillow는 PNG 필터를 고를 수 없으므로 zlib 압축 수준과 optimize만 조절한다)
+PROFILES = {
+    "fastest": {
+        "png": {"compress_level": 1},
+        "jpeg": {"quality": 80, "subsampling": 2},
+        "webp": {"quality": 75, "method": 0},
+    },
+    "balanced": {
+        "png": {"compress_level": 6},
+        "jpeg": {"quality": 85, "subsampling": 2},
+        "webp": {"quality": 80, "method": 4},
+    },
+    "smallest": {
+        "png": {"compress_level": 9, "optimize": True},
+        "jpeg": {"quality": 75, "subsampling": 2, "optimize": True, "progressive": True},
+        "webp": {"quality": 70, "method": 6},
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+# 저장 포맷 -> 파일 확장자
+FORMAT_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpeg",
+    "webp": "webp",
+    "bmp": "bmp",
+    "raw": "raw",
+    "tiles": "captiles",
+}
+
+# 확장자 -> 저장 포맷
+_EXTENSION_FORMATS = {
+    ".png": "png",
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".webp": "webp",
+    ".bmp": "bmp",
+    ".raw": "raw",
+    ".capraw": "raw",
+    ".captiles": "tiles",
+    ".auto": "auto",
+}
+
+# auto 모드 판단용 축소 크기와 무손실로 볼 최대 색상 수
+AUTO_SAMPLE_SIZE = 128
+AUTO_MAX_COLORS = 256
+
+
+class EncodeResult:
+    """저장 결과 (실제 경로, 포맷, 파일 크기, 인코딩+쓰기 시간, 그중 쓰기 시간)"""
+
+    def __init__(self, path, file_format, nbytes, encode_time, write_time=0.0):
+        self.path = path
+        self.format = file_format
+        self.nbytes = nbytes
+        self.encode_time = encode_time
+        self.write_time = write_time
+
+    def summary(self):
+        """사람이 읽을 수 있는 요약 문자열"""
+        return (f"{self.format.upper()}, {self.nbytes / 1024:.1f}KB, "
+                f"인코딩 {self.encode_time * 1000:.1f}ms")
+
+
+def webp_available():
+    """Pillow가 WebP를 지원하는지 여부"""
+    return features.check("webp")
+
+
+def is_low_color(image, sample_size=AUTO_SAMPLE_SIZE, max_colors=AUTO_MAX_COLORS):
+    """축소 이미지의 색상 수가 적으면 True (UI/텍스트 화면으로 판단)
+
+    NEAREST로 축소해야 경계가 섞인 새 색이 생기지 않는다.
+    """
+    width, height = image.size
+    scale = min(1.0, sample_size / max(width, height))
+    small = image.resize((max(1, int(width * scale)), max(1, int(height * scale))),
+                         Image.Resampling.NEAREST)
+    return small.getcolors(max_colors) is not None
+
+
+def choose_format(image):
+    """auto 모드에서 쓸 포맷 결정"""
+    if is_low_color(image):
+        return "png"
+    return "webp" if webp_available() else "jpeg"
+
+
+def format_from_path(path):
+    """확장자로 저장 포맷 판단"""
+    file_format = _EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format is None:
+        raise ValueError(f"확장자로 저장 포맷을 알 수 없습니다: {path}")
+    return file_format
+
+
+def save_options(file_format, profile=None):
+    """포맷과 프로파일에 맞는 Pillow 저장 옵션"""
+    profile = profile or DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 인코딩 프로파일: {profile} (사용 가능: {', '.join(PROFILES)})")
+    return dict(PROFILES[profile].get(file_format, {}))
+
+
+def save_image(image, path, file_format=None, profile=None, fsync=False, overwrite=False, **options):
+    """프로파일에 맞춰 이미지 저장 후 EncodeResult 반환
+
+    file_format이 "auto"면 내용에 따라 포맷을 고르고 확장자도 바꾼다.
+    파일은 임시 파일에 쓴 뒤 옮기며(filestore.write_atomic), overwrite가 False면
+    같은 이름이 이미 있을 때 이름 뒤에 -2, -3...을 붙인다 (결과의 path가 실제 경로).
+    fsync가 True면 옮기기 전에 디스크에 기록한다. options는 프로파일 옵션을 덮어쓴다.
+    """
+    start = time.perf_counter()
+    file_format = (file_format or format_from_path(path)).lower()
+    if file_format == "auto":
+        file_format = choose_format(image)
+        path = f"{os.path.splitext(path)[0]}.{FORMAT_EXTENSIONS[file_format]}"
+    if file_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"지원하지 않는 저장 포맷: {file_format}")
+
+    if file_format == "tiles":
+        # 같은 대상을 반복 캡쳐한 아카이브 뒤에 바뀐 타일만 이어 쓴다
+        # (프레임 단위로 이어 쓰고, 중단되면 읽을 때 온전한 프레임까지 복구한다)
+        from archive import append_frame
+        write_start = time.perf_counter()
+        append_frame(path, image)
+    else:
+        buffer = io.BytesIO()
+        if file_format == "raw":
+            # 인코딩 없이 픽셀 그대로 저장 (sequence.read_raw_frames로 읽는다)
+            from sequence import RAW_MAGIC, raw_frame_header
+            buffer.write(RAW_MAGIC)
+            buffer.write(raw_frame_header(image, time.time()))
+            buffer.write(image.tobytes())
+        else:
+            kwargs = save_options(file_format, profile)
+            kwargs.update(options)
+            if file_format == "jpeg" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            # 메모리에서 압축한 뒤 한 번에 쓴다 (인코딩과 파일 쓰기 시간을 따로 잰다)
+            image.save(buffer, file_format.upper(), **kwargs)
+        write_start = time.perf_counter()
+        path = write_atomic(path, buffer.getbuffer(), fsync, overwrite)
+
+    end = time.perf_counter()
+    return EncodeResult(path, file_format, os.path.getsize(path), end - start, end - write_start)
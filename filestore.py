@@ -0,0 +1,243 @@
+"""중단에 안전한 캡쳐 파일 쓰기
+
+캡쳐 파일은 같은 폴더의 임시 파일(.이름.part)에 다 쓴 다음 최종 이름으로
+옮긴다. 쓰는 도중 프로그램이 죽거나 전원이 나가도 반쯤 쓴 PNG가 캡쳐 이름으로
+남지 않는다. 옮길 때 같은 이름의 파일이 이미 있으면 덮어쓰지 않고 -2, -3을
+붙인다 (다른 프로세스가 같은 밀리초에 같은 이름을 쓴 경우까지 막는다).
+
+디스크에 실제로 기록되었는지는 SyncPolicy로 정한다.
+  none   fsync하지 않음 (운영체제가 알아서 기록, 가장 빠름)
+  file   파일마다 옮기기 전에 fsync (가장 안전, 가장 느림)
+  batch  every_files개 또는 every_ms가 지날 때마다 모아서 fsync
+         (전원이 나가면 마지막 묶음만 잃을 수 있다)
+
+    ensure_folder(folder)                      # 세션에서 처음 한 번만 makedirs
+    path = write_atomic(path, data, fsync=policy.per_file)
+    policy.written(path)                       # batch면 모아 두었다가 fsync
+"""
+import os
+import threading
+import time
+
+from metrics import METRICS
+
+TEMP_SUFFIX = ".part"
+# 이보다 오래된 임시 파일은 중단된 저장이 남긴 것으로 보고 지운다 (초)
+STALE_TEMP_AGE = 3600
+
+SYNC_MODES = ("none", "file", "batch")
+
+_ensured_folders = set()
+_ensured_lock = threading.Lock()
+
+
+def ensure_folder(folder):
+    """폴더가 없으면 만든다 (폴더마다 세션에서 처음 한 번만 확인), folder 반환
+
+    처음 확인할 때 중단된 저장이 남긴 오래된 임시 파일도 지운다. 세션 중에
+    폴더가 지워지면 write_atomic이 다시 만든다.
+    """
+    key = os.path.abspath(folder)
+    with _ensured_lock:
+        if key in _ensured_folders:
+            return folder
+        os.makedirs(folder, exist_ok=True)
+        _ensured_folders.add(key)
+    remove_stale_temp_files(folder)
+    return folder
+
+
+def remove_stale_temp_files(folder, max_age=STALE_TEMP_AGE):
+    """folder에서 max_age초보다 오래된 임시 파일 삭제, 지운 개수 반환"""
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not (entry.name.startswith(".") and entry.name.endswith(TEMP_SUFFIX)):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def temp_path_for(path):
+    """path와 같은 폴더의 임시 파일 경로 (프로세스/스레드마다 다르다)"""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.{os.getpid()}-{threading.get_ident()}{TEMP_SUFFIX}")
+
+
+def write_atomic(path, data, fsync=False, overwrite=False):
+    """data를 임시 파일에 쓴 뒤 path로 옮긴다, 실제로 쓴 경로 반환
+
+    overwrite가 False면 이미 있는 파일을 덮지 않고 이름 뒤에 -2, -3...을 붙인다.
+    """
+    temp_path = temp_path_for(path)
+    try:
+        try:
+            f = open(temp_path, "wb")
+        except FileNotFoundError:
+            # 세션 중에 저장 폴더가 지워졌다
+            os.makedirs(os.path.dirname(temp_path) or ".", exist_ok=True)
+            f = open(temp_path, "wb")
+        with f:
+            f.write(data)
+            if fsync:
+                with METRICS.stage("fsync"):
+                    f.flush()
+                    os.fsync(f.fileno())
+        path = commit(temp_path, path, overwrite)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    if fsync:
+        with METRICS.stage("fsync"):
+            fsync_folder(os.path.dirname(path))
+    return path
+
+
+def commit(temp_path, path, overwrite=False):
+    """다 쓴 임시 파일을 최종 이름으로 옮긴다, 최종 경로 반환"""
+    if overwrite:
+        os.replace(temp_path, path)
+        return path
+    stem, ext = os.path.splitext(path)
+    candidate = path
+    number = 1
+    while True:
+        try:
+            _rename_no_replace(temp_path, candidate)
+            return candidate
+        except FileExistsError:
+            number += 1
+            candidate = f"{stem}-{number}{ext}"
+
+
+def _rename_no_replace(src, dst):
+    """dst가 이미 있으면 FileExistsError (덮어쓰지 않는 이름 바꾸기)"""
+    if os.name == "nt":
+        # Windows의 rename은 대상이 있으면 실패한다
+        os.rename(src, dst)
+        return
+    try:
+        # 하드 링크는 대상이 있으면 실패하므로 확인과 옮기기가 한 번에 일어난다
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        # 하드 링크를 지원하지 않는 파일 시스템 (FAT, 일부 네트워크 드라이브)
+        if os.path.exists(dst):
+            raise FileExistsError(dst)
+        os.replace(src, dst)
+        return
+    os.unlink(src)
+
+
+def _remove_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def fsync_file(path):
+    """이미 닫은 파일의 내용을 디스크에 기록"""
+    # Windows는 쓰기 권한으로 연 핸들만 fsync할 수 있다
+    flags = os.O_RDWR | getattr(os, "O_BINARY", 0) if os.name == "nt" else os.O_RDONLY
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_folder(folder):
+    """폴더 항목(이름 바꾸기 결과)을 디스크에 기록 (Windows는 지원하지 않아 건너뜀)"""
+    if os.name == "nt":
+        return
+    fd = os.open(folder or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SyncPolicy:
+    """저장한 파일을 언제 디스크에 기록(fsync)할지 정하는 정책 (여러 스레드에서 써도 안전)
+
+    mode: "none" / "file" / "batch"
+    every_files, every_ms: batch에서 이만큼 쌓이거나 지나면 모아서 fsync
+    """
+
+    def __init__(self, mode="none", every_files=32, every_ms=1000):
+        self.configure(mode, every_files, every_ms)
+        self.synced = 0
+        self.batches = 0
+        self._pending = []
+        self._first_pending = None
+        self._lock = threading.Lock()
+
+    def configure(self, mode, every_files=None, every_ms=None):
+        """정책 변경 (실행 중에도 바꿀 수 있다)"""
+        if mode not in SYNC_MODES:
+            raise ValueError(f"알 수 없는 fsync 정책: {mode} (사용 가능: {', '.join(SYNC_MODES)})")
+        self.mode = mode
+        if every_files is not None:
+            self.every_files = max(1, every_files)
+        if every_ms is not None:
+            self.every_ms = max(0, every_ms)
+
+    @property
+    def per_file(self):
+        """저장할 때마다 fsync하는지 (save_image의 fsync 인자)"""
+        return self.mode == "file"
+
+    def written(self, path):
+        """파일 하나를 저장했음을 알림 (batch면 모아 두었다가 때가 되면 fsync)"""
+        with self._lock:
+            if self.mode == "file":
+                self.synced += 1
+                return
+            if self.mode != "batch":
+                return
+            if not self._pending:
+                self._first_pending = time.perf_counter()
+            self._pending.append(path)
+            due = len(self._pending) >= self.every_files
+        if due or self.due_in() == 0:
+            self.flush()
+
+    def due_in(self):
+        """모아 둔 파일을 fsync할 때까지 남은 시간(초), 모아 둔 것이 없으면 None"""
+        if not self._pending:
+            return None
+        return max(0.0, self._first_pending + self.every_ms / 1000 - time.perf_counter())
+
+    def flush(self):
+        """모아 둔 파일과 폴더를 지금 fsync, fsync한 파일 수 반환"""
+        with self._lock:
+            paths, self._pending = self._pending, []
+        if not paths:
+            return 0
+        with METRICS.stage("fsync"):
+            for path in paths:
+                try:
+                    fsync_file(path)
+                except OSError as e:
+                    # 저장 직후 사용자가 옮기거나 지운 파일
+                    print(f"fsync 실패: {path}: {e}")
+            for folder in set(os.path.dirname(path) for path in paths):
+                try:
+                    fsync_folder(folder)
+                except OSError as e:
+                    print(f"폴더 fsync 실패: {folder}: {e}")
+        with self._lock:
+            self.synced += len(paths)
+            self.batches += 1
+        return len(paths)
@@ -0,0 +1,472 @@
+"""최근 캡쳐 썸네일 갤러리
+
+저장 폴더를 탐색기로 열지 않고 앱 안에서 최근 캡쳐를 썸네일로 보여준다.
+화면에 보이는 칸만 그리고, 그 칸의 썸네일만 백그라운드 스레드에서 만든다.
+만든 썸네일은 (경로, 수정 시각, 크기)를 키로 디스크 캐시에 저장하며, 캐시가
+max_bytes를 넘으면 가장 오래 쓰지 않은 파일부터 지운다 (LRU).
+
+지각 해시 인덱스(similar.SimilarityIndex)를 넘기면 목록을 읽은 뒤 새 파일의
+지문을 백그라운드에서 계산하고, 오른쪽 클릭으로 비슷한 캡쳐를 찾거나
+거의 같은 캡쳐를 한 장으로 묶어 볼 수 있다.
+"""
+import hashlib
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import messagebox
+
+from PIL import Image
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".screen_capture_thumbs")
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+THUMB_SIZE = (160, 100)
+
+# 갤러리에 보여줄 확장자
+GALLERY_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+
+
+def make_thumbnail(path, size=THUMB_SIZE):
+    """원본을 전부 디코딩하지 않고 썸네일 생성
+
+    JPEG은 draft()로 DCT 단계에서 축소해서 읽고, 나머지는 thumbnail()의
+    reducing_gap으로 reduce()를 먼저 거쳐 큰 이미지도 빠르게 줄인다.
+    """
+    with Image.open(path) as image:
+        image.draft("RGB", (size[0] * 2, size[1] * 2))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.thumbnail(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return image.copy()
+
+
+class ThumbnailCache:
+    """디스크 썸네일 캐시 (경로+수정 시각 키, 크기 기준 LRU 정리)
+
+    캐시 파일의 수정 시각을 마지막 사용 시각으로 쓴다. 여러 스레드에서 써도 된다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES, size=THUMB_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        self._total = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key_path(self, path, mtime_ns):
+        key = hashlib.blake2b(f"{os.path.abspath(path)}|{mtime_ns}|{self.size}".encode("utf-8"),
+                              digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.jpg")
+
+    def get(self, path):
+        """썸네일 PIL 이미지 (캐시에 없으면 만들어 저장)"""
+        mtime_ns = os.stat(path).st_mtime_ns
+        cache_path = self._key_path(path, mtime_ns)
+        try:
+            with Image.open(cache_path) as cached:
+                thumb = cached.copy()
+            # 최근에 쓴 캐시는 정리 대상에서 뒤로 미룬다
+            os.utime(cache_path)
+            return thumb
+        except OSError:
+            pass
+
+        thumb = make_thumbnail(path, self.size)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        thumb.convert("RGB").save(tmp_path, "JPEG", quality=85)
+        os.replace(tmp_path, cache_path)
+        self._added(os.path.getsize(cache_path))
+        return thumb
+
+    def _scan(self):
+        """캐시 파일 목록 (경로, 크기, 마지막 사용 시각)"""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def total_bytes(self):
+        """캐시 전체 크기"""
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            return self._total
+
+    def _added(self, nbytes):
+        self.total_bytes()
+        with self._lock:
+            self._total += nbytes
+            if self._total <= self.max_bytes:
+                return
+        self.evict()
+
+    def evict(self, target=None):
+        """캐시 크기가 target(기본 max_bytes의 90%) 이하가 될 때까지 오래된 순으로 삭제"""
+        if target is None:
+            target = self.max_bytes * 9 // 10
+        with self._lock:
+            files = sorted(self._scan(), key=lambda f: f[2])
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for path, size, _ in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total = total
+        return removed
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        return self.evict(target=0)
+
+
+def list_images(folder):
+    """folder의 이미지 파일 (경로, 수정 시각) 목록, 최신순"""
+    items = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in GALLERY_EXTENSIONS:
+                items.append((entry.path, entry.stat().st_mtime))
+    items.sort(key=lambda item: item[1], reverse=True)
+    return items
+
+
+class ThumbnailLoader:
+    """요청한 썸네일을 백그라운드에서 만들어 결과 큐에 넣는다
+
+    가장 최근 요청부터 처리하고(스크롤하면 새로 보이는 칸이 먼저),
+    cancel()된 요청은 건너뛴다. 결과는 (index, path, 이미지 또는 예외)로
+    results 큐에 쌓이며 Tk 스레드에서 꺼내 쓴다.
+    """
+
+    def __init__(self, cache, workers=2):
+        self.cache = cache
+        self.results = queue.Queue()
+        self._stack = []
+        self._wanted = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = [threading.Thread(target=self._run, name=f"thumbnail-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, index, path):
+        """썸네일 요청"""
+        with self._cond:
+            if index in self._wanted:
+                return
+            self._wanted.add(index)
+            self._stack.append((index, path))
+            self._cond.notify()
+
+    def cancel(self, index):
+        """아직 처리하지 않은 요청 취소 (화면에서 벗어난 칸)"""
+        with self._cond:
+            self._wanted.discard(index)
+
+    def stop(self):
+        """워커 종료"""
+        with self._cond:
+            self._stopped = True
+            self._stack.clear()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stack or self._stopped)
+                if self._stopped:
+                    return
+                index, path = self._stack.pop()
+                if index not in self._wanted:
+                    continue
+            try:
+                result = self.cache.get(path)
+            except Exception as e:
+                result = e
+            with self._cond:
+                self._wanted.discard(index)
+            self.results.put((index, path, result))
+
+
+class GalleryWindow:
+    """최근 캡쳐 썸네일 창 (보이는 칸만 그리는 가상 그리드)"""
+
+    PADDING = 8
+    LABEL_HEIGHT = 18
+    # 메모리에 둘 Tk 썸네일 수 (화면 밖으로 나간 것은 다시 캐시에서 읽는다)
+    MAX_PHOTOS = 400
+
+    def __init__(self, parent_root, folder, cache=None, open_file=None, similar_index=None,
+                 items=None, title=None):
+        self.parent_root = parent_root
+        self.folder = folder
+        self.cache = cache or ThumbnailCache()
+        self.open_file = open_file or os.startfile
+        self.similar_index = similar_index
+        self.loader = ThumbnailLoader(self.cache)
+        # 폴더 전체 목록과 지금 보여주는 목록 (비슷한 캡쳐를 묶으면 달라진다)
+        self.all_items = []
+        self.items = []
+        self.hidden = 0
+        self.indexing = similar_index is not None and items is None
+        self.photos = {}
+        self.drawn = {}
+        self.columns = 1
+        self.cell_w = self.cache.size[0] + self.PADDING * 2
+        self.cell_h = self.cache.size[1] + self.PADDING * 2 + self.LABEL_HEIGHT
+        self._polling = True
+
+        self.window = tk.Toplevel(parent_root)
+        self.window.title(title or f"최근 캡쳐 - {folder}")
+        self.window.geometry("760x560")
+        self.status = tk.Label(self.window, text="파일 목록을 읽는 중...", anchor="w", font=("Arial", 9))
+        self.status.pack(side="bottom", fill="x")
+        self.collapse_var = tk.BooleanVar(value=False)
+        if similar_index is not None and items is None:
+            toolbar = tk.Frame(self.window)
+            toolbar.pack(side="top", fill="x")
+            tk.Checkbutton(toolbar, text="비슷한 캡쳐 묶기", variable=self.collapse_var,
+                           command=self._apply_collapse).pack(side="left", padx=5)
+        self.scrollbar = tk.Scrollbar(self.window, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = tk.Canvas(self.window, bg="#303030", highlightthickness=0,
+                                yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self._scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll(1, "units"))
+        self.canvas.bind("<Button-1>", self._on_click)
+        if similar_index is not None:
+            self.canvas.bind("<Button-3>", self._on_right_click)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        if items is not None:
+            # 검색 결과처럼 목록이 정해져 있으면 폴더를 읽지 않는다
+            self.window.after_idle(lambda: self._on_listed(items))
+        else:
+            # 5만 장 폴더도 창은 바로 뜨고, 목록은 백그라운드에서 읽는다
+            threading.Thread(target=self._list_folder, name="gallery-list", daemon=True).start()
+        self._poll()
+
+    def _list_folder(self):
+        try:
+            result = list_images(self.folder)
+        except OSError as e:
+            result = e
+        self.loader.results.put((None, None, result))
+        if self.indexing and not isinstance(result, Exception):
+            # 목록을 먼저 보여준 뒤 지문이 없는 파일만 계산
+            try:
+                result = self.similar_index.backfill(should_stop=lambda: not self._polling)
+            except Exception as e:
+                result = e
+            self.loader.results.put(("similar", None, result))
+
+    def _poll(self):
+        """백그라운드 결과 처리 (root.after로 주기적 호출)"""
+        if not self._polling:
+            return
+        for _ in range(64):
+            try:
+                index, path, result = self.loader.results.get_nowait()
+            except queue.Empty:
+                break
+            if index is None:
+                self._on_listed(result)
+            elif index == "similar":
+                self._on_indexed(result)
+            else:
+                self._on_thumbnail(index, path, result)
+        self.window.after(30, self._poll)
+
+    def _on_listed(self, result):
+        if isinstance(result, Exception):
+            self.status.config(text=f"폴더를 읽을 수 없습니다: {result}")
+            return
+        self.all_items = self.items = result
+        self._update_status()
+        self._layout()
+
+    def _on_indexed(self, result):
+        self.indexing = False
+        if isinstance(result, Exception):
+            print(f"지문 계산 실패: {result}")
+        elif self.collapse_var.get():
+            self._apply_collapse()
+        self._update_status()
+
+    def _update_status(self):
+        text = f"{len(self.items)}개 파일 (클릭하면 열기"
+        if self.similar_index is not None:
+            text += ", 오른쪽 클릭하면 비슷한 캡쳐 찾기"
+        text += ")"
+        if self.hidden:
+            text += f" - 비슷한 캡쳐 {self.hidden}장 묶음"
+        if self.indexing:
+            text += " - 지문 계산 중..."
+        self.status.config(text=text)
+
+    def _apply_collapse(self):
+        """거의 같은 캡쳐는 가장 최근 것 하나만 보여준다"""
+        self.items = self.all_items
+        self.hidden = 0
+        if self.collapse_var.get():
+            try:
+                groups = self.similar_index.groups()
+            except Exception as e:
+                messagebox.showerror("오류", f"비슷한 캡쳐를 묶을 수 없습니다: {str(e)}", parent=self.window)
+                groups = []
+            # 묶음 안은 최신순이므로 첫 번째만 남긴다
+            hidden = {path for group in groups for path in group[1:]}
+            self.items = [item for item in self.all_items if os.path.abspath(item[0]) not in hidden]
+            self.hidden = len(self.all_items) - len(self.items)
+        self._clear_cells()
+        self.canvas.yview_moveto(0)
+        self._update_status()
+        self._layout()
+
+    def _layout(self):
+        """창 크기에 맞춰 열 수와 스크롤 영역 계산"""
+        width = max(self.canvas.winfo_width(), self.cell_w)
+        columns = max(1, width // self.cell_w)
+        if columns != self.columns:
+            self.columns = columns
+            self._clear_cells()
+        rows = (len(self.items) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_w, rows * self.cell_h))
+        self._refresh()
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // self.cell_h))
+        last_row = int(bottom // self.cell_h) + 1
+        return (first_row * self.columns,
+                min(len(self.items), (last_row + 1) * self.columns))
+
+    def _refresh(self):
+        """보이는 칸만 그리고 화면 밖 칸은 지운다"""
+        start, end = self._visible_range()
+        for index in list(self.drawn):
+            if not start <= index < end:
+                self.canvas.delete(f"cell{index}")
+                del self.drawn[index]
+                self.loader.cancel(index)
+        for index in range(start, end):
+            if index not in self.drawn:
+                self._draw_cell(index)
+
+    def _draw_cell(self, index):
+        path, _ = self.items[index]
+        row, col = divmod(index, self.columns)
+        x = col * self.cell_w + self.PADDING
+        y = row * self.cell_h + self.PADDING
+        tag = f"cell{index}"
+        photo = self.photos.get(path)
+        if photo is not None:
+            item = self.canvas.create_image(x + self.cache.size[0] // 2, y + self.cache.size[1] // 2,
+                                            image=photo, tags=(tag,))
+        else:
+            item = self.canvas.create_rectangle(x, y, x + self.cache.size[0], y + self.cache.size[1],
+                                                outline="#555555", tags=(tag,))
+            self.loader.request(index, path)
+        self.canvas.create_text(x + self.cache.size[0] // 2, y + self.cache.size[1] + self.LABEL_HEIGHT // 2 + 2,
+                                text=_short_name(os.path.basename(path)), fill="white",
+                                font=("Arial", 8), tags=(tag,))
+        self.drawn[index] = item
+
+    def _on_thumbnail(self, index, path, result):
+        if isinstance(result, Exception):
+            print(f"썸네일 생성 실패: {path}: {result}")
+            return
+        from PIL import ImageTk
+        if len(self.photos) >= self.MAX_PHOTOS:
+            # 가장 먼저 만든 것부터 놓아준다 (dict는 삽입 순서 유지)
+            self.photos.pop(next(iter(self.photos)))
+        photo = self.photos[path] = ImageTk.PhotoImage(result)
+        item = self.drawn.get(index)
+        if item is None or index >= len(self.items) or self.items[index][0] != path:
+            return
+        x0, y0, x1, y1 = self.canvas.coords(item)
+        self.canvas.delete(item)
+        self.drawn[index] = self.canvas.create_image((x0 + x1) / 2, (y0 + y1) / 2, image=photo,
+                                                     tags=(f"cell{index}",))
+
+    def _clear_cells(self):
+        self.canvas.delete("all")
+        for index in self.drawn:
+            self.loader.cancel(index)
+        self.drawn.clear()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._refresh()
+
+    def _scroll(self, amount, what):
+        self.canvas.yview_scroll(amount, what)
+        self._refresh()
+
+    def _on_wheel(self, event):
+        self._scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _index_at(self, event):
+        """이벤트 위치의 칸 번호 (빈 곳이면 None)"""
+        col = int(self.canvas.canvasx(event.x) // self.cell_w)
+        row = int(self.canvas.canvasy(event.y) // self.cell_h)
+        index = row * self.columns + col
+        if col < self.columns and 0 <= index < len(self.items):
+            return index
+        return None
+
+    def _on_click(self, event):
+        index = self._index_at(event)
+        if index is not None:
+            try:
+                self.open_file(self.items[index][0])
+            except Exception as e:
+                messagebox.showerror("오류", f"파일을 열 수 없습니다: {str(e)}", parent=self.window)
+
+    def _on_right_click(self, event):
+        """오른쪽 클릭한 캡쳐와 비슷한 캡쳐를 새 창에 보여준다"""
+        index = self._index_at(event)
+        if index is None:
+            return
+        path = self.items[index][0]
+        try:
+            results = self.similar_index.search(path, limit=self.MAX_PHOTOS)
+        except Exception as e:
+            messagebox.showerror("오류", f"비슷한 캡쳐를 찾을 수 없습니다: {str(e)}", parent=self.window)
+            return
+        GalleryWindow(self.parent_root, self.folder, cache=self.cache, open_file=self.open_file,
+                      similar_index=self.similar_index,
+                      items=[(found, distance) for distance, found in results],
+                      title=f"비슷한 캡쳐 - {os.path.basename(path)}")
+
+    def close(self):
+        """창 닫기"""
+        self._polling = False
+        self.loader.stop()
+        self.photos.clear()
+        self.window.destroy()
+
+
+def _short_name(name, limit=24):
+    """칸 너비에 맞게 파일명 줄이기"""
+    return name if len(name) <= limit else f"...{name[-(limit - 3):]}"
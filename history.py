@@ -0,0 +1,324 @@
+"""SQLite 캡쳐 기록 인덱스
+
+저장한 캡쳐마다 경로, 캡쳐 종류, 모니터 번호, 영역, 캡쳐 시각, 크기, 포맷,
+인코딩/쓰기 시간, 내용 해시를 한 줄씩 기록한다. 폴더를 나열하고 파일명을
+파싱하지 않아도 시간 범위/모니터/영역 겹침/해시로 바로 찾을 수 있다.
+
+영역 검색은 SQLite R-Tree를 쓰고(없으면 일반 인덱스), 시간/모니터/해시에도
+인덱스가 있어 수십만 건에서도 빠르다. 앱 밖에서 추가된 파일은 rescan()이
+파일명과 수정 시각을 보고 새로 생기거나 바뀐 것만 읽어 기록한다.
+
+    history = CaptureHistory()
+    history.by_time(time.time() - 3600)
+    history.overlapping((0, 0, 800, 600), monitor=0)
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".screen_capture_history.db")
+
+# rescan에서 기록할 이미지 확장자
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+
+# capture_filename() 형식: prefix_type_YYYYmmdd_HHMMSS[_mmm][-N].ext
+# (밀리초가 없는 이름은 예전 형식, -N은 같은 이름을 피하려고 붙인 번호)
+_FILENAME_RE = re.compile(r"^(?P<stem>.+)_(?P<ts>\d{8}_\d{6})(?:_(?P<ms>\d{3}))?(?:-\d+)?\.(?P<ext>\w+)$")
+# 캡쳐 종류 뒤에는 연속 캡쳐(_burst_N), 변경 감시(_watch_N), 스크롤(_scroll) 표시가 붙을 수 있다
+_TYPE_RE = re.compile(r"_(?P<type>full|region|coords|scroll|monitor_(?P<monitor>\d+))"
+                      r"(?:_(?P<mode>burst|watch)_\d+|_(?P<scroll>scroll))?$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    capture_type TEXT,
+    monitor INTEGER,
+    left INTEGER,
+    top INTEGER,
+    right INTEGER,
+    bottom INTEGER,
+    timestamp REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    format TEXT,
+    nbytes INTEGER,
+    encode_time REAL,
+    content_hash BLOB,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS captures_timestamp ON captures (timestamp);
+CREATE INDEX IF NOT EXISTS captures_monitor ON captures (monitor, timestamp);
+CREATE INDEX IF NOT EXISTS captures_hash ON captures (content_hash);
+"""
+
+_COLUMNS = ("id", "path", "capture_type", "monitor", "left", "top", "right", "bottom",
+            "timestamp", "width", "height", "format", "nbytes", "encode_time",
+            "content_hash", "mtime")
+
+
+def parse_capture_filename(path):
+    """파일명에서 (캡쳐 종류, 모니터 번호(0부터), 캡쳐 시각) 추출, 형식이 다르면 None"""
+    match = _FILENAME_RE.match(os.path.basename(path))
+    if not match:
+        return None
+    timestamp = datetime.strptime(match.group("ts"), "%Y%m%d_%H%M%S").timestamp()
+    if match.group("ms"):
+        timestamp += int(match.group("ms")) / 1000
+    type_match = _TYPE_RE.search(match.group("stem"))
+    if not type_match:
+        return None, None, timestamp
+    monitor = type_match.group("monitor")
+    capture_type = "monitor" if monitor else type_match.group("type")
+    mode = type_match.group("mode") or type_match.group("scroll")
+    if mode:
+        capture_type += f"_{mode}"
+    return capture_type, int(monitor) - 1 if monitor else None, timestamp
+
+
+def content_hash(image):
+    """내용 해시 (중복 제거와 같은 축소 이미지 해시)"""
+    from dedup import sample_hash
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return sample_hash(image)
+
+
+class CaptureHistory:
+    """캡쳐 기록 데이터베이스 (여러 스레드에서 써도 안전)"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS captures_rect "
+                             "USING rtree(id, min_x, max_x, min_y, max_y)")
+            self.has_rtree = True
+        except sqlite3.OperationalError:
+            # R-Tree 모듈이 없는 SQLite라면 영역 검색은 일반 인덱스로 한다
+            self._db.execute("CREATE INDEX IF NOT EXISTS captures_left ON captures (left, right)")
+            self.has_rtree = False
+        self._db.commit()
+
+    def close(self):
+        """데이터베이스 닫기"""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def record(self, path, capture_type=None, monitor=None, rect=None, timestamp=None,
+               size=None, file_format=None, nbytes=None, encode_time=None,
+               content_hash=None, mtime=None, commit=True):
+        """캡쳐 한 건 기록 (같은 경로가 있으면 덮어씀), 기록 id 반환"""
+        path = os.path.abspath(path)
+        if timestamp is None:
+            timestamp = time.time()
+        left, top, right, bottom = rect or (None, None, None, None)
+        width, height = size or (None, None)
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip(".").lower() or None
+        with self._lock:
+            old = self._db.execute("SELECT id FROM captures WHERE path = ?", (path,)).fetchone()
+            if old is not None and self.has_rtree:
+                self._db.execute("DELETE FROM captures_rect WHERE id = ?", (old[0],))
+            cur = self._db.execute(
+                "INSERT OR REPLACE INTO captures (path, capture_type, monitor, left, top, right, bottom, "
+                "timestamp, width, height, format, nbytes, encode_time, content_hash, mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, capture_type, monitor, left, top, right, bottom, timestamp, width, height,
+                 file_format, nbytes, encode_time, content_hash, mtime))
+            row_id = cur.lastrowid
+            if self.has_rtree and rect:
+                self._db.execute("INSERT INTO captures_rect VALUES (?, ?, ?, ?, ?)",
+                                 (row_id, left, right, top, bottom))
+            if commit:
+                self._db.commit()
+        return row_id
+
+    def record_job(self, job, image=None):
+        """SaveWorker 작업(on_written 훅)을 기록
+
+        job.meta의 capture_type, monitor, rect, timestamp를 함께 남긴다.
+        내용 해시는 워커 프로세스에서 계산해 온 job.content_hash
+        (ProcessSaveWorker의 digests)를 쓰고, 없으면 image(없으면 job.image)로
+        계산한다. 둘 다 없으면 저장된 파일을 다시 읽어 계산한다.
+        """
+        from PIL import Image
+        meta = getattr(job, "meta", None) or {}
+        image = image if image is not None else job.image
+        digest = getattr(job, "content_hash", None)
+        if digest is None:
+            if image is not None and not isinstance(image, Image.Image) and hasattr(image, "shape"):
+                image = Image.fromarray(image)
+            if isinstance(image, Image.Image):
+                digest = content_hash(image)
+            else:
+                try:
+                    with Image.open(job.filepath) as written:
+                        digest = content_hash(written)
+                except OSError:
+                    pass
+        try:
+            mtime = os.path.getmtime(job.filepath)
+        except OSError:
+            mtime = None
+        return self.record(job.filepath, meta.get("capture_type"), meta.get("monitor"),
+                           meta.get("rect"), meta.get("timestamp"), job.size,
+                           getattr(job.result, "format", None), job.nbytes, job.encode_time,
+                           digest, mtime)
+
+    def forget(self, path):
+        """기록 삭제"""
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._db.execute("SELECT id FROM captures WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                return False
+            self._db.execute("DELETE FROM captures WHERE id = ?", (row[0],))
+            if self.has_rtree:
+                self._db.execute("DELETE FROM captures_rect WHERE id = ?", (row[0],))
+            self._db.commit()
+            return True
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [_row_dict(row) for row in rows]
+
+    def get(self, path):
+        """경로로 기록 하나 찾기, 없으면 None"""
+        rows = self._query("SELECT * FROM captures WHERE path = ?", (os.path.abspath(path),))
+        return rows[0] if rows else None
+
+    def recent(self, limit=100):
+        """최근 캡쳐 limit건 (최신순)"""
+        return self._query("SELECT * FROM captures ORDER BY timestamp DESC LIMIT ?", (limit,))
+
+    def by_time(self, start=None, end=None, limit=None):
+        """캡쳐 시각이 [start, end) 구간인 기록 (시간순)"""
+        sql, params = _time_filter("SELECT * FROM captures WHERE 1", start, end)
+        return self._query(sql + " ORDER BY timestamp" + _limit(limit), params)
+
+    def by_monitor(self, monitor, start=None, end=None, limit=None):
+        """monitor 번호(0부터)로 캡쳐한 기록 (시간순)"""
+        sql, params = _time_filter("SELECT * FROM captures WHERE monitor = ?", start, end, [monitor])
+        return self._query(sql + " ORDER BY timestamp" + _limit(limit), params)
+
+    def by_hash(self, digest):
+        """내용 해시가 같은 기록 (시간순)"""
+        return self._query("SELECT * FROM captures WHERE content_hash = ? ORDER BY timestamp", (digest,))
+
+    def overlapping(self, rect, monitor=None, start=None, end=None, limit=None):
+        """가상 데스크톱 좌표 rect와 겹치는 영역을 캡쳐한 기록 (시간순)"""
+        left, top, right, bottom = rect
+        if self.has_rtree:
+            sql = ("SELECT c.* FROM captures_rect r CROSS JOIN captures c ON c.id = r.id "
+                   "WHERE r.max_x > ? AND r.min_x < ? AND r.max_y > ? AND r.min_y < ?")
+        else:
+            sql = ("SELECT c.* FROM captures c "
+                   "WHERE c.right > ? AND c.left < ? AND c.bottom > ? AND c.top < ?")
+        params = [left, right, top, bottom]
+        if monitor is not None:
+            sql += " AND c.monitor = ?"
+            params.append(monitor)
+        sql, params = _time_filter(sql, start, end, params, column="c.timestamp")
+        return self._query(sql + " ORDER BY c.timestamp" + _limit(limit), params)
+
+    def rescan(self, folder, prune=False, hash_content=True):
+        """folder에서 기록에 없거나 바뀐 이미지 파일만 읽어 기록
+
+        prune이면 folder 안에서 사라진 파일의 기록을 지운다.
+        반환값: (추가/갱신한 수, 지운 수)
+        """
+        from PIL import Image
+        folder = os.path.abspath(folder)
+        prefix = os.path.join(folder, "")
+        with self._lock:
+            known = {row[0]: (row[1], row[2]) for row in self._db.execute(
+                "SELECT path, mtime, nbytes FROM captures WHERE path >= ? AND path < ?",
+                (prefix, prefix + "\U0010ffff"))}
+
+        updated = 0
+        seen = set()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                    continue
+                path = entry.path
+                seen.add(path)
+                stat = entry.stat()
+                if known.get(path) == (stat.st_mtime, stat.st_size):
+                    continue
+                parsed = parse_capture_filename(path)
+                capture_type, monitor, timestamp = parsed or (None, None, stat.st_mtime)
+                try:
+                    with Image.open(path) as image:
+                        size = image.size
+                        file_format = (image.format or "").lower() or None
+                        digest = content_hash(image) if hash_content else None
+                except OSError as e:
+                    print(f"캡쳐 기록 스캔 실패: {path}: {e}")
+                    continue
+                if path in known:
+                    # 앱에서 기록한 캡쳐 종류/영역/시각은 그대로 두고 파일 정보만 갱신
+                    with self._lock:
+                        self._db.execute(
+                            "UPDATE captures SET width = ?, height = ?, format = ?, nbytes = ?, "
+                            "content_hash = ?, mtime = ? WHERE path = ?",
+                            (size[0], size[1], file_format, stat.st_size, digest, stat.st_mtime, path))
+                else:
+                    self.record(path, capture_type, monitor, None, timestamp, size, file_format,
+                                stat.st_size, None, digest, stat.st_mtime, commit=False)
+                updated += 1
+
+        removed = 0
+        if prune:
+            for path in set(known) - seen:
+                # 하위 폴더의 기록은 건드리지 않는다
+                if os.path.dirname(path) == folder and self.forget(path):
+                    removed += 1
+        with self._lock:
+            self._db.commit()
+        return updated, removed
+
+
+def _time_filter(sql, start, end, params=None, column="timestamp"):
+    params = list(params or [])
+    if start is not None:
+        sql += f" AND {column} >= ?"
+        params.append(start)
+    if end is not None:
+        sql += f" AND {column} < ?"
+        params.append(end)
+    return sql, params
+
+
+def _limit(limit):
+    return f" LIMIT {int(limit)}" if limit else ""
+
+
+def _row_dict(row):
+    """sqlite3.Row를 dict로 (영역은 rect 튜플로 묶는다)"""
+    record = {key: row[key] for key in _COLUMNS}
+    if record["left"] is not None:
+        record["rect"] = (record["left"], record["top"], record["right"], record["bottom"])
+    else:
+        record["rect"] = None
+    return record
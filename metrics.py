@@ -0,0 +1,228 @@
+"""캡쳐 단계별 시간 측정
+
+캡쳐 한 번의 지연이 어디서 생기는지 보기 위해 단계마다 걸린 시간을
+히스토그램으로 모은다. 히스토그램은 10µs~100s를 로그 간격 버킷으로 나눠
+개수만 세므로, 오래 켜 두어도 메모리가 늘지 않는다.
+
+    from metrics import METRICS
+    with METRICS.stage("grab"):
+        image = backend.grab(bbox)
+    METRICS.snapshot()["grab"]["p95"]
+    METRICS.dump_jsonl("metrics.jsonl")
+
+꺼져 있으면(METRICS.enabled = False) stage()는 아무것도 하지 않는 공용
+컨텍스트 매니저를 돌려주고 record()는 바로 반환한다.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+# 캡쳐 단계 (순서대로)
+STAGES = (
+    "pre_capture",  # 창을 숨긴 뒤 캡쳐를 시작하기까지 대기
+    "grab",         # 백엔드 화면 캡쳐
+    "convert",      # 원시 픽셀 -> RGB 이미지 변환
+    "crop",         # 정지 화면에서 선택 영역 잘라내기
+    "encode",       # 이미지 압축 (메모리 안)
+    "write",        # 파일 쓰기
+    "notify",       # 저장 완료 후 Tk 스레드에서 콜백이 실행되기까지
+)
+
+STAGE_NAMES = {
+    "pre_capture": "캡쳐 전 대기",
+    "grab": "화면 캡쳐",
+    "convert": "픽셀 변환",
+    "crop": "영역 자르기",
+    "encode": "인코딩",
+    "write": "파일 쓰기",
+    "fsync": "디스크 동기화",
+    "notify": "UI 알림",
+    "select_paint": "선택 그리기",
+    "select_latency": "드래그 반응",
+    "watch_trigger": "변경 캡쳐 지연",
+    "stitch": "스크롤 이어붙이기",
+    "archive": "타일 아카이브",
+}
+
+# 히스토그램 버킷 경계 (초): 10µs부터 2^(1/4)배씩, 100초까지
+_BUCKET_BOUNDS = []
+_bound = 1e-5
+while _bound < 100:
+    _BUCKET_BOUNDS.append(_bound)
+    _bound *= 2 ** 0.25
+del _bound
+
+
+class Histogram:
+    """로그 간격 버킷 히스토그램 (백분위는 버킷 상한으로 근사, 오차 약 19% 이내)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """q(0~1) 백분위 근사값 (초)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                upper = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """count/mean/min/p50/p95/p99/max (초) 딕셔너리"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class _NullStage:
+    """측정이 꺼져 있을 때 쓰는 아무것도 하지 않는 컨텍스트 매니저"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """with 블록 시간을 재서 기록 (예외로 끝난 블록은 기록하지 않는다)"""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """단계별 히스토그램 모음 (여러 스레드에서 기록해도 된다)"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """with 블록의 시간을 name 단계로 기록"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """name 단계에 걸린 시간(초) 기록"""
+        if not self.enabled or seconds is None:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def record_encode(self, result):
+        """EncodeResult의 인코딩/쓰기 시간 기록"""
+        if not self.enabled or result is None:
+            return
+        self.record("encode", result.encode_time - result.write_time)
+        self.record("write", result.write_time)
+
+    def snapshot(self):
+        """단계 이름 -> 요약 딕셔너리 (STAGES 순서, 그 밖의 단계는 뒤에)"""
+        with self._lock:
+            names = [s for s in STAGES if s in self._histograms]
+            names += sorted(n for n in self._histograms if n not in STAGES)
+            return {name: self._histograms[name].summary() for name in names}
+
+    def reset(self):
+        """모든 기록 삭제"""
+        with self._lock:
+            self._histograms.clear()
+            self.started = time.time()
+
+    def dump_jsonl(self, path, **extra):
+        """현재 요약을 단계마다 JSON 한 줄로 path에 덧붙인다 (extra는 모든 줄에 추가)"""
+        now = time.time()
+        lines = []
+        for name, summary in self.snapshot().items():
+            record = {"time": now, "since": self.started, "stage": name}
+            record.update(extra)
+            record.update(summary)
+            lines.append(json.dumps(record, ensure_ascii=False))
+        with open(path, "a", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+        return len(lines)
+
+    def format_table(self):
+        """사람이 읽을 수 있는 표 (ms 단위)"""
+        header = [_pad("단계", 12), _pad("횟수", 7, right=True)]
+        header += [_pad(title, 9, right=True) for title in ("평균", "p50", "p95", "p99", "최대")]
+        rows = ["".join(header)]
+        for name, summary in self.snapshot().items():
+            if not summary["count"]:
+                continue
+            values = "".join(f"{summary[key] * 1000:>9.1f}" for key in ("mean", "p50", "p95", "p99", "max"))
+            rows.append(f"{_pad(STAGE_NAMES.get(name, name), 12)}{summary['count']:>7}{values}")
+        if len(rows) == 1:
+            rows.append("(기록 없음)")
+        return "\n".join(rows)
+
+
+def _pad(text, width, right=False):
+    """한글(전각 문자)을 두 칸으로 세어 고정폭 글꼴에서 열을 맞춘다"""
+    spaces = " " * max(0, width - sum(2 if ord(c) >= 0x1100 else 1 for c in text))
+    return spaces + text if right else text + spaces
+
+
+def load_jsonl(path):
+    """dump_jsonl로 저장한 파일 읽기 (줄마다 딕셔너리)"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+# 앱 전체에서 쓰는 기본 측정기 (SCREEN_CAPTURE_METRICS=0이면 꺼진 상태로 시작)
+METRICS = Metrics(enabled=os.environ.get("SCREEN_CAPTURE_METRICS", "1") != "0")
@@ -0,0 +1,272 @@
+"""모니터 배치(topology) 감지와 캐시
+
+MonitorTopology는 모니터 목록을 한 번 감지해 캐시해 두고, 가상 데스크톱
+크기 같은 값싼 정보(probe)가 바뀌었을 때만 다시 감지한다. 감지 함수와
+probe는 주입할 수 있어서 가짜 배치로도 동작을 확인할 수 있다.
+pywin32/screeninfo는 실제로 감지할 때 import한다.
+
+    topology = MonitorTopology.from_layout([
+        {'x': 0, 'y': 0, 'width': 1920, 'height': 1080, 'is_primary': True},
+        {'x': 1920, 'y': -200, 'width': 2560, 'height': 1440},
+    ])
+    topology.virtual_bounds()       # (0, -200, 4480, 1240)
+    topology.monitor_at(2000, 0)    # 두 번째 모니터
+"""
+import time
+
+# GetSystemMetrics 인덱스 (가상 화면 원점/크기, 모니터 수)
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CMONITORS = 80
+
+
+def _detect_win32():
+    """Windows API로 모니터 감지 (가장 정확)"""
+    import win32api
+    import win32con
+    monitors = []
+    for i, (hMonitor, _, _) in enumerate(win32api.EnumDisplayMonitors(None, None)):
+        monitor_info = win32api.GetMonitorInfo(hMonitor)
+        monitor_area = monitor_info['Monitor']
+        monitors.append({
+            'index': i,
+            'name': f"모니터 {i+1}",
+            'x': monitor_area[0],
+            'y': monitor_area[1],
+            'width': monitor_area[2] - monitor_area[0],
+            'height': monitor_area[3] - monitor_area[1],
+            'is_primary': monitor_info['Flags'] == win32con.MONITORINFOF_PRIMARY,
+            'handle': hMonitor
+        })
+    return monitors
+
+
+def _detect_screeninfo():
+    """screeninfo 라이브러리로 모니터 감지"""
+    import screeninfo
+    return [{
+        'index': i,
+        'name': f"모니터 {i+1}",
+        'x': screen.x,
+        'y': screen.y,
+        'width': screen.width,
+        'height': screen.height,
+        'is_primary': bool(screen.is_primary)
+    } for i, screen in enumerate(screeninfo.get_monitors())]
+
+
+def _detect_tk(root):
+    """Tk 창 정보로 모니터 추정 (주 모니터 + 오른쪽 보조 모니터)"""
+    screen_width = root.winfo_screenwidth()
+    screen_height = root.winfo_screenheight()
+    virtual_width = root.winfo_vrootwidth()
+
+    monitors = [{
+        'index': 0,
+        'name': "모니터 1 (주)",
+        'x': 0,
+        'y': 0,
+        'width': screen_width,
+        'height': screen_height,
+        'is_primary': True
+    }]
+    # 듀얼 모니터 추정 (가상 화면이 주 모니터보다 큰 경우)
+    if virtual_width > screen_width:
+        monitors.append({
+            'index': 1,
+            'name': "모니터 2",
+            'x': screen_width,  # 오른쪽에 위치 추정
+            'y': 0,
+            'width': virtual_width - screen_width,
+            'height': screen_height,
+            'is_primary': False
+        })
+    return monitors
+
+
+def detect_monitors(root=None, backend=None, verbose=True):
+    """사용 가능한 방법을 차례로 시도하여 모니터 목록 감지
+
+    Tk 방식은 새 Tk 루트를 만들지 않고 넘겨받은 root를 사용한다.
+    verbose가 False면 감지 과정을 출력하지 않는다 (명령줄 모드).
+    """
+    log = print if verbose else (lambda *args: None)
+    strategies = []
+    # 백엔드가 모니터 배치를 직접 제공하는 경우 (synthetic 등)
+    backend_monitors = getattr(backend, 'monitors', None)
+    if backend_monitors:
+        strategies.append((backend.name, lambda: [dict(m) for m in backend_monitors]))
+    strategies.append(("Windows API", _detect_win32))
+    strategies.append(("screeninfo", _detect_screeninfo))
+    if root is not None:
+        strategies.append(("Tkinter", lambda: _detect_tk(root)))
+
+    missing = []
+    for method, detect in strategies:
+        try:
+            monitors = detect()
+        except ImportError as e:
+            missing.append(e.name)
+            if len(missing) == 2:
+                log("pywin32/screeninfo 패키지가 없습니다. pip install pywin32 screeninfo로 설치하면 "
+                      "더 정확한 모니터 감지와 개별 모니터 캡쳐가 가능합니다.")
+            continue
+        except Exception as e:
+            log(f"{method}로 모니터 정보 가져오기 실패: {e}")
+            continue
+        if monitors:
+            log(f"{method}로 감지된 모니터 수: {len(monitors)}")
+            return monitors
+
+    # 최후의 수단
+    return [{
+        'index': 0,
+        'name': "기본 모니터",
+        'x': 0,
+        'y': 0,
+        'width': 1920,
+        'height': 1080,
+        'is_primary': True
+    }]
+
+
+def default_geometry_probe(root=None):
+    """가상 데스크톱 구성이 바뀌었는지 확인할 값싼 probe 함수 반환"""
+    try:
+        import win32api
+    except ImportError:
+        win32api = None
+    if win32api is not None:
+        return lambda: tuple(win32api.GetSystemMetrics(i) for i in (
+            SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN,
+            SM_CYVIRTUALSCREEN, SM_CMONITORS))
+    if root is not None:
+        return lambda: (root.winfo_vrootwidth(), root.winfo_vrootheight(),
+                        root.winfo_screenwidth(), root.winfo_screenheight())
+    return None
+
+
+def _normalize(monitors):
+    """빠진 키를 채운 모니터 목록 복사본"""
+    result = []
+    for i, monitor in enumerate(monitors):
+        monitor = dict(monitor)
+        monitor.setdefault('index', i)
+        monitor.setdefault('name', f"모니터 {i+1}")
+        monitor.setdefault('is_primary', i == 0)
+        result.append(monitor)
+    return result
+
+
+def monitor_rect(monitor):
+    """모니터의 (left, top, right, bottom)"""
+    return (monitor['x'], monitor['y'],
+            monitor['x'] + monitor['width'], monitor['y'] + monitor['height'])
+
+
+def intersect_rects(a, b):
+    """두 (left, top, right, bottom) 사각형의 교집합, 없으면 None"""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[2], b[2]), min(a[3], b[3])
+    if left >= right or top >= bottom:
+        return None
+    return (left, top, right, bottom)
+
+
+class MonitorTopology:
+    """캐시되고 필요할 때만 갱신되는 모니터 배치
+
+    detect: 모니터 목록(dict 리스트)을 돌려주는 함수
+    probe: 배치가 바뀌면 다른 값을 돌려주는 값싼 함수 (None이면 자동 갱신 안 함)
+    check_interval: probe를 다시 호출하기까지의 최소 간격(초)
+    """
+
+    def __init__(self, detect, probe=None, check_interval=1.0, clock=time.monotonic):
+        self._detect = detect
+        self._probe = probe
+        self.check_interval = check_interval
+        self._clock = clock
+        self._monitors = None
+        self._bounds = None
+        self._signature = None
+        self._last_check = None
+        self.generation = 0
+
+    @classmethod
+    def from_layout(cls, monitors, probe=None):
+        """고정된(가짜) 배치로 생성"""
+        layout = _normalize(monitors)
+        return cls(lambda: layout, probe=probe)
+
+    def invalidate(self):
+        """캐시 무효화 (다음 조회 때 다시 감지)"""
+        self._monitors = None
+
+    def refresh(self):
+        """즉시 다시 감지"""
+        self.invalidate()
+        return self.monitors()
+
+    def _probe_changed(self):
+        if self._probe is None:
+            return False
+        now = self._clock()
+        if self._last_check is not None and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        try:
+            signature = self._probe()
+        except Exception:
+            return False
+        changed = signature != self._signature
+        self._signature = signature
+        return changed
+
+    def monitors(self):
+        """캐시된 모니터 목록 (배치가 바뀌었으면 다시 감지)"""
+        if self._probe_changed() or self._monitors is None:
+            self._monitors = _normalize(self._detect())
+            rects = [monitor_rect(m) for m in self._monitors]
+            self._bounds = (min(r[0] for r in rects), min(r[1] for r in rects),
+                            max(r[2] for r in rects), max(r[3] for r in rects))
+            self.generation += 1
+        return self._monitors
+
+    def __iter__(self):
+        return iter(self.monitors())
+
+    def __len__(self):
+        return len(self.monitors())
+
+    def virtual_bounds(self):
+        """모든 모니터를 감싸는 가상 데스크톱 (left, top, right, bottom)"""
+        self.monitors()
+        return self._bounds
+
+    def primary(self):
+        """주 모니터"""
+        monitors = self.monitors()
+        return next((m for m in monitors if m['is_primary']), monitors[0])
+
+    def by_index(self, index):
+        """index로 모니터 찾기, 없으면 None"""
+        return next((m for m in self.monitors() if m['index'] == index), None)
+
+    def monitor_at(self, x, y):
+        """점 (x, y)를 포함하는 모니터, 없으면 None"""
+        for monitor in self.monitors():
+            left, top, right, bottom = monitor_rect(monitor)
+            if left <= x < right and top <= y < bottom:
+                return monitor
+        return None
+
+    def monitors_in_rect(self, rect):
+        """(left, top, right, bottom) 사각형과 겹치는 모니터 목록"""
+        return [m for m in self.monitors() if intersect_rects(monitor_rect(m), rect)]
+
+    def contains_rect(self, rect):
+        """사각형이 가상 데스크톱 범위 안에 있는지 여부"""
+        left, top, right, bottom = self.virtual_bounds()
+        return rect[0] >= left and rect[1] >= top and rect[2] <= right and rect[3] <= bottom
@@ -0,0 +1,283 @@
+"""스크롤 캡쳐 (긴 화면 이어붙이기)
+
+내용이 스크롤되는 동안 같은 영역을 여러 번 캡쳐해 세로로 긴 이미지 하나로
+이어붙인다. 두 프레임이 얼마나 스크롤되었는지는 2차원 상관 계산 대신
+행마다 해시를 내고 행 해시 순서를 맞춰서 찾는다.
+
+  1. 프레임 안에서 한 번만 나오는 행(빈 줄/단색 배경이 아닌 행)을 기준 행으로
+  2. 앞 프레임과 새 프레임에 같이 있는 기준 행마다 (앞 위치 - 새 위치)에 투표
+  3. 가장 많이 나온 양수 이동량을 겹치는 구간 전체의 행 일치율로 확인
+
+결과는 PNG 한 장으로 띠(strip) 단위로 바로 압축해 쓰므로, 이어붙인 높이와
+상관없이 메모리에는 마지막 프레임 하나만 남는다.
+
+    with PanoramaStitcher("long.png") as stitcher:
+        for image in frames:
+            stitcher.add(image)
+    stitcher.path                   # 같은 이름이 있었으면 long-2.png
+"""
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from filestore import commit, temp_path_for
+from metrics import METRICS
+from sequence import PNG_SIGNATURE, _png_chunk
+
+# 기준 행이 이만큼 같은 이동량에 투표해야 스크롤로 인정
+MIN_MATCH_ROWS = 8
+# 겹치는 구간에서 행이 이 비율 이상 일치해야 스크롤로 인정 (고정 머리글/바닥글 허용)
+MIN_OVERLAP_MATCH = 0.5
+# 행 해시에서 뺄 오른쪽 폭 (스크롤바 손잡이는 스크롤할 때마다 위치가 바뀐다)
+SCROLLBAR_WIDTH = 24
+# 압축 데이터를 IDAT 청크로 내보내는 크기
+IDAT_SIZE = 1 << 20
+# 스크롤 캡쳐 간격과, 새 내용 없이 이만큼 지나면 자동으로 끝내는 시간 (초)
+SCROLL_INTERVAL = 0.15
+IDLE_STOP = 3.0
+
+# 행 해시용 64비트 홀수 가중치 (항상 같은 값이 나오도록 고정 시드)
+_WEIGHTS = np.random.default_rng(0x5C7011).integers(1, 2 ** 63, size=4096, dtype=np.uint64) | np.uint64(1)
+
+
+def row_hashes(image, ignore_right=SCROLLBAR_WIDTH):
+    """행마다 64비트 해시 (uint64 배열, 길이 = 이미지 높이)
+
+    행의 바이트를 8바이트 단위 정수로 보고 가중합을 낸다 (2^64로 나눈 나머지).
+    """
+    return _row_hashes(np.asarray(image.convert("RGB") if image.mode != "RGB" else image), ignore_right)
+
+
+def _row_hashes(pixels, ignore_right):
+    if ignore_right and pixels.shape[1] > ignore_right * 4:
+        pixels = pixels[:, :-ignore_right]
+    rows = pixels.reshape(pixels.shape[0], -1)
+    pad = -rows.shape[1] % 8
+    if pad:
+        rows = np.pad(rows, ((0, 0), (0, pad)))
+    words = np.ascontiguousarray(rows).view(np.uint64)
+    weights = np.resize(_WEIGHTS, words.shape[1])
+    with np.errstate(over="ignore"):
+        return (words * weights).sum(axis=1, dtype=np.uint64)
+
+
+def _unique_rows(hashes):
+    """프레임 안에서 한 번만 나오는 행의 (해시, 위치)"""
+    values, index, counts = np.unique(hashes, return_index=True, return_counts=True)
+    once = counts == 1
+    return values[once], index[once]
+
+
+def find_scroll_offset(previous, current, min_rows=MIN_MATCH_ROWS):
+    """앞 프레임 대비 내용이 위로 올라간 행 수
+
+    0: 스크롤되지 않음 (또는 위로 스크롤됨)
+    None: 겹치는 부분을 찾지 못함 (너무 빨리 스크롤했거나 내용이 바뀜)
+    """
+    height = len(current)
+    if len(previous) != height:
+        return None
+    if np.array_equal(previous, current):
+        return 0
+    prev_values, prev_index = _unique_rows(previous)
+    cur_values, cur_index = _unique_rows(current)
+    _, a, b = np.intersect1d(prev_values, cur_values, assume_unique=True, return_indices=True)
+    if not len(a):
+        return None
+    # 같은 내용 행이 앞 프레임에서 몇 행 아래에 있었는지 투표
+    votes = np.bincount(prev_index[a] - cur_index[b] + height, minlength=2 * height)
+    down = votes[height + 1:]
+    if down.any():
+        for offset in np.argsort(down)[::-1][:3] + 1:
+            if votes[height + offset] < min_rows:
+                break
+            overlap = np.count_nonzero(previous[offset:] == current[:height - offset])
+            if overlap >= MIN_OVERLAP_MATCH * (height - offset):
+                return int(offset)
+    # 위로 스크롤했거나 제자리 (고정 영역만 일치)
+    if votes[:height + 1].sum() >= min_rows:
+        return 0
+    return None
+
+
+def fixed_footer_rows(previous, current, offset):
+    """스크롤해도 제자리인 바닥글 행 수 (offset만큼 스크롤된 두 프레임 비교)
+
+    아래쪽부터 같은 위치의 행이 계속 같은 구간이 바닥글 후보이며, 빈 줄만으로
+    된 구간을 바닥글로 오인하지 않도록 프레임 안에서 한 번만 나오는 행이
+    들어 있어야 한다.
+    """
+    height = len(current)
+    same = previous == current
+    if not offset or not same[-1]:
+        return 0
+    # 아래에서부터 연속으로 같은 행 수
+    run = int(np.argmin(same[::-1]))
+    if run >= height - offset:
+        return 0
+    _, unique_index = _unique_rows(current)
+    if not np.any(unique_index >= height - run):
+        return 0
+    return run
+
+
+class StripPNGWriter:
+    """높이를 모른 채로 행 띠를 이어 쓰는 PNG 저장
+
+    IHDR의 높이는 닫을 때 채운다. 행마다 Up 필터를 적용해 바로 압축하므로
+    메모리에는 압축기 상태와 직전 행 하나만 남는다. 임시 파일에 쓰다가 닫을 때
+    path로 옮기며, 같은 이름이 이미 있으면 -2, -3...을 붙인다 (닫은 뒤 self.path).
+    """
+
+    def __init__(self, path, width, compress_level=6):
+        self.path = path
+        self.width = width
+        self.height = 0
+        self._temp_path = temp_path_for(path)
+        self.fp = open(self._temp_path, "wb")
+        self.fp.write(PNG_SIGNATURE)
+        self._ihdr_offset = self.fp.tell()
+        self.fp.write(self._ihdr())
+        self._compressor = zlib.compressobj(compress_level)
+        self._buffer = bytearray()
+        self._last_row = np.zeros((1, width * 3), dtype=np.uint8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _ihdr(self):
+        # 8비트 RGB, 비월 없음
+        return _png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+
+    def write(self, strip):
+        """RGB 이미지(또는 (h, w, 3) 배열) 띠를 아래에 이어 쓴다"""
+        rows = np.asarray(strip, dtype=np.uint8).reshape(-1, self.width * 3)
+        if not len(rows):
+            return
+        # Up 필터: 바로 위 행과의 차이 (스크린샷은 세로로 같은 색이 많아 잘 압축된다)
+        filtered = np.empty((len(rows), self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(rows, np.concatenate((self._last_row, rows[:-1])), out=filtered[:, 1:])
+        self._last_row = rows[-1:].copy()
+        self.height += len(rows)
+        self._emit(self._compressor.compress(filtered.tobytes()))
+
+    def _emit(self, data, flush=False):
+        self._buffer += data
+        while len(self._buffer) >= IDAT_SIZE or (flush and self._buffer):
+            chunk = bytes(self._buffer[:IDAT_SIZE])
+            del self._buffer[:IDAT_SIZE]
+            self.fp.write(_png_chunk(b"IDAT", chunk))
+
+    def close(self):
+        """남은 데이터를 쓰고 IHDR에 최종 높이 기록"""
+        if self.fp is None:
+            return
+        try:
+            self._emit(self._compressor.flush(), flush=True)
+            self.fp.write(_png_chunk(b"IEND", b""))
+            self.fp.seek(self._ihdr_offset)
+            self.fp.write(self._ihdr())
+            self.fp.close()
+            self.path = commit(self._temp_path, self.path)
+        except BaseException:
+            self.fp.close()
+            os.unlink(self._temp_path)
+            raise
+        finally:
+            self.fp = None
+
+
+class PanoramaStitcher:
+    """스크롤하며 캡쳐한 프레임을 이어붙여 PNG로 저장
+
+    마지막으로 이어붙인 프레임을 기준으로 새 프레임의 스크롤 양을 찾는다.
+    위로 스크롤했거나 움직이지 않은 프레임은 무시하므로, 되돌아갔다 다시
+    내려와도 같은 내용이 두 번 붙지 않는다. 겹치는 부분을 못 찾으면 프레임을
+    통째로 붙이고 gaps를 센다.
+
+    프레임의 아래쪽 행은 다음 프레임이 올 때까지 쓰지 않고 들고 있다가,
+    고정 바닥글이 있으면 중간에서는 빼고 마지막에 한 번만 쓴다.
+    """
+
+    def __init__(self, path, compress_level=6, ignore_right=SCROLLBAR_WIDTH, min_rows=MIN_MATCH_ROWS):
+        self.path = path
+        self.compress_level = compress_level
+        self.ignore_right = ignore_right
+        self.min_rows = min_rows
+        self.writer = None
+        self.frames = 0
+        self.stitched = 0
+        self.gaps = 0
+        self._hashes = None
+        # 아직 쓰지 않은 마지막 프레임과 쓰기 시작할 행
+        self._pending = None
+        self._pending_start = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def size(self):
+        """지금까지 이어붙인 이미지 크기 (아직 쓰지 않은 행 포함)"""
+        if self.writer is None:
+            return (0, 0)
+        if self._pending is None:
+            return (self.writer.width, self.writer.height)
+        return (self.writer.width,
+                self.writer.height + self._pending.shape[0] - self._pending_start)
+
+    def add(self, image):
+        """프레임 추가, 새로 붙은 행 수 반환 (0이면 무시한 프레임)"""
+        with METRICS.stage("stitch"):
+            pixels = np.asarray(image.convert("RGB") if image.mode != "RGB" else image)
+            hashes = _row_hashes(pixels, self.ignore_right)
+            self.frames += 1
+            height = len(hashes)
+            if self._pending is None:
+                self.writer = StripPNGWriter(self.path, pixels.shape[1], self.compress_level)
+                self._accept(pixels, hashes, 0)
+                return height
+            if pixels.shape[1] != self.writer.width:
+                raise ValueError(f"프레임 크기가 다릅니다: {image.size}")
+
+            offset = find_scroll_offset(self._hashes, hashes, self.min_rows)
+            if offset == 0:
+                return 0
+            if offset is None:
+                # 이어지는 부분을 못 찾음: 앞 프레임을 다 쓰고 새 프레임을 통째로 붙인다
+                self.gaps += 1
+                self.writer.write(self._pending[self._pending_start:])
+                self._accept(pixels, hashes, 0)
+                return height
+
+            footer = fixed_footer_rows(self._hashes, hashes, offset)
+            self.writer.write(self._pending[self._pending_start:height - footer])
+            # 새 프레임의 r행 = 앞 프레임의 r + offset행
+            self._accept(pixels, hashes, height - footer - offset)
+            return offset
+
+    def _accept(self, pixels, hashes, start):
+        self._pending = pixels
+        self._pending_start = max(0, start)
+        self._hashes = hashes
+        self.stitched += 1
+
+    def close(self):
+        """남은 행을 쓰고 파일을 닫는다, 최종 (가로, 세로) 반환"""
+        if self.writer is None:
+            return (0, 0)
+        if self._pending is not None:
+            self.writer.write(self._pending[self._pending_start:])
+            self._pending = None
+        self.writer.close()
+        self.path = self.writer.path
+        return (self.writer.width, self.writer.height)
@@ -0,0 +1,367 @@
+"""백그라운드 인코딩/저장 파이프라인
+
+캡쳐한 이미지를 제한된 크기의 작업 큐에 넣으면 워커 스레드가 인코딩과
+파일 쓰기를 처리한다. 완료/오류 콜백은 워커 스레드에서 직접 호출하지 않고
+결과 큐에 쌓아 두었다가, Tk 스레드에서 poll()로 꺼내 실행한다.
+
+PNG 압축처럼 CPU를 많이 쓰는 인코딩은 한 프로세스 안에서는 사실상 직렬로
+처리되므로, 연속 캡쳐에서는 ProcessSaveWorker로 여러 프로세스에 나눠 맡길 수 있다.
+프레임은 공유 메모리 링(shared_frames)을 거치면 pickle 복사 없이 전달된다.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from PIL import Image
+
+from encoding import save_image
+from filestore import SyncPolicy
+from metrics import METRICS
+from shared_frames import FrameSlot, attach_frame
+
+
+# (폴더, 접두사, 캡쳐 종류) -> (마지막으로 만든 이름, 같은 이름 번호)
+_last_names = {}
+_names_lock = threading.Lock()
+
+
+def capture_filename(folder, prefix, capture_type, file_format):
+    """파일명 생성 (prefix_type_YYYYmmdd_HHMMSS_mmm.format)
+
+    같은 밀리초에 같은 이름이 또 나오면 -2, -3...을 붙인다. 다른 프로세스가
+    만든 같은 이름은 저장할 때(filestore.commit) 한 번 더 피한다.
+    """
+    now = datetime.now()
+    stem = f"{prefix or 'screenshot'}_{capture_type}_{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}"
+    key = (folder, prefix, capture_type)
+    with _names_lock:
+        last, number = _last_names.get(key, (None, 1))
+        number = number + 1 if last == stem else 1
+        _last_names[key] = (stem, number)
+    if number > 1:
+        stem = f"{stem}-{number}"
+    return os.path.join(folder, f"{stem}.{file_format.lower()}")
+
+
+class SaveJob:
+    """저장 작업 하나 (완료 콜백은 on_done(filepath, size, EncodeResult))"""
+
+    def __init__(self, image, filepath, on_done=None, on_error=None, save_kwargs=None,
+                 on_written=None, meta=None):
+        self.image = image
+        self.filepath = filepath
+        # auto 포맷이면 저장 후 filepath의 확장자가 바뀐다
+        self.requested_path = filepath
+        self.on_done = on_done
+        self.on_error = on_error
+        self.save_kwargs = save_kwargs or {}
+        # 워커 스레드에서 저장 직후 호출 (통계 수집용, 스레드 안전해야 함)
+        self.on_written = on_written
+        # 캡쳐 종류/모니터/영역/시각 등 기록용 정보 (history.CaptureHistory.record_job)
+        self.meta = meta or {}
+        self.encode_time = None
+        self.nbytes = None
+        self.size = None
+        self.result = None
+        # ProcessSaveWorker가 프레임을 담은 공유 메모리 슬롯
+        self.slot = None
+        # ProcessSaveWorker가 워커 프로세스에서 함께 계산한 내용 해시와 지각 해시 (digests)
+        self.content_hash = None
+        self.fingerprint = None
+
+
+class SaveWorker:
+    """제한된 큐를 가진 백그라운드 저장 워커
+
+    큐가 가득 차면 submit()이 블록되거나(timeout 지정 시) queue.Full을
+    발생시켜 메모리가 끝없이 늘어나지 않도록 한다.
+
+    sync(filestore.SyncPolicy)는 저장한 파일을 언제 fsync할지 정한다.
+    batch면 워커가 쉬는 동안에도 every_ms가 지나면 모아 둔 파일을 fsync한다.
+    """
+
+    def __init__(self, max_pending=4, workers=1, sync=None):
+        self.sync = sync or SyncPolicy()
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.results = queue.Queue()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f"save-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, image, filepath, on_done=None, on_error=None,
+               block=True, timeout=None, on_written=None, meta=None, **save_kwargs):
+        """저장 작업 등록 (큐가 가득 차면 backpressure)"""
+        if self.sync.per_file:
+            save_kwargs.setdefault("fsync", True)
+        job = SaveJob(image, filepath, on_done, on_error, save_kwargs, on_written, meta)
+        self.jobs.put(job, block=block, timeout=timeout)
+        return job
+
+    def pending(self):
+        """아직 처리되지 않은 작업 수"""
+        return self.jobs.unfinished_tasks
+
+    def _run(self):
+        while True:
+            try:
+                # 모아 둔 fsync가 있으면 그 시각까지만 기다린다
+                job = self.jobs.get(timeout=self.sync.due_in())
+            except queue.Empty:
+                self.sync.flush()
+                continue
+            if job is None:
+                self.sync.flush()
+                self.jobs.task_done()
+                break
+            try:
+                self.encode_and_write(job)
+                METRICS.record_encode(job.result)
+                self.sync.written(job.filepath)
+                if job.on_written:
+                    job.on_written(job)
+                if job.on_done:
+                    self._post(job.on_done, (job.filepath, job.size, job.result))
+            except Exception as e:
+                if job.on_error:
+                    self._post(job.on_error, (job.filepath, e))
+                else:
+                    print(f"저장 실패: {job.filepath}: {e}")
+            finally:
+                # 큰 이미지는 빨리 놓아준다
+                job.image = None
+                self.jobs.task_done()
+
+    def encode_and_write(self, job):
+        """이미지를 인코딩하여 파일로 저장 (save_kwargs: file_format, profile 등)"""
+        image = job.image
+        if not hasattr(image, "save"):
+            # NumPy 배열(일괄 캡쳐 뷰 등)은 워커 스레드에서 이미지로 변환
+            with METRICS.stage("convert"):
+                image = Image.fromarray(image)
+        job.size = image.size
+        job.result = save_image(image, job.filepath, **job.save_kwargs)
+        job.filepath = job.result.path
+        job.encode_time = job.result.encode_time
+        job.nbytes = job.result.nbytes
+
+    def _post(self, callback, args):
+        """Tk 스레드에서 실행할 콜백 등록 (등록 시각은 notify 단계 측정용)"""
+        self.results.put((callback, args, time.perf_counter()))
+
+    def poll(self, max_callbacks=None):
+        """쌓인 완료/오류 콜백 실행 (Tk 스레드에서 호출)
+
+        결과 큐 항목은 (callback, args) 또는 (callback, args, 등록 시각)이다.
+        """
+        count = 0
+        while max_callbacks is None or count < max_callbacks:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callback, args = item[0], item[1]
+            if len(item) > 2:
+                METRICS.record("notify", time.perf_counter() - item[2])
+            callback(*args)
+            count += 1
+        return count
+
+    def join(self):
+        """큐에 있는 모든 작업이 끝날 때까지 대기"""
+        self.jobs.join()
+
+    def shutdown(self, wait=True):
+        """워커 종료"""
+        for _ in self._threads:
+            self.jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+def _digests(image, names):
+    """워커 프로세스에서 저장한 이미지로 기록용 값 계산 (이름 -> 값)"""
+    digests = {}
+    if "content_hash" in names:
+        from history import content_hash
+        digests["content_hash"] = content_hash(image)
+    if "fingerprint" in names:
+        from similar import fingerprint
+        digests["fingerprint"] = fingerprint(image)
+    return digests
+
+
+def _encode_raw(mode, size, data, filepath, save_kwargs, digests=()):
+    """워커 프로세스에서 원시 픽셀 바이트를 이미지로 되돌려 저장, (EncodeResult, digests)"""
+    image = Image.frombuffer(mode, size, data, "raw", mode, 0, 1)
+    return save_image(image, filepath, **save_kwargs), _digests(image, digests)
+
+
+def _encode_shared(ref, filepath, save_kwargs, digests=()):
+    """워커 프로세스에서 공유 메모리 슬롯을 읽어 저장, (EncodeResult, digests)"""
+    image = attach_frame(ref)
+    return save_image(image, filepath, **save_kwargs), _digests(image, digests)
+
+
+class ProcessSaveWorker(SaveWorker):
+    """여러 프로세스에서 인코딩하는 저장 워커 (SaveWorker와 같은 인터페이스)
+
+    디스패처 스레드 하나가 작업을 원시 픽셀 바이트로 바꿔 프로세스 풀에 넘기고,
+    끝난 작업은 제출한 순서대로 완료 처리한다. 파일명은 제출할 때 정해지므로
+    인코딩이 끝나는 순서와 관계없이 결과 파일과 콜백 순서가 항상 같다.
+    results를 넘기면 다른 워커와 결과 큐를 공유한다 (poll 한 번으로 처리).
+
+    ring(SharedFrameRing)을 주면 이미지를 슬롯에 복사해 넘기고, ring.grab()으로
+    이미 슬롯에 담은 FrameSlot은 그대로 넘긴다. 슬롯은 저장이 끝나면 반환된다.
+    빈 슬롯이 없거나 프레임이 슬롯보다 크면 pickle로 넘긴다. ring은 실행 중에
+    바꿀 수 있다 (이전 링은 retire).
+
+    작업이 끝나면 이미지가 이 프로세스에 없으므로, on_written 훅에 필요한 값은
+    digests로 골라 워커 프로세스에서 저장하면서 함께 계산한다.
+      "content_hash"  job.content_hash (history.content_hash)
+      "fingerprint"   job.fingerprint (similar.fingerprint의 (pHash, dHash))
+    """
+
+    def __init__(self, max_pending=8, processes=None, results=None, ring=None, sync=None,
+                 digests=()):
+        self.sync = sync or SyncPolicy()
+        self.processes = processes or os.cpu_count() or 1
+        self.ring = ring
+        self.digests = tuple(digests)
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.results = results if results is not None else queue.Queue()
+        # 스레드가 도는 중에 fork하면 자식이 잠긴 락을 물려받을 수 있으므로
+        # 모든 플랫폼에서 Windows와 같은 spawn 방식으로 워커를 띄운다
+        self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                         mp_context=multiprocessing.get_context("spawn"))
+        # 프로세스마다 하나는 인코딩 중, 하나는 대기하도록 두 배까지 넘긴다
+        self._max_in_flight = self.processes * 2
+        self._threads = [threading.Thread(target=self._run, name="save-dispatcher", daemon=True)]
+        self._threads[0].start()
+
+    def submit(self, image, filepath, *args, **kwargs):
+        """저장 작업 등록 (큐에 넣지 못하면 넘겨받은 FrameSlot은 바로 반환한다)"""
+        try:
+            return super().submit(image, filepath, *args, **kwargs)
+        except BaseException:
+            if isinstance(image, FrameSlot):
+                image.release()
+            raise
+
+    def _run(self):
+        in_flight = self._in_flight = deque()
+        while True:
+            # 진행 중인 작업이나 모아 둔 fsync가 있으면 주기적으로 깨어나 정리한다
+            timeout = 0.05 if in_flight else None
+            sync_due = self.sync.due_in()
+            if sync_due is not None:
+                timeout = sync_due if timeout is None else min(timeout, sync_due)
+            try:
+                job = self.jobs.get(timeout=timeout)
+            except queue.Empty:
+                job = False
+            if job is None:
+                while in_flight:
+                    self._finish(*in_flight.popleft())
+                self.sync.flush()
+                self.jobs.task_done()
+                break
+            if job:
+                in_flight.append((job, self._dispatch(job)))
+            while in_flight and (len(in_flight) >= self._max_in_flight or in_flight[0][1].done()):
+                self._finish(*in_flight.popleft())
+            if self.sync.due_in() == 0:
+                self.sync.flush()
+
+    def _dispatch(self, job):
+        """작업을 프로세스 풀에 넘기고 Future 반환 (실패하면 예외를 담은 Future)"""
+        try:
+            image = job.image
+            if isinstance(image, FrameSlot):
+                job.slot = image
+            else:
+                with METRICS.stage("convert"):
+                    if not hasattr(image, "save"):
+                        image = Image.fromarray(image)
+                    if image.mode != "RGB":
+                        image = image.convert("RGB")
+                job.slot = self._slot_for(image)
+            if job.slot is not None:
+                job.size = job.slot.size
+                return self._pool.submit(_encode_shared, job.slot.ref(),
+                                         job.filepath, job.save_kwargs, self.digests)
+            job.size = image.size
+            return self._pool.submit(_encode_raw, image.mode, image.size, image.tobytes(),
+                                     job.filepath, job.save_kwargs, self.digests)
+        except Exception as e:
+            return _FailedFuture(e)
+        finally:
+            job.image = None
+
+    def _slot_for(self, image):
+        """이미지를 공유 메모리 슬롯에 복사 (링이 없거나 쓸 수 없으면 None)"""
+        ring = self.ring
+        if ring is None or not ring.fits(image.width * image.height * 3):
+            return None
+        while True:
+            try:
+                return ring.write_image(image, block=False)
+            except RuntimeError:
+                # 더 큰 링으로 바뀌는 중 (retire된 링)
+                return None
+            except queue.Full:
+                # 슬롯은 앞선 작업이 끝나야 반환되므로, 가장 오래된 작업을 먼저 마무리한다
+                if not self._in_flight:
+                    return None
+                self._finish(*self._in_flight.popleft())
+
+    def _finish(self, job, future):
+        """제출 순서대로 결과를 받아 콜백 등록"""
+        try:
+            job.result, digests = future.result()
+            job.content_hash = digests.get("content_hash")
+            job.fingerprint = digests.get("fingerprint")
+            job.filepath = job.result.path
+            job.encode_time = job.result.encode_time
+            job.nbytes = job.result.nbytes
+            METRICS.record_encode(job.result)
+            self.sync.written(job.filepath)
+            if job.on_written:
+                job.on_written(job)
+            if job.on_done:
+                self._post(job.on_done, (job.filepath, job.size, job.result))
+        except Exception as e:
+            if job.on_error:
+                self._post(job.on_error, (job.filepath, e))
+            else:
+                print(f"저장 실패: {job.filepath}: {e}")
+        finally:
+            if job.slot is not None:
+                job.slot.release()
+                job.slot = None
+            self.jobs.task_done()
+
+    def shutdown(self, wait=True):
+        """디스패처와 프로세스 풀 종료"""
+        super().shutdown(wait)
+        self._pool.shutdown(wait=wait)
+
+
+class _FailedFuture:
+    """풀에 넘기기 전에 실패한 작업용 Future 대용"""
+
+    def __init__(self, error):
+        self._error = error
+
+    def done(self):
+        return True
+
+    def result(self):
+        raise self._error
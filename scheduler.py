@@ -0,0 +1,176 @@
+"""연속(인터벌/버스트) 캡쳐용 프레임 스케줄러
+
+각 프레임의 목표 시각을 시작 시각 + index * interval (time.monotonic 기준)로
+고정해 두고, 매번 "다음 목표 시각까지 남은 시간"만큼만 기다린다.
+root.after(interval)를 연쇄로 거는 방식과 달리 지연이 누적되지 않으며,
+한 주기 이상 늦어지면 놓친 프레임은 건너뛰고 누락(dropped)으로 기록한다.
+"""
+import math
+import time
+
+
+class BurstStats:
+    """연속 캡쳐 결과 통계"""
+
+    def __init__(self, frames, dropped, elapsed, target_fps, fps,
+                 jitter_mean_ms, jitter_max_ms, interval_std_ms):
+        self.frames = frames
+        self.dropped = dropped
+        self.elapsed = elapsed
+        self.target_fps = target_fps
+        self.fps = fps
+        self.jitter_mean_ms = jitter_mean_ms
+        self.jitter_max_ms = jitter_max_ms
+        self.interval_std_ms = interval_std_ms
+
+    def summary(self):
+        """사람이 읽을 수 있는 요약 문자열"""
+        return (f"캡쳐 프레임: {self.frames}장 (누락 {self.dropped}장)\n"
+                f"경과 시간: {self.elapsed:.2f}초\n"
+                f"목표 FPS: {self.target_fps:.2f}, 실제 FPS: {self.fps:.2f}\n"
+                f"지터: 평균 {self.jitter_mean_ms:.1f}ms, 최대 {self.jitter_max_ms:.1f}ms\n"
+                f"프레임 간격 표준편차: {self.interval_std_ms:.1f}ms")
+
+
+class FrameScheduler:
+    """monotonic 목표 시각 기반의 드리프트 없는 프레임 스케줄러
+
+    interval: 프레임 간격(초)
+    duration: 총 캡쳐 시간(초), None이면 제한 없음
+    max_frames: 예약할 프레임 슬롯 수, None이면 제한 없음
+                (누락된 슬롯도 개수에 포함된다)
+    """
+
+    def __init__(self, interval, duration=None, max_frames=None, clock=time.monotonic):
+        if interval <= 0:
+            raise ValueError("프레임 간격은 0보다 커야 합니다.")
+        if duration is None and max_frames is None:
+            raise ValueError("캡쳐 시간 또는 프레임 수 중 하나는 지정해야 합니다.")
+        self.interval = interval
+        self.duration = duration
+        self.max_frames = max_frames
+        self.clock = clock
+        self.start_time = None
+        self.next_index = 0
+        self.frames = 0
+        self.dropped = 0
+        self._last_frame_time = None
+        # 지터/간격 통계 (긴 녹화에도 메모리가 늘지 않도록 누적값만 보관)
+        self._late_count = 0
+        self._late_sum = 0.0
+        self._late_max = 0.0
+        self._gap_count = 0
+        self._gap_mean = 0.0
+        self._gap_m2 = 0.0
+
+    @classmethod
+    def from_fps(cls, fps, **kwargs):
+        """목표 FPS로 스케줄러 생성"""
+        return cls(1.0 / fps, **kwargs)
+
+    def start(self):
+        """스케줄 시작 (첫 프레임은 즉시)"""
+        self.start_time = self.clock()
+        return self
+
+    def deadline(self, index):
+        """index 번째 프레임의 목표 시각"""
+        return self.start_time + index * self.interval
+
+    def finished(self):
+        """더 이상 찍을 프레임이 없는지 여부"""
+        if self.max_frames is not None and self.next_index >= self.max_frames:
+            return True
+        if self.duration is not None and self.deadline(self.next_index) - self.start_time > self.duration:
+            return True
+        return False
+
+    def next_delay(self):
+        """다음 프레임까지 기다릴 시간(초), 끝났으면 None"""
+        if self.finished():
+            return None
+        return max(0.0, self.deadline(self.next_index) - self.clock())
+
+    def begin_frame(self):
+        """지금 찍을 프레임 번호를 반환 (놓친 슬롯은 누락 처리)
+
+        끝났으면 None을 반환한다.
+        """
+        if self.finished():
+            return None
+        now = self.clock()
+        late = now - self.deadline(self.next_index)
+        if late >= self.interval:
+            missed = int(late // self.interval)
+            if self.max_frames is not None:
+                missed = min(missed, self.max_frames - self.next_index)
+            self.dropped += missed
+            self.next_index += missed
+            if self.finished():
+                return None
+            late = now - self.deadline(self.next_index)
+
+        index = self.next_index
+        self.next_index += 1
+        self.frames += 1
+
+        late = max(0.0, late)
+        self._late_count += 1
+        self._late_sum += late
+        self._late_max = max(self._late_max, late)
+        if self._last_frame_time is not None:
+            # Welford 방식으로 프레임 간격 분산 계산
+            gap = now - self._last_frame_time
+            self._gap_count += 1
+            delta = gap - self._gap_mean
+            self._gap_mean += delta / self._gap_count
+            self._gap_m2 += delta * (gap - self._gap_mean)
+        self._last_frame_time = now
+        return index
+
+    def drop_frame(self):
+        """찍었지만 저장하지 못한 프레임을 누락으로 기록"""
+        self.frames -= 1
+        self.dropped += 1
+
+    def stats(self):
+        """현재까지의 통계"""
+        if self._last_frame_time is not None:
+            elapsed = self._last_frame_time - self.start_time
+        else:
+            elapsed = 0.0
+        if self._gap_count:
+            fps = 1.0 / self._gap_mean if self._gap_mean > 0 else 0.0
+            interval_std = math.sqrt(self._gap_m2 / self._gap_count)
+        else:
+            fps = 0.0
+            interval_std = 0.0
+        return BurstStats(
+            frames=self.frames,
+            dropped=self.dropped,
+            elapsed=elapsed,
+            target_fps=1.0 / self.interval,
+            fps=fps,
+            jitter_mean_ms=(self._late_sum / self._late_count * 1000) if self._late_count else 0.0,
+            jitter_max_ms=self._late_max * 1000,
+            interval_std_ms=interval_std * 1000,
+        )
+
+    def run(self, capture, sleep=time.sleep, stop_event=None):
+        """스레드/CLI용 블로킹 실행: 각 프레임마다 capture(index) 호출"""
+        if self.start_time is None:
+            self.start()
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                break
+            delay = self.next_delay()
+            if delay is None:
+                break
+            if delay > 0:
+                sleep(delay)
+            index = self.begin_frame()
+            if index is None:
+                break
+            if capture(index) is False:
+                self.drop_frame()
+        return self.stats()
@@ -0,0 +1,425 @@
+"""연속 캡쳐용 스트리밍 시퀀스 저장
+
+프레임이 들어오는 대로 하나의 애니메이션 파일(APNG / 애니메이션 WebP / GIF)이나
+원시 프레임 컨테이너(RAW)에 이어 쓴다. Pillow의 save_all/append_images는
+모든 프레임을 메모리에 모은 뒤에 쓰기 때문에, 여기서는 프레임마다 Pillow로
+정지 이미지를 인코딩한 다음 컨테이너 청크만 직접 붙여 쓴다.
+
+메모리에는 "직전 전체 프레임"과 "표시 시간이 아직 정해지지 않은 프레임"
+하나만 남는다. 각 프레임의 표시 시간은 다음 프레임의 실제 캡쳐 시각과의
+차이로 정해지며, 직전 프레임과 똑같은 프레임은 새로 쓰지 않고 앞 프레임의
+표시 시간을 늘린다. 바뀐 부분만 잘라 쓰는 delta 모드가 기본이다.
+
+    with open_sequence_writer("burst.png") as writer:
+        for timestamp, image in frames:
+            writer.add(image, timestamp)
+"""
+import io
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+RAW_MAGIC = b"CAPRAW\x00\x01"
+# RAW 프레임 헤더: timestamp, width, height, 데이터 길이, 모드(4바이트)
+RAW_FRAME_HEADER = struct.Struct("<dIII4s")
+
+
+class SequenceWriter:
+    """스트리밍 애니메이션 저장 기본 클래스"""
+    extension = None
+
+    def __init__(self, path, loop=0, delta=True, default_duration=100):
+        self.path = path
+        self.loop = loop
+        self.delta = delta
+        self.default_duration = default_duration
+        self.size = None
+        self.frames_written = 0
+        self.frames_merged = 0
+        self.fp = open(path, "wb")
+        self._canvas = None
+        self._pending = None
+        self._last_timestamp = None
+        self._last_interval = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, image, timestamp=None):
+        """프레임 추가 (timestamp는 초 단위, 기본값은 time.monotonic())"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self._last_timestamp is not None:
+            self._last_interval = timestamp - self._last_timestamp
+        self._last_timestamp = timestamp
+
+        image = image if image.mode == "RGB" else image.convert("RGB")
+        if self._canvas is None:
+            self.size = image.size
+            bbox = (0, 0) + image.size
+        else:
+            if image.size != self.size:
+                raise ValueError(f"프레임 크기가 다릅니다: {image.size} != {self.size}")
+            bbox = (0, 0) + image.size
+            if self.delta:
+                bbox = ImageChops.difference(self._canvas, image).getbbox()
+                if bbox is None:
+                    # 변화 없음: 앞 프레임을 더 오래 보여준다
+                    self.frames_merged += 1
+                    return
+                bbox = self._align(bbox)
+
+        if self._pending is not None:
+            self._flush_pending(timestamp)
+        frame = image if bbox == (0, 0) + image.size else image.crop(bbox)
+        self._pending = (frame, bbox[:2], timestamp)
+        self._canvas = image
+
+    def close(self):
+        """남은 프레임을 쓰고 파일 닫기"""
+        if self.fp.closed:
+            return
+        try:
+            if self._pending is not None:
+                interval = self._last_interval or self.default_duration / 1000
+                self._flush_pending(self._last_timestamp + interval)
+            if self.frames_written:
+                self._finish()
+        finally:
+            self.fp.close()
+            self._canvas = None
+
+    def _flush_pending(self, next_timestamp):
+        frame, offset, timestamp = self._pending
+        self._pending = None
+        duration = max(1, round((next_timestamp - timestamp) * 1000))
+        self._write_frame(frame, offset, duration)
+        self.frames_written += 1
+
+    def _align(self, bbox):
+        """포맷 제약에 맞게 부분 프레임 영역 조정"""
+        return bbox
+
+    def _write_frame(self, frame, offset, duration):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+
+def _png_chunk(chunk_type, data):
+    return (struct.pack(">I", len(data)) + chunk_type + data +
+            struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+
+def _iter_png_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, = struct.unpack(">I", data[pos:pos + 4])
+        chunk_type = data[pos + 4:pos + 8]
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+class APNGWriter(SequenceWriter):
+    """애니메이션 PNG 스트리밍 저장 (프레임 수는 닫을 때 acTL에 기록)"""
+    extension = "png"
+
+    def __init__(self, path, compress_level=6, **kwargs):
+        super().__init__(path, **kwargs)
+        self.compress_level = compress_level
+        self._sequence = 0
+        self._actl_pos = None
+
+    def _encode(self, frame):
+        buffer = io.BytesIO()
+        frame.save(buffer, "PNG", compress_level=self.compress_level)
+        return buffer.getvalue()
+
+    def _write_frame(self, frame, offset, duration):
+        chunks = list(_iter_png_chunks(self._encode(frame)))
+        first = self._actl_pos is None
+        if first:
+            self.fp.write(PNG_SIGNATURE)
+            self.fp.write(_png_chunk(b"IHDR", dict(chunks)[b"IHDR"]))
+            self._actl_pos = self.fp.tell()
+            self.fp.write(_png_chunk(b"acTL", struct.pack(">II", 0, self.loop)))
+
+        # delay는 u16 분자/분모라서 긴 표시 시간은 1/100초 단위로 기록
+        if duration <= 0xFFFF:
+            delay_num, delay_den = duration, 1000
+        else:
+            delay_num, delay_den = min(0xFFFF, round(duration / 10)), 100
+        width, height = frame.size
+        self.fp.write(_png_chunk(b"fcTL", struct.pack(
+            ">IIIIIHHBB", self._sequence, width, height, offset[0], offset[1],
+            delay_num, delay_den, 0, 0)))
+        self._sequence += 1
+
+        for chunk_type, data in chunks:
+            if chunk_type != b"IDAT":
+                continue
+            if first:
+                self.fp.write(_png_chunk(b"IDAT", data))
+            else:
+                self.fp.write(_png_chunk(b"fdAT", struct.pack(">I", self._sequence) + data))
+                self._sequence += 1
+
+    def _finish(self):
+        self.fp.write(_png_chunk(b"IEND", b""))
+        end = self.fp.tell()
+        self.fp.seek(self._actl_pos)
+        self.fp.write(_png_chunk(b"acTL", struct.pack(">II", self.frames_written, self.loop)))
+        self.fp.seek(end)
+
+
+def _riff_chunk(fourcc, data):
+    padding = b"\0" if len(data) % 2 else b""
+    return fourcc + struct.pack("<I", len(data)) + data + padding
+
+
+def _u24(value):
+    return struct.pack("<I", value)[:3]
+
+
+class WebPWriter(SequenceWriter):
+    """애니메이션 WebP 스트리밍 저장 (RIFF 크기는 닫을 때 기록)"""
+    extension = "webp"
+
+    def __init__(self, path, lossless=True, quality=80, method=0, **kwargs):
+        super().__init__(path, **kwargs)
+        self.lossless = lossless
+        self.quality = quality
+        self.method = method
+        self._started = False
+
+    def _align(self, bbox):
+        # ANMF 오프셋은 짝수여야 한다
+        left, top, right, bottom = bbox
+        return (left - left % 2, top - top % 2, right, bottom)
+
+    def _frame_chunks(self, frame):
+        buffer = io.BytesIO()
+        frame.save(buffer, "WEBP", lossless=self.lossless, quality=self.quality, method=self.method)
+        data = buffer.getvalue()
+        pos = 12
+        chunks = b""
+        while pos < len(data):
+            fourcc = data[pos:pos + 4]
+            length, = struct.unpack("<I", data[pos + 4:pos + 8])
+            if fourcc in (b"ALPH", b"VP8 ", b"VP8L"):
+                chunks += _riff_chunk(fourcc, data[pos + 8:pos + 8 + length])
+            pos += 8 + length + (length % 2)
+        return chunks
+
+    def _write_frame(self, frame, offset, duration):
+        if not self._started:
+            width, height = self.size
+            self.fp.write(b"RIFF" + struct.pack("<I", 0) + b"WEBP")
+            self.fp.write(_riff_chunk(b"VP8X", bytes([0x02, 0, 0, 0]) +
+                                      _u24(width - 1) + _u24(height - 1)))
+            self.fp.write(_riff_chunk(b"ANIM", struct.pack("<IH", 0, self.loop)))
+            self._started = True
+
+        width, height = frame.size
+        header = (_u24(offset[0] // 2) + _u24(offset[1] // 2) +
+                  _u24(width - 1) + _u24(height - 1) +
+                  _u24(min(duration, 0xFFFFFF)) +
+                  bytes([0x02]))  # 블렌딩 없음, 덮어쓰기
+        self.fp.write(_riff_chunk(b"ANMF", header + self._frame_chunks(frame)))
+
+    def _finish(self):
+        end = self.fp.tell()
+        self.fp.seek(4)
+        self.fp.write(struct.pack("<I", end - 8))
+        self.fp.seek(end)
+
+
+class GIFWriter(SequenceWriter):
+    """애니메이션 GIF 스트리밍 저장 (프레임마다 로컬 팔레트 사용)"""
+    extension = "gif"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._started = False
+
+    def _write_frame(self, frame, offset, duration):
+        frame = frame.quantize(256, method=Image.Quantize.FASTOCTREE)
+        if not self._started:
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": self.loop})
+            for block in header:
+                self.fp.write(block)
+            self._started = True
+        # GIF 표시 시간은 1/100초 단위 u16
+        duration = min(duration, 0xFFFF * 10)
+        for block in GifImagePlugin.getdata(frame, offset, duration=duration,
+                                            disposal=1, include_color_table=True):
+            self.fp.write(block)
+
+    def _finish(self):
+        self.fp.write(b";")
+
+
+def raw_frame_header(image, timestamp):
+    """RAW 컨테이너의 프레임 헤더 (바로 뒤에 image.tobytes()가 온다)"""
+    length = image.width * image.height * len(image.getbands())
+    return RAW_FRAME_HEADER.pack(timestamp, image.width, image.height, length, image.mode.encode("ascii"))
+
+
+class RawSequenceWriter:
+    """원시 프레임 컨테이너 (인코딩 없이 픽셀과 캡쳐 시각만 기록)"""
+    extension = "capraw"
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.frames_written = 0
+        self.frames_merged = 0
+        self.fp = open(path, "wb")
+        self.fp.write(RAW_MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, image, timestamp=None):
+        """프레임 추가"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.fp.write(raw_frame_header(image, timestamp))
+        self.fp.write(image.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        """파일 닫기"""
+        self.fp.close()
+
+
+def read_raw_frames(path):
+    """RAW 컨테이너의 (timestamp, PIL 이미지)를 하나씩 돌려주는 제너레이터"""
+    with open(path, "rb") as fp:
+        if fp.read(len(RAW_MAGIC)) != RAW_MAGIC:
+            raise ValueError(f"RAW 시퀀스 파일이 아닙니다: {path}")
+        while True:
+            header = fp.read(RAW_FRAME_HEADER.size)
+            if len(header) < RAW_FRAME_HEADER.size:
+                break
+            timestamp, width, height, length, mode = RAW_FRAME_HEADER.unpack(header)
+            data = fp.read(length)
+            if len(data) < length:
+                break
+            yield timestamp, Image.frombytes(mode.rstrip(b"\0").decode("ascii"), (width, height), data)
+
+
+def _tile_archive_writer(path, **kwargs):
+    """타일 아카이브 저장 객체 (NumPy는 이 포맷을 쓸 때만 불러온다)"""
+    from archive import TileArchiveWriter
+    return TileArchiveWriter(path, **kwargs)
+
+
+# 포맷 이름 -> 저장 클래스 (또는 저장 객체를 만드는 함수)
+SEQUENCE_WRITERS = {
+    "apng": APNGWriter,
+    "webp": WebPWriter,
+    "gif": GIFWriter,
+    "raw": RawSequenceWriter,
+    "tiles": _tile_archive_writer,
+}
+
+# 확장자 -> 포맷 이름
+_EXTENSION_FORMATS = {
+    ".png": "apng",
+    ".apng": "apng",
+    ".webp": "webp",
+    ".gif": "gif",
+    ".capraw": "raw",
+    ".raw": "raw",
+    ".captiles": "tiles",
+}
+
+
+def open_sequence_writer(path, format=None, **kwargs):
+    """포맷(없으면 확장자로 판단)에 맞는 시퀀스 저장 객체 생성"""
+    if format is None:
+        format = _EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise ValueError(f"확장자로 시퀀스 포맷을 알 수 없습니다: {path}")
+    if format not in SEQUENCE_WRITERS:
+        raise ValueError(f"알 수 없는 시퀀스 포맷: {format} (사용 가능: {', '.join(SEQUENCE_WRITERS)})")
+    return SEQUENCE_WRITERS[format](path, **kwargs)
+
+
+def write_sequence(path, frames, format=None, **kwargs):
+    """(timestamp, image) 또는 image를 내놓는 이터러블/제너레이터를 파일 하나로 저장"""
+    with open_sequence_writer(path, format, **kwargs) as writer:
+        for item in frames:
+            if isinstance(item, tuple):
+                timestamp, image = item
+            else:
+                timestamp, image = None, item
+            writer.add(image, timestamp)
+    return writer
+
+
+class SequenceSink:
+    """백그라운드 스레드에서 시퀀스 파일을 쓰는 제한 크기 큐
+
+    submit()으로 넣은 프레임은 write_sequence()에 제너레이터로 흘려보낸다.
+    완료/오류 콜백은 results 큐에 (callback, args)로 넣으므로
+    SaveWorker.results를 넘겨주면 기존 poll()에서 Tk 스레드로 처리된다.
+    """
+
+    def __init__(self, path, format=None, max_pending=8, results=None,
+                 on_done=None, on_error=None, **writer_kwargs):
+        self.path = path
+        self.frames = queue.Queue(maxsize=max_pending)
+        self.results = results if results is not None else queue.Queue()
+        self.on_done = on_done
+        self.on_error = on_error
+        self.writer = None
+        self._thread = threading.Thread(target=self._run, args=(format, writer_kwargs),
+                                        name="sequence-writer", daemon=True)
+        self._thread.start()
+
+    def _iter_frames(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            yield item
+
+    def _run(self, format, writer_kwargs):
+        try:
+            self.writer = write_sequence(self.path, self._iter_frames(), format, **writer_kwargs)
+            if self.on_done:
+                self.results.put((self.on_done, (self.path, self.writer)))
+        except Exception as e:
+            # 남은 프레임을 비워 submit()이 막히지 않게 한다
+            for _ in self._iter_frames():
+                pass
+            if self.on_error:
+                self.results.put((self.on_error, (self.path, e)))
+            else:
+                print(f"시퀀스 저장 실패: {self.path}: {e}")
+
+    def submit(self, image, timestamp=None, block=True, timeout=None):
+        """프레임 추가 (큐가 가득 차면 backpressure / queue.Full)"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.frames.put((timestamp, image), block=block, timeout=timeout)
+
+    def close(self, wait=False):
+        """더 이상 프레임이 없음을 알림 (wait=True면 파일이 닫힐 때까지 대기)"""
+        self.frames.put(None)
+        if wait:
+            self._thread.join()
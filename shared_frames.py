@@ -0,0 +1,199 @@
+"""캡쳐와 인코딩 프로세스 사이의 공유 메모리 프레임 링
+
+4K BGRX 프레임(약 33MB)을 pickle로 워커 프로세스에 넘기면 인코딩만큼
+비용이 든다. 대신 고정된 개수의 multiprocessing.shared_memory 슬롯을
+미리 만들어 두고, 캡쳐한 픽셀을 슬롯에 한 번만 복사한 뒤 워커에는 슬롯
+이름과 크기만 넘긴다. 워커는 슬롯을 그대로 읽어 이미지로 만든다.
+
+슬롯은 참조 카운트로 관리되며, 마지막 참조가 놓이면 다음 프레임에
+재사용된다. 녹화가 아무리 길어도 메모리 사용량은 slots * slot_size로 고정이다.
+더 큰 프레임을 담아야 해서 링을 바꿀 때는 이전 링을 retire()하면 마지막 슬롯이
+반환될 때 해제되고, 워커 프로세스도 새 링의 슬롯을 처음 열 때 이전 링을 닫는다.
+
+    ring = SharedFrameRing(slots=6, slot_size=3840 * 2160 * 4)
+    slot = ring.grab(backend, bbox)       # 캡쳐 -> 슬롯 (복사 1회)
+    worker.submit(slot, filepath)         # ProcessSaveWorker가 다 쓰면 release
+"""
+import queue
+import threading
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+# 원시 픽셀 형식 -> 픽셀당 바이트 수
+RAW_PIXEL_BYTES = {"RGB": 3, "RGBX": 4, "RGBA": 4, "BGRX": 4, "BGRA": 4, "L": 1}
+
+
+class FrameSlot:
+    """공유 메모리 슬롯 하나와 현재 담긴 프레임 정보"""
+
+    def __init__(self, ring, index, shm):
+        self.ring = ring
+        self.index = index
+        self.shm = shm
+        self.size = None
+        self.rawmode = None
+        self.nbytes = 0
+        self.refs = 0
+
+    def ref(self):
+        """워커 프로세스에 넘길 (링 이름, 슬롯 이름, 크기, 원시 형식, 바이트 수)"""
+        return (self.ring.name, self.shm.name, self.size, self.rawmode, self.nbytes)
+
+    def release(self):
+        """참조 하나 해제 (ring.release와 같음)"""
+        self.ring.release(self)
+
+    def image(self):
+        """슬롯 내용을 RGB 이미지로 (같은 프로세스에서 확인할 때)"""
+        return frame_image(self.shm.buf, self.size, self.rawmode, self.nbytes)
+
+
+def frame_image(buf, size, rawmode, nbytes):
+    """원시 픽셀 버퍼를 RGB 이미지로 변환 (Pillow 내부 형식으로 한 번 풀어낸다)"""
+    view = buf[:nbytes]
+    try:
+        return Image.frombuffer("RGB", size, view, "raw", rawmode, 0, 1)
+    finally:
+        # RGB 이미지는 frombuffer에서 바로 디코딩되므로 버퍼를 붙잡지 않는다
+        view.release()
+
+
+class SharedFrameRing:
+    """참조 카운트로 재활용되는 고정 개수 공유 메모리 프레임 슬롯"""
+
+    def __init__(self, slots=4, slot_size=3840 * 2160 * 4):
+        if slots < 1:
+            raise ValueError("슬롯은 1개 이상이어야 합니다.")
+        self.slot_size = slot_size
+        self._slots = [FrameSlot(self, i, shared_memory.SharedMemory(create=True, size=slot_size))
+                       for i in range(slots)]
+        # 워커 프로세스가 같은 링의 슬롯인지 구분하는 이름
+        self.name = self._slots[0].shm.name
+        self._free = list(reversed(self._slots))
+        self._cond = threading.Condition()
+        self._closed = False
+        self._retired = False
+
+    def __len__(self):
+        return len(self._slots)
+
+    def free_slots(self):
+        """지금 비어 있는 슬롯 수"""
+        with self._cond:
+            return len(self._free)
+
+    def fits(self, nbytes):
+        """nbytes 크기의 프레임을 슬롯에 담을 수 있는지"""
+        return nbytes <= self.slot_size
+
+    def acquire(self, block=True, timeout=None):
+        """빈 슬롯을 참조 1로 가져온다 (모두 사용 중이면 대기, 시간 초과 시 queue.Full)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free or self._closed or self._retired,
+                                       timeout if block else 0):
+                raise queue.Full
+            if self._closed or self._retired:
+                raise RuntimeError("프레임 링이 이미 닫혔습니다.")
+            slot = self._free.pop()
+            slot.refs = 1
+            return slot
+
+    def retain(self, slot):
+        """참조 하나 추가 (같은 프레임을 여러 소비자가 읽을 때)"""
+        with self._cond:
+            if slot.refs <= 0:
+                raise ValueError(f"이미 반환된 슬롯입니다: {slot.index}")
+            slot.refs += 1
+
+    def release(self, slot):
+        """참조 하나 해제, 0이 되면 슬롯 재사용 (retire한 링은 모두 반환되면 닫는다)"""
+        with self._cond:
+            if slot.refs <= 0:
+                raise ValueError(f"이미 반환된 슬롯입니다: {slot.index}")
+            slot.refs -= 1
+            if slot.refs > 0:
+                return
+            slot.size = slot.rawmode = None
+            slot.nbytes = 0
+            self._free.append(slot)
+            self._cond.notify()
+            drained = self._retired and len(self._free) == len(self._slots)
+        if drained:
+            self.close()
+
+    def retire(self):
+        """새 슬롯은 내주지 않고, 사용 중인 슬롯이 모두 반환되면 닫는다"""
+        with self._cond:
+            self._retired = True
+            self._cond.notify_all()
+            drained = len(self._free) == len(self._slots)
+        if drained:
+            self.close()
+
+    def write(self, data, size, rawmode, block=True, timeout=None):
+        """원시 픽셀 바이트를 빈 슬롯에 복사하여 슬롯 반환"""
+        nbytes = size[0] * size[1] * RAW_PIXEL_BYTES[rawmode]
+        if not self.fits(nbytes):
+            raise ValueError(f"프레임({nbytes}바이트)이 슬롯 크기({self.slot_size}바이트)보다 큽니다.")
+        slot = self.acquire(block, timeout)
+        try:
+            slot.shm.buf[:nbytes] = memoryview(data).cast("B")[:nbytes]
+        except Exception:
+            self.release(slot)
+            raise
+        slot.size, slot.rawmode, slot.nbytes = tuple(size), rawmode, nbytes
+        return slot
+
+    def write_image(self, image, block=True, timeout=None):
+        """PIL 이미지를 슬롯에 복사"""
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return self.write(image.tobytes(), image.size, "RGB", block, timeout)
+
+    def grab(self, backend, bbox=None, block=True, timeout=None):
+        """backend로 캡쳐한 원시 픽셀을 바로 슬롯에 담는다"""
+        data, size, rawmode = backend.grab_raw(bbox)
+        return self.write(data, size, rawmode, block, timeout)
+
+    def close(self):
+        """모든 슬롯 해제 (워커가 모두 끝난 뒤 호출)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        for slot in self._slots:
+            try:
+                slot.shm.close()
+                slot.shm.unlink()
+            except (OSError, BufferError) as e:
+                print(f"공유 메모리 해제 실패: {slot.shm.name}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 워커 프로세스에서 열어 둔 슬롯 (이름 -> SharedMemory), 슬롯마다 한 번만 연결한다
+_ATTACHED = {}
+# _ATTACHED 슬롯이 속한 링 이름
+_attached_ring = None
+
+
+def attach_frame(ref):
+    """워커 프로세스에서 슬롯 참조로 RGB 이미지 생성"""
+    global _attached_ring
+    ring_name, name, size, rawmode, nbytes = ref
+    if ring_name != _attached_ring:
+        # 링이 바뀌었으면 이전 링의 슬롯은 다시 오지 않으므로 닫는다
+        for shm in _ATTACHED.values():
+            shm.close()
+        _ATTACHED.clear()
+        _attached_ring = ring_name
+    shm = _ATTACHED.get(name)
+    if shm is None:
+        shm = _ATTACHED[name] = shared_memory.SharedMemory(name=name)
+    return frame_image(shm.buf, size, rawmode, nbytes)
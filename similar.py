@@ -0,0 +1,404 @@
+"""비슷한 캡쳐 찾기 (지각 해시 인덱스)
+
+캡쳐마다 32x32 회색조로 줄인 이미지에서 64비트 지각 해시 두 가지를 만든다.
+  - pHash: 2차원 DCT의 저주파 8x8 계수가 중앙값보다 큰지 (밝기/압축에 강함)
+  - dHash: 9x8로 줄인 이미지에서 가로로 이웃한 픽셀보다 밝은지 (계산이 가장 싸다)
+두 해시의 해밍 거리가 작을수록 비슷한 화면이다. DCT는 여러 장을 한 번에
+행렬 곱으로 계산한다.
+
+해시는 저장 폴더 안의 .capture_fingerprints 파일에 덧붙여 기록하므로
+캡쳐를 저장할 때마다 한 줄씩 늘어나고, 앱 밖에서 생긴 파일은 backfill()이
+수정 시각을 보고 새 것만 계산한다.
+
+검색은 multi-index hashing을 쓴다. 64비트를 16비트 조각 4개로 나누면,
+거리가 d 이하인 두 해시는 적어도 한 조각의 거리가 d // 4 이하다. 조각마다
+정렬해 둔 배열에서 그 조각과 가까운 값만 이분 탐색으로 찾고, 후보만 전체
+거리를 계산하므로 10만 장 이상에서도 수 ms 안에 끝난다.
+
+    index = SimilarityIndex(save_folder)
+    index.backfill()
+    index.search("capture.png", max_distance=8)    # [(거리, 경로), ...]
+    index.groups(max_distance=3)                   # 거의 같은 캡쳐 묶음
+"""
+import itertools
+import os
+import struct
+import threading
+
+import numpy as np
+from PIL import Image
+
+INDEX_FILENAME = ".capture_fingerprints"
+FINGERPRINT_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+
+# 기본 해밍 거리 기준 (비슷한 캡쳐 찾기 / 거의 같은 캡쳐 묶기)
+SEARCH_DISTANCE = 8
+GROUP_DISTANCE = 3
+
+# 해시 계산용 축소 크기
+SAMPLE_SIZE = 32
+# multi-index 조각 수 (64비트 / 4 = 16비트 조각)
+CHUNKS = 4
+# 조각 거리가 이보다 크면 후보가 너무 많아 전체를 바로 비교한다
+MAX_CHUNK_RADIUS = 2
+# 전체 비교로 계산할 최대 쌍 수
+BRUTE_FORCE_LIMIT = 10_000_000
+# backfill에서 한 번에 DCT를 계산할 이미지 수
+BATCH_SIZE = 256
+
+# 기록 하나: pHash, dHash, 수정 시각, 파일명 길이 (+ UTF-8 파일명)
+_RECORD = struct.Struct("<QQdH")
+# 지운 파일 표시 (수정 시각 자리에 넣는다)
+_REMOVED = -1.0
+
+# 32점 DCT-II 행렬 (정규화는 중앙값 비교에 영향이 없어 생략)
+_k = np.arange(SAMPLE_SIZE)
+_DCT = np.cos(np.pi * (2 * _k[None, :] + 1) * _k[:, None] / (2 * SAMPLE_SIZE))
+del _k
+
+
+def sample(image):
+    """지문 계산용 32x32 회색조 배열 (float32)"""
+    small = image.resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BOX, reducing_gap=2.0)
+    return np.asarray(small.convert("L"), dtype=np.float32)
+
+
+def _pack_bits(bits):
+    """(N, 64) bool 배열을 uint64 배열로"""
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def phash_batch(samples):
+    """(N, 32, 32) 배열마다 pHash (uint64 배열)"""
+    coeffs = np.einsum("kn,bnm,lm->bkl", _DCT, samples, _DCT, optimize=True)[:, :8, :8]
+    coeffs = coeffs.reshape(len(samples), 64)
+    # DC 성분(평균 밝기)은 중앙값 계산에서 뺀다
+    median = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    return _pack_bits(coeffs > median)
+
+
+def dhash_batch(samples):
+    """(N, 32, 32) 배열마다 dHash (uint64 배열)"""
+    # 32열을 9칸, 32행을 8칸으로 나눠 평균 (칸 경계가 겹치지 않게 구간 합으로)
+    cols = np.linspace(0, SAMPLE_SIZE, 10).astype(int)
+    rows = np.arange(0, SAMPLE_SIZE + 1, SAMPLE_SIZE // 8)
+    sums = np.add.reduceat(np.add.reduceat(samples, rows[:-1], axis=1), cols[:-1], axis=2)
+    means = sums / (np.diff(rows)[None, :, None] * np.diff(cols)[None, None, :])
+    return _pack_bits((means[:, :, 1:] > means[:, :, :-1]).reshape(len(samples), 64))
+
+
+def fingerprint(image):
+    """이미지 하나의 (pHash, dHash)"""
+    batch = sample(image)[None]
+    return int(phash_batch(batch)[0]), int(dhash_batch(batch)[0])
+
+
+def _read_sample(path):
+    """파일에서 지문용 축소 배열 읽기 (JPEG은 디코딩 단계에서 줄인다)"""
+    with Image.open(path) as image:
+        image.draft("RGB", (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        return sample(image)
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values):
+        """uint64 배열의 비트 수"""
+        return np.bitwise_count(values).astype(np.int64)
+else:
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+    def popcount(values):
+        """uint64 배열의 비트 수"""
+        values = np.ascontiguousarray(values, dtype=np.uint64)
+        return _POPCOUNT8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _chunk_masks(radius):
+    """16비트에서 radius개 이하의 비트를 뒤집는 마스크"""
+    masks = [0]
+    for count in range(1, radius + 1):
+        for bits in itertools.combinations(range(16), count):
+            masks.append(sum(1 << b for b in bits))
+    return np.array(masks, dtype=np.uint16)
+
+
+class _MultiIndex:
+    """해시 배열의 16비트 조각별 색인
+
+    조각마다 항목 번호를 조각 값 순서로 정렬해 두고, 값 v인 항목이
+    order[bounds[v]:bounds[v + 1]]에 있도록 구간 경계를 만든다 (이분 탐색도 필요 없다).
+    """
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.chunks = []
+        for c in range(CHUNKS):
+            values = _chunk(hashes, c)
+            order = np.argsort(values, kind="stable")
+            bounds = np.zeros((1 << 16) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(values, minlength=1 << 16), out=bounds[1:])
+            self.chunks.append((bounds, order))
+
+    def pairs(self, queries, max_distance):
+        """(질의 번호, 항목 번호, 거리) 배열: 거리가 max_distance 이하인 모든 쌍"""
+        radius = max_distance // CHUNKS
+        if radius > MAX_CHUNK_RADIUS:
+            # 후보가 전체와 비슷해지므로 모두 비교
+            if len(queries) * len(self.hashes) > BRUTE_FORCE_LIMIT:
+                raise ValueError(f"거리 {max_distance}는 너무 커서 한 번에 비교할 수 없습니다.")
+            qi = np.repeat(np.arange(len(queries)), len(self.hashes))
+            j = np.tile(np.arange(len(self.hashes)), len(queries))
+            distances = popcount(queries[qi] ^ self.hashes[j])
+            keep = distances <= max_distance
+            return qi[keep], j[keep], distances[keep]
+
+        masks = _chunk_masks(radius)
+        found_q, found_j, found_d = [], [], []
+        for c, (bounds, order) in enumerate(self.chunks):
+            targets = (_chunk(queries, c)[:, None] ^ masks[None, :]).ravel().astype(np.int64)
+            lo = bounds[targets]
+            counts = bounds[targets + 1] - lo
+            if not counts.any():
+                continue
+            # 찾은 구간 [lo, hi)를 펼쳐서 (질의, 항목) 쌍으로
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            qi = np.repeat(np.arange(len(targets)) // len(masks), counts)
+            j = order[starts + np.arange(counts.sum())]
+            diff = queries[qi] ^ self.hashes[j]
+            # 앞 조각에서 이미 찾은 쌍은 버린다 (한 쌍은 처음 걸린 조각에서만)
+            keep = popcount(diff) <= max_distance
+            for earlier in range(c):
+                keep &= popcount(_chunk(diff, earlier)) > radius
+            found_q.append(qi[keep])
+            found_j.append(j[keep])
+            found_d.append(popcount(diff[keep]))
+        if not found_q:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(found_q), np.concatenate(found_j), np.concatenate(found_d)
+
+
+def _chunk(hashes, c):
+    """해시 배열의 c번째 16비트 조각"""
+    return ((hashes >> np.uint64(16 * c)) & np.uint64(0xFFFF)).astype(np.uint16)
+
+
+class SimilarityIndex:
+    """폴더 하나의 지각 해시 인덱스 (여러 스레드에서 써도 안전)"""
+
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.path = os.path.join(self.folder, INDEX_FILENAME)
+        # 파일명 -> (pHash, dHash, 수정 시각)
+        self._entries = {}
+        self._records = 0
+        self._lock = threading.Lock()
+        self._cache = None
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        pos = 0
+        while pos + _RECORD.size <= len(data):
+            phash, dhash, mtime, length = _RECORD.unpack_from(data, pos)
+            end = pos + _RECORD.size + length
+            if end > len(data):
+                # 쓰다가 끊긴 마지막 기록은 버린다
+                break
+            name = data[pos + _RECORD.size:end].decode("utf-8")
+            if mtime == _REMOVED:
+                self._entries.pop(name, None)
+            else:
+                self._entries[name] = (phash, dhash, mtime)
+            self._records += 1
+            pos = end
+
+    def _append(self, records):
+        """(파일명, pHash, dHash, 수정 시각) 기록들을 파일 끝에 덧붙이고 메모리에 반영"""
+        if not records:
+            return
+        chunks = []
+        for name, phash, dhash, mtime in records:
+            encoded = name.encode("utf-8")
+            chunks.append(_RECORD.pack(phash, dhash, mtime, len(encoded)) + encoded)
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(chunks))
+            for name, phash, dhash, mtime in records:
+                if mtime == _REMOVED:
+                    self._entries.pop(name, None)
+                else:
+                    self._entries[name] = (phash, dhash, mtime)
+            self._records += len(records)
+            self._cache = None
+
+    def add(self, path, image=None, hashes=None):
+        """저장한 캡쳐 하나의 지문 기록
+
+        이미 계산한 hashes(pHash, dHash)가 있으면 그대로 쓰고, 없으면 image로,
+        image도 없으면 파일을 읽어 계산한다.
+        """
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != self.folder:
+            return False
+        if image is not None and not isinstance(image, Image.Image) and hasattr(image, "shape"):
+            image = Image.fromarray(image)
+        if hashes is not None:
+            phash, dhash = hashes
+        elif isinstance(image, Image.Image):
+            phash, dhash = fingerprint(image)
+        else:
+            batch = _read_sample(path)[None]
+            phash, dhash = int(phash_batch(batch)[0]), int(dhash_batch(batch)[0])
+        self._append([(os.path.basename(path), phash, dhash, os.path.getmtime(path))])
+        return True
+
+    def add_job(self, job):
+        """SaveWorker 작업(on_written 훅)의 지문 기록
+
+        ProcessSaveWorker가 워커 프로세스에서 계산해 온 job.fingerprint(digests)를
+        쓰고, 없으면 job.image로 계산한다 (이미지도 없으면 저장된 파일을 읽는다).
+        """
+        return self.add(job.filepath, job.image, getattr(job, "fingerprint", None))
+
+    def backfill(self, should_stop=None):
+        """폴더에서 지문이 없거나 바뀐 이미지만 계산, (추가/갱신 수, 지운 수) 반환
+
+        should_stop()이 참을 돌려주면 지금까지 계산한 것만 기록하고 멈춘다.
+        """
+        with self._lock:
+            known = {name: entry[2] for name, entry in self._entries.items()}
+        todo = []
+        seen = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in FINGERPRINT_EXTENSIONS:
+                    continue
+                seen.add(entry.name)
+                mtime = entry.stat().st_mtime
+                if known.get(entry.name) != mtime:
+                    todo.append((entry.name, mtime))
+
+        updated = 0
+        for start in range(0, len(todo), BATCH_SIZE):
+            if should_stop is not None and should_stop():
+                break
+            names, samples = [], []
+            for name, mtime in todo[start:start + BATCH_SIZE]:
+                try:
+                    samples.append(_read_sample(os.path.join(self.folder, name)))
+                except OSError as e:
+                    print(f"지문 계산 실패: {name}: {e}")
+                    continue
+                names.append((name, mtime))
+            if not samples:
+                continue
+            batch = np.stack(samples)
+            phashes, dhashes = phash_batch(batch), dhash_batch(batch)
+            self._append([(name, int(p), int(d), mtime)
+                          for (name, mtime), p, d in zip(names, phashes, dhashes)])
+            updated += len(names)
+
+        removed = [(name, 0, 0, _REMOVED) for name in known if name not in seen]
+        self._append(removed)
+        # 지운/바뀐 기록이 쌓이면 파일을 새로 쓴다
+        if self._records > 2 * len(self._entries) + 1024:
+            self.compact()
+        return updated, len(removed)
+
+    def compact(self):
+        """살아 있는 기록만 남기고 인덱스 파일을 다시 쓴다"""
+        with self._lock:
+            chunks = []
+            for name, (phash, dhash, mtime) in self._entries.items():
+                encoded = name.encode("utf-8")
+                chunks.append(_RECORD.pack(phash, dhash, mtime, len(encoded)) + encoded)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(b"".join(chunks))
+            os.replace(temp_path, self.path)
+            self._records = len(chunks)
+
+    def _arrays(self, kind):
+        """(파일명 목록, 수정 시각 배열, _MultiIndex) - 바뀐 뒤 처음 찾을 때 다시 만든다"""
+        if kind not in ("phash", "dhash"):
+            raise ValueError(f"알 수 없는 해시 종류: {kind}")
+        with self._lock:
+            if self._cache is None:
+                names = list(self._entries)
+                values = self._entries.values()
+                self._cache = {
+                    "names": names,
+                    "phash": np.fromiter((v[0] for v in values), dtype=np.uint64, count=len(names)),
+                    "dhash": np.fromiter((v[1] for v in values), dtype=np.uint64, count=len(names)),
+                    "mtime": np.fromiter((v[2] for v in values), dtype=np.float64, count=len(names)),
+                }
+            cache = self._cache
+            if ("index", kind) not in cache:
+                cache[("index", kind)] = _MultiIndex(cache[kind])
+            return cache["names"], cache["mtime"], cache[("index", kind)]
+
+    def search(self, query, max_distance=SEARCH_DISTANCE, limit=50, kind="phash"):
+        """query(경로 또는 이미지)와 비슷한 캡쳐 [(거리, 경로), ...] (가까운 순, 같으면 최신순)"""
+        if isinstance(query, Image.Image):
+            hashes = fingerprint(query)
+        else:
+            name = os.path.basename(query)
+            entry = self._entries.get(name) if os.path.dirname(os.path.abspath(query)) == self.folder else None
+            if entry is None:
+                batch = _read_sample(query)[None]
+                hashes = int(phash_batch(batch)[0]), int(dhash_batch(batch)[0])
+            else:
+                hashes = entry[:2]
+        value = hashes[0] if kind == "phash" else hashes[1]
+        names, mtimes, index = self._arrays(kind)
+        if not names:
+            return []
+        _, j, distances = index.pairs(np.array([value], dtype=np.uint64), max_distance)
+        order = np.lexsort((-mtimes[j], distances))[:limit]
+        return [(int(distances[k]), os.path.join(self.folder, names[j[k]])) for k in order]
+
+    def groups(self, max_distance=GROUP_DISTANCE, kind="phash"):
+        """거의 같은 캡쳐 묶음 목록 (두 장 이상인 묶음만, 묶음 안은 최신순)
+
+        거리가 max_distance 이하인 쌍을 이어서 만든 연결 요소다.
+        """
+        names, mtimes, index = self._arrays(kind)
+        if not names:
+            return []
+        # 해시가 완전히 같은 것끼리 먼저 합쳐서 쌍의 수를 줄인다
+        unique, inverse = np.unique(index.hashes, return_inverse=True)
+        inverse = inverse.ravel()
+        qi, j, _ = _MultiIndex(unique).pairs(unique, max_distance)
+        keep = qi < j
+        qi, j = qi[keep], j[keep]
+
+        # 연결 요소: 쌍마다 작은 번호로 맞추고 포인터 점프를 반복
+        labels = np.arange(len(unique))
+        while len(qi):
+            low = np.minimum(labels[qi], labels[j])
+            before = labels.copy()
+            np.minimum.at(labels, qi, low)
+            np.minimum.at(labels, j, low)
+            labels = labels[labels]
+            if np.array_equal(labels, before):
+                break
+
+        group_of = labels[inverse]
+        # 혼자인 항목은 빼고 묶음별로(묶음 안은 최신순) 정렬
+        members = np.flatnonzero(np.bincount(group_of)[group_of] > 1)
+        members = members[np.lexsort((-mtimes[members], group_of[members]))]
+        bounds = np.flatnonzero(np.diff(group_of[members])) + 1
+        result = [[os.path.join(self.folder, names[m]) for m in group]
+                  for group in np.split(members, bounds) if len(group)]
+        result.sort(key=len, reverse=True)
+        return result
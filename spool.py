@@ -0,0 +1,254 @@
+"""메모리 매핑 원시 프레임 스풀 (녹화 후 압축)
+
+높은 FPS로 캡쳐할 때는 녹화 중에 인코딩하지 않고, 원시 픽셀과 작은 헤더
+(순번, 캡쳐 시각, 크기, 픽셀 형식)만 미리 크기를 정해 둔 스풀 파일에 mmap으로
+이어 쓴다. 압축은 나중에 export_frames()/export_sequence()로 따로 한다.
+캡쳐 속도가 인코더 속도에 묶이지 않는다.
+
+스풀은 원형 버퍼라서 파일 크기(budget)를 넘지 않는다. 가득 차면
+when_full="drop_oldest"는 가장 오래된 프레임부터 덮어쓰고, "stop"은
+SpoolFull을 발생시킨다. 인덱스로 N번째 프레임을 바로 읽을 수 있다.
+
+    with RawSpool("rec.capspool", budget=512 * 1024 * 1024) as spool:
+        for _ in range(600):
+            spool.grab(backend, bbox)
+    export_sequence("rec.capspool", "rec.webp")
+"""
+import mmap
+import os
+import struct
+import time
+from collections import deque
+
+from PIL import Image
+
+SPOOL_MAGIC = b"CAPSPOOL"
+# 파일 헤더: magic, 전체 크기, 가장 오래된 프레임 위치, 프레임 수, 다음 순번, 다음 쓰기 위치
+SPOOL_HEADER = struct.Struct("<8sQQQQQ")
+# 프레임 헤더: 순번, timestamp, width, height, 데이터 길이, 원시 형식(4바이트)
+SPOOL_FRAME_HEADER = struct.Struct("<QdIII4s")
+# 데이터 길이가 이 값이면 "스풀 앞쪽으로 돌아감" 표시
+WRAP_MARK = 0xFFFFFFFF
+
+DEFAULT_BUDGET = 1024 * 1024 * 1024
+WHEN_FULL = ("drop_oldest", "stop")
+
+
+class SpoolFull(RuntimeError):
+    """when_full="stop" 스풀에 더 쓸 공간이 없음"""
+
+
+class SpoolEntry:
+    """스풀 안의 프레임 하나 (인덱스 항목)"""
+
+    def __init__(self, seq, offset, timestamp, width, height, length, rawmode):
+        self.seq = seq
+        self.offset = offset
+        self.timestamp = timestamp
+        self.width = width
+        self.height = height
+        self.length = length
+        self.rawmode = rawmode
+
+    @property
+    def end(self):
+        return self.offset + SPOOL_FRAME_HEADER.size + self.length
+
+
+class RawSpool:
+    """크기가 고정된 mmap 원형 프레임 스풀
+
+    만들 때 budget 크기의 파일을 미리 잡아 두며, 기존 스풀 파일은
+    RawSpool.open()으로 읽기 전용으로 연다.
+    """
+
+    def __init__(self, path, budget=DEFAULT_BUDGET, when_full="drop_oldest"):
+        if when_full not in WHEN_FULL:
+            raise ValueError(f"알 수 없는 가득 참 처리 방식: {when_full} (사용 가능: {', '.join(WHEN_FULL)})")
+        if budget <= SPOOL_HEADER.size + SPOOL_FRAME_HEADER.size:
+            raise ValueError(f"스풀 크기가 너무 작습니다: {budget}바이트")
+        self.path = path
+        self.budget = budget
+        self.when_full = when_full
+        self.readonly = False
+        self.dropped = 0
+        self._entries = deque()
+        self._next_seq = 0
+        self._write_pos = SPOOL_HEADER.size
+
+        self._fp = open(path, "w+b")
+        self._fp.truncate(budget)
+        self._mm = mmap.mmap(self._fp.fileno(), budget)
+        self._write_header()
+
+    @classmethod
+    def open(cls, path):
+        """기존 스풀 파일을 읽기 전용으로 열고 인덱스 복원"""
+        spool = cls.__new__(cls)
+        spool.path = path
+        spool.readonly = True
+        spool.when_full = "stop"
+        spool.dropped = 0
+        spool._entries = deque()
+        spool._fp = open(path, "rb")
+        spool._mm = mmap.mmap(spool._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, budget, first, count, next_seq, write_pos = SPOOL_HEADER.unpack_from(spool._mm, 0)
+        if magic != SPOOL_MAGIC:
+            spool.close()
+            raise ValueError(f"스풀 파일이 아닙니다: {path}")
+        spool.budget = budget
+        spool._next_seq = next_seq
+        spool._write_pos = write_pos
+
+        offset = first
+        for _ in range(count):
+            entry = spool._read_entry(offset)
+            if entry is None:
+                # 앞쪽으로 돌아간 지점
+                entry = spool._read_entry(SPOOL_HEADER.size)
+            spool._entries.append(entry)
+            offset = entry.end
+        return spool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def first_seq(self):
+        """남아 있는 가장 오래된 프레임의 순번"""
+        return self._entries[0].seq if self._entries else self._next_seq
+
+    def entries(self):
+        """남아 있는 프레임의 인덱스 항목 (오래된 순)"""
+        return list(self._entries)
+
+    def used_bytes(self):
+        """프레임이 차지하는 바이트 수 (헤더 포함)"""
+        return sum(e.end - e.offset for e in self._entries)
+
+    def append(self, data, size, rawmode, timestamp=None):
+        """원시 픽셀 바이트를 스풀에 추가하고 프레임 순번 반환"""
+        if self.readonly:
+            raise RuntimeError("읽기 전용 스풀입니다.")
+        if timestamp is None:
+            timestamp = time.monotonic()
+        data = memoryview(data).cast("B")
+        length = len(data)
+        record = SPOOL_FRAME_HEADER.size + length
+        if SPOOL_HEADER.size + record > self.budget:
+            raise ValueError(f"프레임({length}바이트)이 스풀 크기({self.budget}바이트)보다 큽니다.")
+
+        start = self._write_pos
+        if start + record > self.budget:
+            # 끝에 들어가지 않으면 앞쪽으로 돌아간다 (뒤에 남은 오래된 프레임은 버린다)
+            self._make_room(start, self.budget)
+            if start + SPOOL_FRAME_HEADER.size <= self.budget:
+                SPOOL_FRAME_HEADER.pack_into(self._mm, start, 0, 0.0, 0, 0, WRAP_MARK, b"")
+            start = SPOOL_HEADER.size
+        self._make_room(start, start + record)
+
+        seq = self._next_seq
+        SPOOL_FRAME_HEADER.pack_into(self._mm, start, seq, timestamp, size[0], size[1],
+                                     length, rawmode.encode("ascii"))
+        body = start + SPOOL_FRAME_HEADER.size
+        self._mm[body:body + length] = data
+        self._entries.append(SpoolEntry(seq, start, timestamp, size[0], size[1], length, rawmode))
+        self._next_seq += 1
+        self._write_pos = start + record
+        self._write_header()
+        return seq
+
+    def add(self, image, timestamp=None):
+        """PIL 이미지 추가"""
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return self.append(image.tobytes(), image.size, "RGB", timestamp)
+
+    def grab(self, backend, bbox=None, timestamp=None):
+        """backend로 캡쳐한 원시 픽셀(win32는 BGRX 그대로)을 바로 스풀에 추가"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        data, size, rawmode = backend.grab_raw(bbox)
+        return self.append(data, size, rawmode, timestamp)
+
+    def _make_room(self, start, end):
+        """[start, end) 구간과 겹치는 가장 오래된 프레임들을 비운다"""
+        while self._entries:
+            oldest = self._entries[0]
+            if oldest.offset >= end or oldest.end <= start:
+                break
+            if self.when_full == "stop":
+                raise SpoolFull(f"스풀이 가득 찼습니다: {self.path} ({len(self._entries)}프레임)")
+            self._entries.popleft()
+            self.dropped += 1
+
+    def _write_header(self):
+        first = self._entries[0].offset if self._entries else self._write_pos
+        SPOOL_HEADER.pack_into(self._mm, 0, SPOOL_MAGIC, self.budget, first,
+                               len(self._entries), self._next_seq, self._write_pos)
+
+    def _read_entry(self, offset):
+        """offset의 프레임 헤더 읽기 (돌아감 표시면 None)"""
+        if offset + SPOOL_FRAME_HEADER.size > self.budget:
+            return None
+        seq, timestamp, width, height, length, rawmode = SPOOL_FRAME_HEADER.unpack_from(self._mm, offset)
+        if length == WRAP_MARK:
+            return None
+        return SpoolEntry(seq, offset, timestamp, width, height, length,
+                          rawmode.rstrip(b"\0").decode("ascii"))
+
+    def frame(self, index):
+        """index 번째로 남아 있는 프레임(0이 가장 오래됨)의 (timestamp, RGB 이미지)"""
+        entry = self._entries[index]
+        body = entry.offset + SPOOL_FRAME_HEADER.size
+        image = Image.frombuffer("RGB", (entry.width, entry.height),
+                                 self._mm[body:body + entry.length], "raw", entry.rawmode, 0, 1)
+        return entry.timestamp, image
+
+    def frame_by_seq(self, seq):
+        """순번으로 프레임 읽기 (이미 덮어쓴 프레임이면 IndexError)"""
+        index = seq - self.first_seq
+        if index < 0 or index >= len(self._entries):
+            raise IndexError(f"스풀에 없는 프레임입니다: {seq}")
+        return self.frame(index)
+
+    def frames(self):
+        """남아 있는 모든 프레임의 (timestamp, 이미지)를 오래된 순으로"""
+        for index in range(len(self._entries)):
+            yield self.frame(index)
+
+    def close(self):
+        """mmap과 파일 닫기"""
+        if self._mm is None:
+            return
+        if not self.readonly:
+            self._mm.flush()
+        self._mm.close()
+        self._fp.close()
+        self._mm = None
+
+
+def export_frames(spool_path, folder, file_format="png", profile=None, prefix="frame"):
+    """스풀의 프레임을 개별 파일로 압축 저장, 저장한 경로 목록 반환"""
+    from encoding import FORMAT_EXTENSIONS, save_image
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    with RawSpool.open(spool_path) as spool:
+        for entry, (timestamp, image) in zip(spool.entries(), spool.frames()):
+            extension = FORMAT_EXTENSIONS.get(file_format, file_format)
+            filepath = os.path.join(folder, f"{prefix}_{entry.seq:06d}.{extension}")
+            paths.append(save_image(image, filepath, file_format, profile, overwrite=True).path)
+    return paths
+
+
+def export_sequence(spool_path, output, format=None, **kwargs):
+    """스풀의 프레임을 애니메이션/시퀀스 파일 하나로 압축 저장 (sequence 포맷 사용)"""
+    from sequence import write_sequence
+    with RawSpool.open(spool_path) as spool:
+        return write_sequence(output, spool.frames(), format, **kwargs)
@@ -0,0 +1,203 @@
+"""변경 감시 캡쳐
+
+지정한 영역을 낮은 해상도로 가끔씩(probe_fps) 확인하다가, 내용이 threshold
+이상 바뀌었을 때만 원래 해상도로 캡쳐한다. 확인은 백그라운드 스레드에서
+Event.wait로 쉬면서 하므로 화면이 그대로일 때는 CPU를 거의 쓰지 않는다.
+
+바뀐 것을 발견하면 debounce 동안 더 바뀌지 않을 때까지(스크롤/애니메이션이
+끝날 때까지) 기다렸다가 캡쳐한다. 계속 바뀌더라도 max_settle이 지나면 캡쳐한다.
+
+    watcher = ChangeWatcher(backend, bbox, on_trigger=save, probe_fps=4, debounce=0.3)
+    watcher.start()
+    ...
+    def save(image, event):          # 감시 스레드에서 호출
+        worker.submit(image, path, on_written=lambda job: watcher.mark_saved(event))
+
+변경 감지부터 파일 저장까지 걸린 시간은 mark_saved()로 기록되어
+stats.summary()와 METRICS의 watch_trigger 단계로 볼 수 있다.
+"""
+import threading
+import time
+
+import numpy as np
+
+from metrics import METRICS, Histogram
+
+# 확인용 축소 이미지의 가로 픽셀 수 (이보다 작은 영역은 축소하지 않는다)
+PROBE_WIDTH = 160
+
+
+class WatchEvent:
+    """변경 감지로 생긴 캡쳐 하나"""
+
+    def __init__(self, index, detected_at, changed):
+        self.index = index
+        # 처음 바뀐 것을 발견한 시각 (perf_counter), 실제 변화는 직전 확인 이후 언제든
+        self.detected_at = detected_at
+        self.changed = changed
+        self.captured_at = None
+        self.saved_at = None
+
+    def latency(self):
+        """감지부터 저장 완료까지 걸린 시간(초), 아직 저장 전이면 None"""
+        if self.saved_at is None:
+            return None
+        return self.saved_at - self.detected_at
+
+
+class WatchStats:
+    """변경 감시 통계"""
+
+    def __init__(self, probe_interval):
+        self.probe_interval = probe_interval
+        self.probes = 0
+        self.triggers = 0
+        self.saved = 0
+        self.probe_time = 0.0
+        self.started = time.perf_counter()
+        self.latency = Histogram()
+
+    def summary(self):
+        """사람이 읽을 수 있는 요약 문자열"""
+        elapsed = time.perf_counter() - self.started
+        lines = [f"감시 시간: {elapsed:.1f}초, 확인 {self.probes}회 "
+                 f"(평균 {self.probe_time / max(1, self.probes) * 1000:.1f}ms)",
+                 f"변경 캡쳐: {self.triggers}장 (저장 완료 {self.saved}장)"]
+        summary = self.latency.summary()
+        if summary["count"]:
+            lines.append(f"감지->저장 지연: 평균 {summary['mean'] * 1000:.0f}ms, "
+                         f"p95 {summary['p95'] * 1000:.0f}ms, 최대 {summary['max'] * 1000:.0f}ms "
+                         f"(+ 화면 변화부터 감지까지 최대 {self.probe_interval * 1000:.0f}ms)")
+        return "\n".join(lines)
+
+
+def probe_frame(backend, bbox=None, probe_width=PROBE_WIDTH):
+    """영역을 낮은 해상도로 캡쳐해 작은 회색조 배열로 (win32는 캡쳐하면서 축소)"""
+    return np.asarray(backend.grab_small(bbox, probe_width).convert("L"), dtype=np.int16)
+
+
+def changed_fraction(previous, current, pixel_threshold):
+    """pixel_threshold보다 밝기가 크게 바뀐 축소 픽셀의 비율"""
+    if previous is None or previous.shape != current.shape:
+        return 1.0
+    return float(np.count_nonzero(np.abs(current - previous) > pixel_threshold)) / current.size
+
+
+class ChangeWatcher:
+    """영역이 바뀔 때만 캡쳐하는 감시기
+
+    probe_fps: 초당 확인 횟수
+    threshold: 바뀐 축소 픽셀 비율이 이 값을 넘으면 변경으로 본다 (0.0 ~ 1.0,
+               0이면 축소 픽셀 하나라도 바뀌면 변경)
+    pixel_threshold: 축소 픽셀 밝기 차이 허용치 (커서 깜빡임/압축 노이즈 무시)
+    debounce: 변경 후 이 시간(초) 동안 더 바뀌지 않으면 캡쳐
+    max_settle: 계속 바뀌어도 이 시간(초)이 지나면 캡쳐 (기본 debounce의 4배, 최소 1초)
+    on_trigger(image, event): 감시 스레드에서 원래 해상도 이미지와 함께 호출
+    """
+
+    def __init__(self, backend, bbox=None, on_trigger=None, probe_fps=4.0, threshold=0.0,
+                 pixel_threshold=12, debounce=0.3, max_settle=None, probe_width=PROBE_WIDTH,
+                 on_error=None):
+        if probe_fps <= 0:
+            raise ValueError("확인 빈도는 0보다 커야 합니다.")
+        self.backend = backend
+        self.bbox = bbox
+        self.on_trigger = on_trigger
+        self.on_error = on_error
+        self.interval = 1.0 / probe_fps
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.debounce = debounce
+        self.max_settle = max_settle if max_settle is not None else max(1.0, debounce * 4)
+        self.probe_width = probe_width
+        self.stats = WatchStats(self.interval)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """감시 시작 (첫 확인 결과가 기준 화면이 된다)"""
+        if self.running:
+            return self
+        self._stop.clear()
+        self.stats = WatchStats(self.interval)
+        self._thread = threading.Thread(target=self._run, name="change-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """감시 중지"""
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def mark_saved(self, event):
+        """event의 캡쳐가 저장되었음을 기록 (저장 워커 on_written 훅에서 호출, 스레드 안전)"""
+        event.saved_at = time.perf_counter()
+        latency = event.latency()
+        with self._lock:
+            self.stats.saved += 1
+            self.stats.latency.add(latency)
+        METRICS.record("watch_trigger", latency)
+
+    def probe(self):
+        """축소 확인 한 번 (걸린 시간은 통계에 누적)"""
+        start = time.perf_counter()
+        frame = probe_frame(self.backend, self.bbox, self.probe_width)
+        self.stats.probes += 1
+        self.stats.probe_time += time.perf_counter() - start
+        return frame
+
+    def _run(self):
+        baseline = None
+        pending = None
+        last = None
+        stable_since = None
+        next_probe = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                current = self.probe()
+                now = time.perf_counter()
+                if baseline is None:
+                    baseline = last = current
+                elif pending is None:
+                    changed = changed_fraction(baseline, current, self.pixel_threshold)
+                    if changed > self.threshold:
+                        pending = WatchEvent(self.stats.triggers, now, changed)
+                        stable_since = now
+                else:
+                    # 변경 후 화면이 자리 잡을 때까지 기다린다
+                    if changed_fraction(last, current, self.pixel_threshold) > self.threshold:
+                        stable_since = now
+                    pending.changed = max(pending.changed,
+                                          changed_fraction(baseline, current, self.pixel_threshold))
+                last = current
+
+                if pending is not None and (now - stable_since >= self.debounce or
+                                            now - pending.detected_at >= self.max_settle):
+                    self._trigger(pending)
+                    baseline = current
+                    pending = None
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"변경 감시 오류: {e}")
+
+            # 바뀐 것을 본 뒤에는 debounce를 놓치지 않도록 더 자주 확인한다
+            interval = self.interval if pending is None else min(self.interval, max(self.debounce / 2, 0.01))
+            next_probe = max(next_probe + interval, time.perf_counter())
+            self._stop.wait(next_probe - time.perf_counter())
+
+    def _trigger(self, event):
+        """원래 해상도로 캡쳐해 on_trigger 호출"""
+        with METRICS.stage("grab"):
+            image = self.backend.grab(self.bbox)
+        event.captured_at = time.perf_counter()
+        self.stats.triggers += 1
+        if self.on_trigger:
+            self.on_trigger(image, event)